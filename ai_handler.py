@@ -1,357 +1,1082 @@
+import asyncio
 import json
-import openai
+import re
 import time
-from config import OPENAI_API_KEY, OPENAI_SETTINGS, SYSTEM_PROMPT
-from tools import FUNCTIONS, FUNCTION_MAP
+import weakref
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from types import SimpleNamespace
+from config import OPENAI_API_KEY, OPENAI_SETTINGS, ADVANCED_AI_SETTINGS, PERFORMANCE_SETTINGS, DEBUG_SETTINGS, TOOL_SELECTION_SETTINGS, SEMANTIC_CACHE_SETTINGS, build_system_prompt
+from tools import TOOLS, TOOLS_BY_NAME, TOOL_INDEX, TOOL_DISPATCHER, ASYNC_FUNCTION_MAP, PARALLEL_SAFE_TOOLS, WEB_QUERIES, get_response_policy, get_cache_policy
+from tool_dispatcher import ToolArgumentError
 from conversation_manager import ConversationManager
+from function_cache import FunctionCache
+from semantic_cache import SemanticCache
+from intent_router import IntentRouter
+from token_counter import count_tokens, count_message_tokens
+from http_client import get_openai_http_client, get_openai_async_http_client, get_connection_stats
+
+# Tools and the model report failures as text starting with one of these; never cache them
+FAILURE_PREFIXES = ("Sorry", "Error", "Could not", "I couldn't", "Autonomous execution encountered", "Invalid arguments")
+
+# Sentence end: terminal punctuation (optionally followed by closing quotes/brackets) and whitespace
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])["\')\]]*\s+|\n+')
+
+class SentenceBuffer:
+    """Accumulate streamed text and release it one complete sentence at a time."""
+    
+    def __init__(self, min_chars=None):
+        self.min_chars = min_chars if min_chars is not None else ADVANCED_AI_SETTINGS['stream_min_sentence_chars']
+        self.buffer = ""
+    
+    def feed(self, text):
+        """Add a streamed fragment and return the sentences it completed."""
+        self.buffer += text
+        sentences = []
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(self.buffer):
+            sentence = self.buffer[start:match.end()].strip()
+            # Very short fragments ("Sure.", "Okay!") are spoken together with the next sentence
+            if len(sentence) < self.min_chars:
+                continue
+            sentences.append(sentence)
+            start = match.end()
+        self.buffer = self.buffer[start:]
+        return sentences
+    
+    def flush(self):
+        """Return whatever text is left once the stream has ended."""
+        remainder = self.buffer.strip()
+        self.buffer = ""
+        return remainder
 
 class AIHandler:
     def __init__(self):
-        self.client = openai.OpenAI(api_key=OPENAI_API_KEY)
+        # The openai package is slow to import; clients are created on first use
+        self._client = None
+        self._async_clients = weakref.WeakKeyDictionary()  # event loop -> AsyncOpenAI client
         self.conversation_manager = ConversationManager()
+        # Bounded pool for running independent tool calls from one model turn concurrently
+        self.tool_executor = ThreadPoolExecutor(
+            max_workers=PERFORMANCE_SETTINGS['max_concurrent_operations'],
+            thread_name_prefix="jarvis-tool"
+        )
+        # System prompt, tool schemas and static token cost per tool selection, built once per
+        # distinct selection so repeated selections send byte-identical prefixes
+        self.tool_prompts = {}
+        self.tool_selection_stats = {'queries': 0, 'tools_offered': 0, 'schema_tokens': 0}
+        # Cache of tool results for tools whose cache policy allows it
+        self.function_cache = None
+        if ADVANCED_AI_SETTINGS['enable_function_caching'] and PERFORMANCE_SETTINGS['cache_enabled']:
+            self.function_cache = FunctionCache(
+                max_entries=PERFORMANCE_SETTINGS['cache_max_entries'],
+                default_ttl=PERFORMANCE_SETTINGS['cache_ttl']
+            )
+        # Web lookups and final answers reused for similarly worded questions
+        self.answer_cache = None
+        if SEMANTIC_CACHE_SETTINGS['enabled']:
+            self.answer_cache = SemanticCache(
+                max_entries=SEMANTIC_CACHE_SETTINGS['max_entries'],
+                threshold=SEMANTIC_CACHE_SETTINGS['similarity_threshold'],
+                default_ttl=SEMANTIC_CACHE_SETTINGS['default_ttl'],
+                freshness_rules=SEMANTIC_CACHE_SETTINGS['freshness_rules'],
+                persist_path=SEMANTIC_CACHE_SETTINGS['persist_path'],
+                save_interval=SEMANTIC_CACHE_SETTINGS['save_interval']
+            )
+        # Local grammar for common commands that don't need the model
+        self.intent_router = IntentRouter(tool_names=TOOL_DISPATCHER.specs.keys()) if ADVANCED_AI_SETTINGS['enable_local_router'] else None
+        self.router_stats = {'routed': 0, 'fell_through': 0, 'total_routed_ms': 0.0}
+        # Token usage across requests, to verify the shared prompt prefix is served from cache
+        self.usage_stats = {'requests': 0, 'prompt_tokens': 0, 'cached_tokens': 0, 'completion_tokens': 0}
+        self.usage_log = deque(maxlen=50)  # Per-request prompt/cached token counts, most recent last
     
-    def process_query(self, query):
-        """Process a user query and return the appropriate response."""
+    def process_query(self, query, first_turn=None):
+        """
+        Process a user query and return the appropriate response.
+        
+        Args:
+            query: The user's query
+            first_turn: Optional result of speculate_first_turn() for this query
+        """
         try:
+            # Answer common commands locally when the router is confident
+            local_response = self._route_locally(query)
+            if local_response is not None:
+                return local_response
+            
+            cached_answer = self._cached_answer(query)
+            if cached_answer is not None:
+                return cached_answer
+            
             print("Thinking...")
             
             # Check if autonomous mode should be used
             if self.conversation_manager.should_use_autonomous_mode(query):
                 return self._process_autonomous_query(query)
             else:
-                return self._process_single_query(query)
+                return self._process_single_query(query, first_turn)
                 
         except Exception as e:
             print(f"Error in AI processing: {e}")
             return f"Sorry, I encountered an error: {str(e)}"
     
-    def _process_single_query(self, query):
-        """Process a single query with context."""
-        # Get conversation context
-        context_messages = self.conversation_manager.get_context_messages()
-        
-        # Build messages with context
-        messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-        messages.extend(context_messages)
-        messages.append({"role": "user", "content": query})
-        
-        response = self.client.chat.completions.create(
-            model=OPENAI_SETTINGS['model'],
-            messages=messages,
-            functions=FUNCTIONS,
-            function_call="auto",
-            max_tokens=OPENAI_SETTINGS['max_tokens'],
-            temperature=OPENAI_SETTINGS['temperature']
+    def process_query_stream(self, query, first_turn=None):
+        """
+        Process a user query and yield the response sentence by sentence while it is generated.
+        
+        Autonomous queries are not streamed; their final response is yielded as a single chunk.
+        first_turn is an optional result of speculate_first_turn() for this query.
+        """
+        try:
+            local_response = self._route_locally(query)
+            if local_response is not None:
+                yield local_response
+                return
+            
+            cached_answer = self._cached_answer(query)
+            if cached_answer is not None:
+                yield cached_answer
+                return
+            
+            print("Thinking...")
+            
+            if self.conversation_manager.should_use_autonomous_mode(query):
+                yield self._process_autonomous_query(query)
+            else:
+                yield from self._stream_single_query(query, first_turn)
+                
+        except Exception as e:
+            print(f"Error in AI processing: {e}")
+            yield f"Sorry, I encountered an error: {str(e)}"
+    
+    def speculate_first_turn(self, query):
+        """
+        Run the first model turn for a query ahead of time, without side effects.
+        
+        No tools are executed and nothing is added to the history, so the result can be
+        dropped if the final transcript turns out different. If it matches, pass the
+        result to process_query/process_query_stream as first_turn.
+        
+        Returns:
+            tuple or None: (messages, tools, message), or None if the query would not go
+                           to the model as a single query (local command, autonomous task)
+        """
+        if self.intent_router is not None:
+            match = self.intent_router.route(query)
+            if match is not None and match.confidence >= ADVANCED_AI_SETTINGS['local_router_min_confidence']:
+                return None
+        if self.conversation_manager.should_use_autonomous_mode(query):
+            return None
+        
+        messages, tools = self._build_messages(query)
+        response = self._create_completion(self._completion_kwargs(messages, tools))
+        return messages, tools, response.choices[0].message
+    
+    @property
+    def client(self):
+        """OpenAI client, created on first use."""
+        if self._client is None:
+            import openai
+            # Shared keep-alive transport with explicit pool limits, timeouts and connect retries
+            self._client = openai.OpenAI(api_key=OPENAI_API_KEY, http_client=get_openai_http_client())
+        return self._client
+    
+    def _create_completion(self, kwargs):
+        """Create a chat completion and record its token usage (streams record usage as they finish)."""
+        response = self.client.chat.completions.create(**kwargs)
+        if not kwargs.get('stream'):
+            self._record_usage(response.usage)
+        return response
+    
+    def _record_usage(self, usage):
+        """Record prompt and cached prompt tokens of one request."""
+        if usage is None:
+            return
+        details = getattr(usage, 'prompt_tokens_details', None)
+        cached_tokens = (getattr(details, 'cached_tokens', None) or 0) if details else 0
+        self.usage_stats['requests'] += 1
+        self.usage_stats['prompt_tokens'] += usage.prompt_tokens
+        self.usage_stats['cached_tokens'] += cached_tokens
+        self.usage_stats['completion_tokens'] += usage.completion_tokens
+        self.usage_log.append({'prompt_tokens': usage.prompt_tokens, 'cached_tokens': cached_tokens})
+        if DEBUG_SETTINGS['verbose_logging']:
+            print(f"Tokens: {usage.prompt_tokens} prompt ({cached_tokens} cached), {usage.completion_tokens} completion")
+    
+    def _tool_prompt(self, tool_names):
+        """
+        Get the system prompt, tool schemas and static token cost for a tool selection.
+        
+        The static cost covers everything a request spends before conversation context:
+        system prompt, tool schemas and the reply.
+        """
+        prompt = self.tool_prompts.get(tool_names)
+        if prompt is None:
+            system_prompt = build_system_prompt(tool_names)
+            tools = [TOOLS_BY_NAME[name] for name in tool_names]
+            schema_tokens = count_tokens(json.dumps(tools, sort_keys=True, separators=(",", ":")))
+            static_tokens = (
+                count_message_tokens([{"role": "system", "content": system_prompt}])
+                + schema_tokens
+                + OPENAI_SETTINGS['max_tokens']
+            )
+            prompt = self.tool_prompts[tool_names] = (system_prompt, tools, schema_tokens, static_tokens)
+        return prompt
+    
+    def _select_tools(self, query):
+        """Pick the tools to offer the model for a query (all tools if pruning is disabled)."""
+        if not TOOL_SELECTION_SETTINGS['enable_tool_pruning']:
+            return tuple(TOOLS_BY_NAME)
+        recent_tools = self.conversation_manager.get_recent_tools(TOOL_SELECTION_SETTINGS['recent_turns'])
+        tool_names = TOOL_INDEX.select(query, TOOL_SELECTION_SETTINGS['top_k'], recent_tools)
+        if DEBUG_SETTINGS['verbose_logging']:
+            print(f"Offering tools: {', '.join(tool_names)}")
+        return tool_names
+    
+    def _build_messages(self, query):
+        """
+        Build the request for a query: system prompt, conversation context, then the query.
+        
+        Returns:
+            tuple: (messages, tools) - tools are the schemas offered for this query and are
+                   reused for every call made while answering it
+        """
+        system_prompt, tools, schema_tokens, static_tokens = self._tool_prompt(self._select_tools(query))
+        self.tool_selection_stats['queries'] += 1
+        self.tool_selection_stats['tools_offered'] += len(tools)
+        self.tool_selection_stats['schema_tokens'] += schema_tokens
+        
+        query_message = {"role": "user", "content": query}
+        token_budget = (
+            self.conversation_manager.max_prompt_tokens
+            - static_tokens
+            - count_message_tokens([query_message])
         )
         
-        choice = response.choices[0]
-        tool_calls = []
+        messages = [{"role": "system", "content": system_prompt}]
+        messages.extend(self.conversation_manager.get_context_messages(token_budget=max(token_budget, 0)))
+        messages.append(query_message)
+        return messages, tools
+    
+    def _completion_kwargs(self, messages, tools, tool_choice="auto", stream=False, **overrides):
+        """
+        Request parameters for a chat completion.
         
-        # Handle function calls
-        if choice.finish_reason == "function_call":
-            tool_result = self._execute_function(choice.message.function_call)
-            tool_calls.append({
-                'function': choice.message.function_call.name,
-                'arguments': choice.message.function_call.arguments,
+        Every call made for one query (first turn, follow-up, planning, autonomous steps)
+        sends the same system prompt and tool schemas first, so they share one
+        byte-identical prefix that the provider can cache. Anything call-specific goes after it.
+        """
+        kwargs = {
+            'model': OPENAI_SETTINGS['model'],
+            'messages': messages,
+            'tools': tools,
+            'tool_choice': tool_choice,
+            'parallel_tool_calls': ADVANCED_AI_SETTINGS['enable_parallel_tool_calls'],
+            'max_tokens': OPENAI_SETTINGS['max_tokens'],
+            'temperature': OPENAI_SETTINGS['temperature']
+        }
+        if stream:
+            kwargs['stream'] = True
+            # The final chunk then carries usage, including cached prompt tokens
+            kwargs['stream_options'] = {"include_usage": True}
+        kwargs.update(overrides)
+        return kwargs
+    
+    def _follow_up_kwargs(self, messages, tools, stream=False):
+        """Request parameters for answering from tool results already in the thread."""
+        return self._completion_kwargs(messages, tools, tool_choice="none", stream=stream, max_tokens=150, temperature=0.7)
+    
+    def _plan_kwargs(self, messages, tools):
+        """Request parameters for the optional planning call in autonomous mode."""
+        planning_instruction = {
+            "role": "system",
+            "content": "Before acting, outline a concise plan of 1-2 steps naming the tools you will use. Do not call tools yet."
+        }
+        return self._completion_kwargs(messages + [planning_instruction], tools, tool_choice="none", max_tokens=200, temperature=0.3)
+    
+    def _tool_call_records(self, tool_calls, tool_results):
+        """Build the conversation-history records for executed tool calls."""
+        return [
+            {
+                'function': tool_call.function.name,
+                'arguments': tool_call.function.arguments,
                 'result': tool_result
-            })
-            # Feed tool result back to OpenAI for refinement
-            final_response = self._refine_tool_response(query, tool_result)
+            }
+            for tool_call, tool_result in zip(tool_calls, tool_results)
+        ]
+    
+    def _match_locally(self, query):
+        """Return a confident local intent match for the query, or None if it should go to the model."""
+        if self.intent_router is None:
+            return None
+        
+        match = self.intent_router.route(query)
+        if match is None or match.confidence < ADVANCED_AI_SETTINGS['local_router_min_confidence']:
+            self.router_stats['fell_through'] += 1
+            return None
+        
+        print(f"Local intent: {match.name} {match.arguments}")
+        return match
+    
+    def _finish_local_route(self, query, match, tool_result, start):
+        """Build the spoken response for a locally dispatched command and record it."""
+        # No model in the loop: use the tool's template, or speak its result as is
+        response = self._render_tool_result(get_response_policy(match.name), tool_result)
+        
+        self.conversation_manager.add_interaction(query, response, [{
+            'function': match.name,
+            'arguments': json.dumps(match.arguments),
+            'result': tool_result
+        }])
+        
+        self.router_stats['routed'] += 1
+        self.router_stats['total_routed_ms'] += (time.perf_counter() - start) * 1000
+        return response
+    
+    def _route_locally(self, query):
+        """
+        Dispatch a query directly to a tool if the local intent router matches it confidently.
+        
+        Returns:
+            str or None: The spoken response, or None if the query should go to the model
+        """
+        start = time.perf_counter()
+        match = self._match_locally(query)
+        if match is None:
+            return None
+        # On the tool executor, so a tool that hangs can't hold up the conversation
+        future = self.tool_executor.submit(
+            self._execute_function, SimpleNamespace(name=match.name, arguments=match.arguments)
+        )
+        try:
+            tool_result = future.result(timeout=PERFORMANCE_SETTINGS['operation_timeout'])
+        except FutureTimeoutError:
+            tool_result = f"Error executing {match.name}: timed out"
+        return self._finish_local_route(query, match, tool_result, start)
+    
+    def _cached_answer(self, query):
+        """
+        Answer a query from an earlier answer to a similarly worded question.
+        
+        Returns:
+            str or None: The cached answer, or None if the query should be processed
+        """
+        if self.answer_cache is None:
+            return None
+        hit, answer = self.answer_cache.get('answer', query)
+        if not hit:
+            return None
+        print("Using cached answer")
+        self.conversation_manager.add_interaction(query, answer, [])
+        return answer
+    
+    def _record_interaction(self, query, final_response, tool_calls, cacheable=True):
+        """Add a model-generated answer to the history and, if it is reusable, the answer cache."""
+        self.conversation_manager.add_interaction(query, final_response, tool_calls)
+        if not cacheable:
+            return
+        
+        # Only answers built purely from lookups are reusable; anything that acted on the
+        # desktop, or used no tools (and may depend on conversation context), is not
+        answer_tools = SEMANTIC_CACHE_SETTINGS['answer_tools']
+        if (self.answer_cache is not None and final_response and tool_calls
+                and all(call['function'] in answer_tools for call in tool_calls)
+                and not str(final_response).startswith(FAILURE_PREFIXES)):
+            lookup = self._resolved_lookup(tool_calls)
+            if lookup is not None:
+                self.answer_cache.set('answer', lookup, final_response)
+    
+    def _resolved_lookup(self, tool_calls):
+        """
+        The self-contained question an answer was looked up with, or None if there were several.
+        
+        Answers are cached under the model's lookup query rather than the user's words:
+        "how about in london?" only means something together with the conversation, but
+        the query the model sent ("population of london") doesn't.
+        """
+        lookups = set()
+        for call in tool_calls:
+            argument = SEMANTIC_CACHE_SETTINGS['tools'].get(call['function'])
+            try:
+                value = json.loads(call['arguments']).get(argument) if argument else None
+            except (TypeError, ValueError, AttributeError):
+                value = None
+            if not value:
+                return None
+            lookups.add(" ".join(value.lower().split()))
+        return lookups.pop() if len(lookups) == 1 else None
+    
+    def _process_single_query(self, query, first_turn=None):
+        """Process a single query with context."""
+        if first_turn is not None:
+            messages, tools, message = first_turn
         else:
-            final_response = choice.message.content
+            # Build messages with conversation context
+            messages, tools = self._build_messages(query)
+            
+            response = self._create_completion(self._completion_kwargs(messages, tools))
+            
+            message = response.choices[0].message
+        tool_calls = []
+        
+        # Handle tool calls (the model may request several at once)
+        if message.tool_calls:
+            tool_results = self._execute_tool_calls(message.tool_calls)
+            tool_calls.extend(self._tool_call_records(message.tool_calls, tool_results))
+            # Render simple results locally, otherwise feed them back to OpenAI in one follow-up turn
+            rendered = self._render_tool_responses(message.tool_calls, tool_results)
+            if rendered is not None:
+                final_response = rendered
+            else:
+                messages.extend(self._tool_result_messages(message.tool_calls, tool_results))
+                final_response = self._refine_tool_response(messages, tools, tool_results)
+        else:
+            final_response = message.content
         
         # Add to conversation history
-        self.conversation_manager.add_interaction(query, final_response, tool_calls)
+        self._record_interaction(query, final_response, tool_calls)
+        
+        return final_response
+    
+    def _stream_single_query(self, query, first_turn=None):
+        """
+        Streaming counterpart of _process_single_query. Yields sentences as they complete.
+        
+        If the caller stops early (the user talked over the reply), the turn is still
+        recorded: with what was spoken so far and any tool calls that already ran.
+        """
+        spoken = []
+        tool_calls = []
+        final_response = None
+        try:
+            if first_turn is not None:
+                # The first turn already completed speculatively; speak its text sentence by sentence
+                messages, tools, message = first_turn
+                content = message.content or ""
+                message_tool_calls = message.tool_calls or []
+                sentence_buffer = SentenceBuffer()
+                for sentence in sentence_buffer.feed(content):
+                    spoken.append(sentence)
+                    yield sentence
+                remainder = sentence_buffer.flush()
+                if remainder:
+                    spoken.append(remainder)
+                    yield remainder
+            else:
+                messages, tools = self._build_messages(query)
+                content, message_tool_calls = yield from self._tracked(self._stream_first_turn(messages, tools), spoken)
+            
+            if message_tool_calls:
+                tool_results = self._execute_tool_calls(message_tool_calls)
+                tool_calls.extend(self._tool_call_records(message_tool_calls, tool_results))
+                rendered = self._render_tool_responses(message_tool_calls, tool_results)
+                if rendered is not None:
+                    spoken.append(rendered)
+                    yield rendered
+                    final_response = rendered
+                else:
+                    messages.extend(self._tool_result_messages(message_tool_calls, tool_results))
+                    final_response = yield from self._tracked(
+                        self._stream_refine_tool_response(messages, tools, tool_results), spoken
+                    )
+            else:
+                final_response = content
+        finally:
+            if final_response is not None:
+                self._record_interaction(query, final_response, tool_calls)
+            elif spoken or tool_calls:
+                # Interrupted: keep what was said and done, but don't cache a partial answer
+                self._record_interaction(query, " ".join(spoken), tool_calls, cacheable=False)
         
         return final_response
     
+    @staticmethod
+    def _tracked(generator, spoken):
+        """Yield from generator, appending each sentence to spoken; closes it if the caller stops early."""
+        try:
+            while True:
+                try:
+                    sentence = next(generator)
+                except StopIteration as stop:
+                    return stop.value
+                spoken.append(sentence)
+                yield sentence
+        finally:
+            generator.close()
+    
+    def _stream_first_turn(self, messages, tools):
+        """
+        Stream the first model turn, yielding its text sentence by sentence.
+        
+        Returns:
+            tuple: (full text, tool calls assembled from the streamed fragments)
+        """
+        stream = self._create_completion(self._completion_kwargs(messages, tools, stream=True))
+        
+        # Streamed tool calls arrive as fragments keyed by their index in the response
+        streamed_calls = {}
+        
+        # Text is spoken as it arrives; tool calls are assembled from their streamed fragments
+        sentence_buffer = SentenceBuffer()
+        content_parts = []
+        try:
+            for chunk in stream:
+                self._record_usage(getattr(chunk, 'usage', None))
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta
+                if delta.tool_calls:
+                    for fragment in delta.tool_calls:
+                        call = streamed_calls.setdefault(fragment.index, {'id': "", 'name': "", 'arguments': []})
+                        call['id'] = fragment.id or call['id']
+                        if fragment.function:
+                            call['name'] += fragment.function.name or ""
+                            call['arguments'].append(fragment.function.arguments or "")
+                elif delta.content:
+                    content_parts.append(delta.content)
+                    yield from sentence_buffer.feed(delta.content)
+        finally:
+            # Stopped early (barge-in): release the HTTP response instead of leaving it open
+            self._close_stream(stream)
+        
+        remainder = sentence_buffer.flush()
+        if remainder:
+            yield remainder
+        
+        message_tool_calls = [
+            SimpleNamespace(
+                id=call['id'],
+                function=SimpleNamespace(name=call['name'], arguments="".join(call['arguments']) or "{}")
+            )
+            for _, call in sorted(streamed_calls.items())
+        ]
+        return "".join(content_parts), message_tool_calls
+    
+    @staticmethod
+    def _close_stream(stream):
+        """Close a streamed completion's HTTP response (a no-op once it has been read to the end)."""
+        close = getattr(stream, 'close', None)
+        if close is not None:
+            try:
+                close()
+            except Exception as e:
+                print(f"Error closing response stream: {e}")
+    
     def _process_autonomous_query(self, query):
-        """Process a complex query with autonomous multi-tool execution."""
-        print("Autonomous mode: Planning complex task...")
+        """
+        Process a complex query with autonomous multi-tool execution.
         
-        # Step 1: Create a plan
-        plan = self._create_execution_plan(query)
-        print(f"Plan: {plan}")
+        Runs a single message thread: tool results are appended as tool messages and the
+        model keeps calling tools until it answers in plain text. Planning is optional and
+        a separate summary call is only made if the tool-call budget runs out.
+        """
+        print("Autonomous mode: Working on complex task...")
+        
+        messages, tools = self._build_messages(query)
         
-        # Step 2: Execute the plan with redundancy prevention
-        results = []
         tool_calls = []
-        executed_functions = set()  # Track executed functions to prevent redundancy
+        executed_calls = {}  # (function name, normalized arguments) -> result, to prevent redundancy
+        final_response = None
         
         try:
-            # Execute multiple tool calls based on the plan
+            # Optional: let the model outline its approach before acting
+            if self.conversation_manager.enable_planning:
+                plan = self._create_execution_plan(messages, tools)
+                print(f"Plan: {plan}")
+                messages.append({"role": "assistant", "content": plan})
+            
             for i in range(self.conversation_manager.max_tool_calls):
                 print(f"Autonomous execution step {i+1}...")
                 
-                # Get next action from AI
-                next_action = self._get_next_action(query, results, plan, executed_functions)
+                response = self._create_completion(self._completion_kwargs(messages, tools))
+                message = response.choices[0].message
                 
-                if not next_action or next_action.get('action') == 'complete':
+                # No more tool calls: the model has answered
+                if not message.tool_calls:
                     print("Autonomous execution completed.")
+                    final_response = message.content
                     break
                 
-                # Execute the action
-                if next_action.get('function_call'):
-                    function_name = next_action['function_call'].name
-                    function_args = json.loads(next_action['function_call'].arguments)
-                    
-                    # Check for redundancy
-                    if self._is_redundant_call(function_name, function_args, executed_functions):
-                        print(f"Skipping redundant call to {function_name}")
-                        continue
-                    
-                    tool_result = self._execute_function(next_action['function_call'])
-                    results.append(tool_result)
-                    tool_calls.append({
-                        'function': function_name,
-                        'arguments': next_action['function_call'].arguments,
-                        'result': tool_result
-                    })
-                    
-                    # Mark function as executed
-                    executed_functions.add(function_name)
-                    print(f"Executed: {function_name}")
+                # Execute new calls, answer repeated ones from the earlier result
+                new_calls = self._new_turn_calls(message.tool_calls, executed_calls)
+                new_results = self._execute_tool_calls(new_calls) if new_calls else []
+                tool_results = self._merge_turn_results(message.tool_calls, new_calls, new_results, executed_calls, tool_calls)
                 
-                # Small delay between actions
-                time.sleep(0.5)
+                messages.extend(self._tool_result_messages(message.tool_calls, tool_results))
             
-            # Step 3: Generate final response
-            final_response = self._generate_final_response(query, results, plan)
+            # Tool-call budget exhausted: ask for a final answer from what has been gathered
+            if final_response is None:
+                final_response = self._generate_final_response(messages, tools)
             
         except Exception as e:
             final_response = f"Autonomous execution encountered an error: {str(e)}"
         
         # Add to conversation history
-        self.conversation_manager.add_interaction(query, final_response, tool_calls)
+        self._record_interaction(query, final_response, tool_calls)
         
         return final_response
     
-    def _is_redundant_call(self, function_name, function_args, executed_functions):
-        """Check if a function call is redundant."""
-        # If function was already executed, it's redundant
-        if function_name in executed_functions:
-            return True
-        
-        # For web data calls, check if similar queries were already made
-        if function_name == "get_web_data":
-            query = function_args.get("query", "").lower()
-            # Check if we already have web data results that could answer this
-            # This is a simple check - in production you might want more sophisticated similarity detection
-            if "stock" in query and any("stock" in str(result).lower() for result in self.conversation_manager.conversation_history[-3:]):
-                return True
-        
-        return False
-    
-    def _create_execution_plan(self, query):
-        """Create an execution plan for complex tasks."""
-        planning_prompt = f"""
-        Task: {query}
-        
-        Available tools:
-        - get_web_data: Search the web for information (web scraping)
-        - open_any_url: Open a website in browser
-        - open_application: Open desktop applications
-        - get_system_stats: Get computer system information
-        - take_screenshot: Capture screen
-        - get_current_time: Get current time
-        - simple_calculator: Perform calculations
-        
-        Create a concise, efficient plan with 1-2 steps maximum. Be specific about which tool to use:
-        - Use get_web_data for searching/finding information
-        - Use open_any_url for opening specific websites
-        - Use open_application for launching desktop apps
-        
-        Avoid suggesting actions that don't match available tools.
-        """
-        
-        response = self.client.chat.completions.create(
-            model=OPENAI_SETTINGS['model'],
-            messages=[
-                {"role": "system", "content": "You are a task planning assistant. Create concise, efficient plans using only the available tools. Be precise about tool names and purposes."},
-                {"role": "user", "content": planning_prompt}
-            ],
-            max_tokens=200,
-            temperature=0.3
-        )
-        
-        return response.choices[0].message.content
+    def _call_key(self, function_call):
+        """Key identifying a tool call by function name and its raw arguments."""
+        return (function_call.name, (function_call.arguments or "{}").strip())
     
-    def _get_next_action(self, original_query, current_results, plan, executed_functions):
-        """Get the next action to execute in autonomous mode."""
-        context = f"Original query: {original_query}\nPlan: {plan}\nCurrent results: {current_results}\nExecuted functions: {list(executed_functions)}"
-        
-        # If we already have results, ask if we should complete
-        if current_results:
-            context += "\n\nYou already have results. Consider if the task is complete or if one more action is needed."
-        
-        response = self.client.chat.completions.create(
-            model=OPENAI_SETTINGS['model'],
-            messages=[
-                {"role": "system", "content": "You are an autonomous agent. Determine the next action. Avoid redundant calls. If the task seems complete, indicate completion."},
-                {"role": "user", "content": f"{context}\n\nWhat should I do next? Provide a function call or indicate completion."}
-            ],
-            functions=FUNCTIONS,
-            function_call="auto",
-            max_tokens=200,
-            temperature=0.5
-        )
-        
-        choice = response.choices[0]
-        
-        if choice.finish_reason == "function_call":
-            return {
-                'action': 'execute',
-                'function_call': choice.message.function_call
-            }
-        else:
-            return {
-                'action': 'complete',
-                'reason': choice.message.content
-            }
+    def _is_redundant_call(self, function_call, executed_calls):
+        """Check if the same function was already called with the same arguments."""
+        return self._call_key(function_call) in executed_calls
     
-    def _generate_final_response(self, query, results, plan):
-        """Generate a final response summarizing all results."""
-        if not results:
-            return "I couldn't complete the requested task."
-        
-        # Use the last result as the primary response
-        primary_result = results[-1]
-        
-        summary_prompt = f"""
-        Original query: {query}
-        Results: {primary_result}
+    def _new_turn_calls(self, message_tool_calls, executed_calls):
+        """Select the tool calls of an autonomous turn that have not been executed yet (deduplicated)."""
+        new_calls = {}
+        for tool_call in message_tool_calls:
+            key = self._call_key(tool_call.function)
+            if not self._is_redundant_call(tool_call.function, executed_calls) and key not in new_calls:
+                new_calls[key] = tool_call
+        return list(new_calls.values())
+    
+    def _merge_turn_results(self, message_tool_calls, new_calls, new_results, executed_calls, tool_calls):
+        """
+        Line up results for every tool call of an autonomous turn, recording the new ones.
         
-        Provide a concise, natural response based on the result.
-        Keep it brief and helpful.
+        Returns:
+            list: One result per call in message_tool_calls
         """
+        results_by_key = {self._call_key(tc.function): result for tc, result in zip(new_calls, new_results)}
         
-        response = self.client.chat.completions.create(
-            model=OPENAI_SETTINGS['model'],
-            messages=[
-                {"role": "system", "content": "You are Jarvis. Provide concise, helpful responses."},
-                {"role": "user", "content": summary_prompt}
-            ],
-            max_tokens=150,
-            temperature=0.7
-        )
+        tool_results = []
+        for tool_call in message_tool_calls:
+            key = self._call_key(tool_call.function)
+            if key in executed_calls:
+                print(f"Skipping redundant call to {tool_call.function.name}")
+                tool_results.append(f"(Already executed) {executed_calls[key]}")
+                continue
+            tool_result = results_by_key[key]
+            executed_calls[key] = tool_result
+            tool_results.append(tool_result)
+            tool_calls.extend(self._tool_call_records([tool_call], [tool_result]))
+            print(f"Executed: {tool_call.function.name}")
+        return tool_results
+    
+    def _create_execution_plan(self, messages, tools):
+        """Ask the model for a short plan in the same thread, without calling any tools."""
+        response = self._create_completion(self._plan_kwargs(messages, tools))
+        return response.choices[0].message.content
+    
+    def _generate_final_response(self, messages, tools):
+        """Generate a final response from the tool results gathered in the thread."""
+        if not any(message.get("role") == "tool" for message in messages):
+            return "I couldn't complete the requested task."
         
+        response = self._create_completion(self._follow_up_kwargs(messages, tools))
         return response.choices[0].message.content
     
     def _execute_function(self, function_call):
         """Execute a function call and return the result."""
         fn_name = function_call.name
-        arguments = json.loads(function_call.arguments)
         
         print(f"Calling function: {fn_name}")
         
-        if fn_name in FUNCTION_MAP:
-            try:
-                if fn_name == "get_web_data":
-                    print(f"Getting web data for: {arguments['query']}")
-                
-                # Execute the function with arguments
-                if fn_name == "get_current_time":
-                    return FUNCTION_MAP[fn_name]()
-                elif fn_name == "open_any_url":
-                    return FUNCTION_MAP[fn_name](arguments["url"])
-                elif fn_name == "simple_calculator":
-                    return FUNCTION_MAP[fn_name](arguments["expression"])
-                elif fn_name == "get_system_stats":
-                    return FUNCTION_MAP[fn_name]()
-                elif fn_name == "take_screenshot":
-                    filename = arguments.get("filename")
-                    return FUNCTION_MAP[fn_name](filename)
-                elif fn_name == "click_position":
-                    return FUNCTION_MAP[fn_name](arguments["x"], arguments["y"])
-                elif fn_name == "type_text":
-                    return FUNCTION_MAP[fn_name](arguments["text"])
-                elif fn_name == "press_key":
-                    return FUNCTION_MAP[fn_name](arguments["key"])
-                elif fn_name == "get_screen_size":
-                    return FUNCTION_MAP[fn_name]()
-                elif fn_name == "get_mouse_position":
-                    return FUNCTION_MAP[fn_name]()
-                elif fn_name == "scroll":
-                    direction = arguments["direction"]
-                    amount = arguments.get("amount", 3)
-                    return FUNCTION_MAP[fn_name](direction, amount)
-                elif fn_name == "close_active_window":
-                    return FUNCTION_MAP[fn_name]()
-                elif fn_name == "minimize_window":
-                    return FUNCTION_MAP[fn_name]()
-                elif fn_name == "get_running_apps":
-                    return FUNCTION_MAP[fn_name]()
-                elif fn_name == "copy_to_clipboard":
-                    return FUNCTION_MAP[fn_name](arguments["text"])
-                elif fn_name == "get_web_data":
-                    return FUNCTION_MAP[fn_name](arguments["query"])
-                elif fn_name == "open_system_settings":
-                    return FUNCTION_MAP[fn_name](arguments["setting_type"])
-                elif fn_name == "change_font_size":
-                    action = arguments.get("action", "increase")
-                    target_percentage = arguments.get("target_percentage")
-                    return FUNCTION_MAP[fn_name](action, target_percentage)
-                elif fn_name == "list_voices":
-                    return FUNCTION_MAP[fn_name]()
-                elif fn_name == "set_voice":
-                    voice_index = arguments.get("voice_index")
-                    voice_name = arguments.get("voice_name")
-                    return FUNCTION_MAP[fn_name](voice_index=voice_index, voice_name=voice_name)
-                elif fn_name == "list_chrome_profiles":
-                    return FUNCTION_MAP[fn_name]()
-                elif fn_name == "open_chrome_with_profile":
-                    profile_name = arguments.get("profile_name")
-                    profile_id = arguments.get("profile_id")
-                    return FUNCTION_MAP[fn_name](profile_name=profile_name, profile_id=profile_id)
-                elif fn_name == "open_application":
-                    app_name = arguments.get("app_name")
-                    profile_name = arguments.get("profile_name")
-                    return FUNCTION_MAP[fn_name](app_name, profile_name=profile_name)
-                else:
-                    return "Sorry, I don't know how to execute that function."
-                    
-            except Exception as e:
-                return f"Error executing {fn_name}: {str(e)}"
-        else:
+        if fn_name not in TOOL_DISPATCHER:
             return "Sorry, I don't know how to do that yet."
+        
+        try:
+            kwargs = TOOL_DISPATCHER.bind(fn_name, function_call.arguments)
+            hit, result = self._cached_result(fn_name, kwargs)
+            if hit:
+                return result
+            
+            result = TOOL_DISPATCHER.call(fn_name, kwargs)
+            self._cache_result(fn_name, kwargs, result)
+            return result
+        except ToolArgumentError as e:
+            return f"Invalid arguments for {fn_name}: {str(e)}"
+        except Exception as e:
+            return f"Error executing {fn_name}: {str(e)}"
     
-    def _refine_tool_response(self, original_query, tool_result):
-        """Take tool result and refine it through OpenAI for better response."""
+    def _cached_result(self, fn_name, kwargs):
+        """Look up a cached tool result. Returns (hit, result)."""
+        if not self.function_cache or not get_cache_policy(fn_name):
+            return False, None
+        hit, result = self.function_cache.get(FunctionCache.make_key(fn_name, kwargs))
+        if not hit and self.answer_cache is not None and fn_name in SEMANTIC_CACHE_SETTINGS['tools']:
+            # Fall back to a result for a similarly worded question
+            hit, result = self.answer_cache.get(fn_name, kwargs[SEMANTIC_CACHE_SETTINGS['tools'][fn_name]])
+        if hit:
+            print(f"Using cached result for {fn_name}")
+        return hit, result
+    
+    def _cache_result(self, fn_name, kwargs, result):
+        """Store a tool result if the tool's cache policy allows it."""
+        cache_policy = get_cache_policy(fn_name) if self.function_cache else None
+        # Tools report failures as text; don't keep those around
+        if cache_policy and not str(result).startswith(FAILURE_PREFIXES):
+            self.function_cache.set(FunctionCache.make_key(fn_name, kwargs), result, ttl=cache_policy['ttl'])
+            if self.answer_cache is not None and fn_name in SEMANTIC_CACHE_SETTINGS['tools']:
+                self.answer_cache.set(fn_name, kwargs[SEMANTIC_CACHE_SETTINGS['tools'][fn_name]], result)
+    
+    def _execute_tool_calls(self, tool_calls):
+        """
+        Execute the tool calls of one model turn and return their results in order.
+        
+        Read-only tools run concurrently on the tool executor; tools with side effects
+        run one after another in the order the model requested them.
+        """
+        if len(tool_calls) == 1 or not ADVANCED_AI_SETTINGS['enable_parallel_tool_calls']:
+            return [self._execute_function(tool_call.function) for tool_call in tool_calls]
+        
+        futures = {}
+        for i, tool_call in enumerate(tool_calls):
+            if tool_call.function.name in PARALLEL_SAFE_TOOLS:
+                futures[i] = self.tool_executor.submit(self._execute_function, tool_call.function)
+        
+        results = []
+        for i, tool_call in enumerate(tool_calls):
+            if i not in futures:
+                results.append(self._execute_function(tool_call.function))
+                continue
+            try:
+                results.append(futures[i].result(timeout=PERFORMANCE_SETTINGS['operation_timeout']))
+            except FutureTimeoutError:
+                results.append(f"Error executing {tool_call.function.name}: timed out")
+        return results
+    
+    def _tool_result_messages(self, tool_calls, tool_results):
+        """Build the assistant tool-call message and one tool message per result."""
+        messages = [{
+            "role": "assistant",
+            "content": None,
+            "tool_calls": [
+                {
+                    "id": tool_call.id,
+                    "type": "function",
+                    "function": {"name": tool_call.function.name, "arguments": tool_call.function.arguments}
+                }
+                for tool_call in tool_calls
+            ]
+        }]
+        for tool_call, tool_result in zip(tool_calls, tool_results):
+            messages.append({"role": "tool", "tool_call_id": tool_call.id, "content": str(tool_result)})
+        return messages
+    
+    def _render_tool_responses(self, tool_calls, tool_results):
+        """
+        Render tool results locally when every tool has a template response policy.
+        
+        Returns:
+            str or None: The rendered response, or None if the results need refinement
+        """
+        policies = [get_response_policy(tool_call.function.name) for tool_call in tool_calls]
+        if any(policy['mode'] != 'template' for policy in policies):
+            return None
+        return " ".join(self._render_tool_result(policy, tool_result) for policy, tool_result in zip(policies, tool_results))
+    
+    @staticmethod
+    def _render_tool_result(policy, tool_result):
+        """Fill a tool's response template; failures are spoken as they are, not as a result."""
+        if policy['mode'] != 'template' or str(tool_result).startswith(FAILURE_PREFIXES):
+            return str(tool_result)
+        return policy['template'].format(result=tool_result)
+    
+    def _refine_tool_response(self, messages, tools, tool_results):
+        """Send tool results back to OpenAI in a single follow-up turn for a natural response."""
         try:
             print("Refining response...")
             
-            refinement_prompt = f"""
-            Original user query: "{original_query}"
-            Tool result: "{tool_result}"
+            refinement_response = self._create_completion(self._follow_up_kwargs(messages, tools))
             
-            Please provide a refined, concise, and natural response based on the tool result. 
-            Make it sound like a helpful assistant speaking to the user.
-            Keep it as short as possible. between 10 and 20 words.
-            Do not include any other text or explanations.
-
-            """
+            refined_response = refinement_response.choices[0].message.content
+            return refined_response
             
-            refinement_response = self.client.chat.completions.create(
-                model=OPENAI_SETTINGS['model'],
-                messages=[
-                    {"role": "system", "content": "You are Jarvis, a helpful AI assistant. Provide concise, natural responses based on the given information."},
-                    {"role": "user", "content": refinement_prompt}
-                ],
-                max_tokens=150,  # Shorter for refinement
-                temperature=0.7
+        except Exception as e:
+            print(f"Error refining response: {e}")
+            # Fall back to original tool results if refinement fails
+            return " ".join(str(tool_result) for tool_result in tool_results)
+    
+    def _stream_refine_tool_response(self, messages, tools, tool_results):
+        """Streaming counterpart of _refine_tool_response. Yields sentences and returns the full text."""
+        print("Refining response...")
+        
+        content_parts = []
+        try:
+            stream = self._create_completion(self._follow_up_kwargs(messages, tools, stream=True))
+            
+            sentence_buffer = SentenceBuffer()
+            try:
+                for chunk in stream:
+                    self._record_usage(getattr(chunk, 'usage', None))
+                    if chunk.choices and chunk.choices[0].delta.content:
+                        content_parts.append(chunk.choices[0].delta.content)
+                        yield from sentence_buffer.feed(chunk.choices[0].delta.content)
+            finally:
+                self._close_stream(stream)
+            
+            remainder = sentence_buffer.flush()
+            if remainder:
+                yield remainder
+            
+        except Exception as e:
+            print(f"Error refining response: {e}")
+            # Nothing has been spoken yet, so fall back to the raw tool results
+            if not content_parts:
+                fallback = " ".join(str(tool_result) for tool_result in tool_results)
+                yield fallback
+                return fallback
+        
+        return "".join(content_parts)
+    
+    # ------------------------------------------------------------------
+    # Async API: same behaviour as the methods above, but model calls and
+    # network tools are awaited and blocking tools run on the tool executor,
+    # so a caller can overlap listening, thinking and tool I/O.
+    # ------------------------------------------------------------------
+    
+    @property
+    def async_client(self):
+        """AsyncOpenAI client for the running event loop, created on first use in that loop."""
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            import openai
+            client = self._async_clients[loop] = openai.AsyncOpenAI(
+                api_key=OPENAI_API_KEY, http_client=get_openai_async_http_client()
             )
+        return client
+    
+    async def _acreate_completion(self, kwargs):
+        """Async variant of _create_completion."""
+        response = await self.async_client.chat.completions.create(**kwargs)
+        self._record_usage(response.usage)
+        return response
+    
+    async def aprocess_query(self, query):
+        """
+        Async variant of process_query.
+        
+        Queries may be answered concurrently; each is recorded in the conversation
+        history in the order it arrived, not the order its answer finished.
+        """
+        turn = self.conversation_manager.begin_turn()
+        try:
+            return await self._aprocess_query(query)
+        finally:
+            self.conversation_manager.end_turn(turn)
+    
+    async def _aprocess_query(self, query):
+        """Answer one query (see aprocess_query)."""
+        try:
+            start = time.perf_counter()
+            match = self._match_locally(query)
+            if match is not None:
+                try:
+                    tool_result = await asyncio.wait_for(
+                        self._aexecute_function(SimpleNamespace(name=match.name, arguments=match.arguments)),
+                        PERFORMANCE_SETTINGS['operation_timeout']
+                    )
+                except asyncio.TimeoutError:
+                    tool_result = f"Error executing {match.name}: timed out"
+                return self._finish_local_route(query, match, tool_result, start)
             
-            refined_response = refinement_response.choices[0].message.content
-            return refined_response
+            cached_answer = self._cached_answer(query)
+            if cached_answer is not None:
+                return cached_answer
+            
+            print("Thinking...")
             
+            if self.conversation_manager.should_use_autonomous_mode(query):
+                return await self._aprocess_autonomous_query(query)
+            else:
+                return await self._aprocess_single_query(query)
+                
+        except Exception as e:
+            print(f"Error in AI processing: {e}")
+            return f"Sorry, I encountered an error: {str(e)}"
+    
+    async def _aprocess_single_query(self, query):
+        """Async variant of _process_single_query."""
+        messages, tools = self._build_messages(query)
+        
+        response = await self._acreate_completion(self._completion_kwargs(messages, tools))
+        
+        message = response.choices[0].message
+        tool_calls = []
+        
+        if message.tool_calls:
+            tool_results = await self._aexecute_tool_calls(message.tool_calls)
+            tool_calls.extend(self._tool_call_records(message.tool_calls, tool_results))
+            rendered = self._render_tool_responses(message.tool_calls, tool_results)
+            if rendered is not None:
+                final_response = rendered
+            else:
+                messages.extend(self._tool_result_messages(message.tool_calls, tool_results))
+                final_response = await self._arefine_tool_response(messages, tools, tool_results)
+        else:
+            final_response = message.content
+        
+        self._record_interaction(query, final_response, tool_calls)
+        
+        return final_response
+    
+    async def _aprocess_autonomous_query(self, query):
+        """Async variant of _process_autonomous_query."""
+        print("Autonomous mode: Working on complex task...")
+        
+        messages, tools = self._build_messages(query)
+        
+        tool_calls = []
+        executed_calls = {}
+        final_response = None
+        
+        try:
+            if self.conversation_manager.enable_planning:
+                response = await self._acreate_completion(self._plan_kwargs(messages, tools))
+                plan = response.choices[0].message.content
+                print(f"Plan: {plan}")
+                messages.append({"role": "assistant", "content": plan})
+            
+            for i in range(self.conversation_manager.max_tool_calls):
+                print(f"Autonomous execution step {i+1}...")
+                
+                response = await self._acreate_completion(self._completion_kwargs(messages, tools))
+                message = response.choices[0].message
+                
+                if not message.tool_calls:
+                    print("Autonomous execution completed.")
+                    final_response = message.content
+                    break
+                
+                new_calls = self._new_turn_calls(message.tool_calls, executed_calls)
+                new_results = await self._aexecute_tool_calls(new_calls) if new_calls else []
+                tool_results = self._merge_turn_results(message.tool_calls, new_calls, new_results, executed_calls, tool_calls)
+                
+                messages.extend(self._tool_result_messages(message.tool_calls, tool_results))
+            
+            if final_response is None:
+                if any(message.get("role") == "tool" for message in messages):
+                    response = await self._acreate_completion(self._follow_up_kwargs(messages, tools))
+                    final_response = response.choices[0].message.content
+                else:
+                    final_response = "I couldn't complete the requested task."
+            
+        except Exception as e:
+            final_response = f"Autonomous execution encountered an error: {str(e)}"
+        
+        self._record_interaction(query, final_response, tool_calls)
+        
+        return final_response
+    
+    async def _aexecute_function(self, function_call):
+        """
+        Async variant of _execute_function.
+        
+        Tools with a native coroutine in ASYNC_FUNCTION_MAP are awaited directly;
+        all others run on the tool executor.
+        """
+        fn_name = function_call.name
+        
+        print(f"Calling function: {fn_name}")
+        
+        if fn_name not in TOOL_DISPATCHER:
+            return "Sorry, I don't know how to do that yet."
+        
+        try:
+            kwargs = TOOL_DISPATCHER.bind(fn_name, function_call.arguments)
+            hit, result = self._cached_result(fn_name, kwargs)
+            if hit:
+                return result
+            
+            if fn_name in ASYNC_FUNCTION_MAP:
+                result = await ASYNC_FUNCTION_MAP[fn_name](**kwargs)
+            else:
+                loop = asyncio.get_running_loop()
+                result = await loop.run_in_executor(self.tool_executor, lambda: TOOL_DISPATCHER.call(fn_name, kwargs))
+            
+            self._cache_result(fn_name, kwargs, result)
+            return result
+        except ToolArgumentError as e:
+            return f"Invalid arguments for {fn_name}: {str(e)}"
+        except Exception as e:
+            return f"Error executing {fn_name}: {str(e)}"
+    
+    async def _aexecute_tool_calls(self, tool_calls):
+        """
+        Async variant of _execute_tool_calls.
+        
+        Read-only tools are awaited concurrently; tools with side effects run in order.
+        """
+        timeout = PERFORMANCE_SETTINGS['operation_timeout']
+        
+        async def run(tool_call):
+            try:
+                return await asyncio.wait_for(self._aexecute_function(tool_call.function), timeout)
+            except asyncio.TimeoutError:
+                return f"Error executing {tool_call.function.name}: timed out"
+        
+        if len(tool_calls) == 1 or not ADVANCED_AI_SETTINGS['enable_parallel_tool_calls']:
+            return [await run(tool_call) for tool_call in tool_calls]
+        
+        tasks = {
+            i: asyncio.ensure_future(run(tool_call))
+            for i, tool_call in enumerate(tool_calls)
+            if tool_call.function.name in PARALLEL_SAFE_TOOLS
+        }
+        
+        results = []
+        for i, tool_call in enumerate(tool_calls):
+            results.append(await tasks[i] if i in tasks else await run(tool_call))
+        return results
+    
+    async def _arefine_tool_response(self, messages, tools, tool_results):
+        """Async variant of _refine_tool_response."""
+        try:
+            print("Refining response...")
+            response = await self._acreate_completion(self._follow_up_kwargs(messages, tools))
+            return response.choices[0].message.content
         except Exception as e:
             print(f"Error refining response: {e}")
-            # Fall back to original tool result if refinement fails
-            return tool_result
+            return " ".join(str(tool_result) for tool_result in tool_results)
     
     def get_conversation_stats(self):
         """Get conversation statistics."""
-        return self.conversation_manager.get_execution_stats()
+        stats = self.conversation_manager.get_execution_stats()
+        stats['function_cache'] = self.function_cache.get_stats() if self.function_cache else None
+        stats['answer_cache'] = self.answer_cache.get_stats() if self.answer_cache else None
+        routed = self.router_stats['routed']
+        stats['local_router'] = {
+            'routed': routed,
+            'fell_through': self.router_stats['fell_through'],
+            'average_routed_ms': self.router_stats['total_routed_ms'] / routed if routed else 0.0
+        }
+        queries = self.tool_selection_stats['queries']
+        stats['tool_selection'] = {
+            'queries': queries,
+            'average_tools_offered': self.tool_selection_stats['tools_offered'] / queries if queries else 0.0,
+            'average_schema_tokens': self.tool_selection_stats['schema_tokens'] / queries if queries else 0.0,
+            'total_tools': len(TOOLS)
+        }
+        prompt_tokens = self.usage_stats['prompt_tokens']
+        stats['prompt_cache'] = dict(
+            self.usage_stats,
+            cached_token_rate=self.usage_stats['cached_tokens'] / prompt_tokens if prompt_tokens else 0.0,
+            recent_requests=list(self.usage_log)
+        )
+        stats['connections'] = get_connection_stats()
+        stats['web_single_flight'] = WEB_QUERIES.get_stats()
+        return stats
+    
+    def warm_up_prompts(self):
+        """Build the system prompt and tool schemas for common tool selections (loads the tokenizer too)."""
+        self._tool_prompt(self._select_tools(""))
+        self._tool_prompt(tuple(TOOLS_BY_NAME))
+    
+    def warm_up_connection(self):
+        """Open the connection to the OpenAI API ahead of the first query (DNS, TCP and TLS)."""
+        if not OPENAI_API_KEY:
+            return
+        # A small authenticated request; the pooled connection is then reused by the first query
+        self.client.with_options(timeout=PERFORMANCE_SETTINGS['startup_warmup_timeout']).models.retrieve(OPENAI_SETTINGS['model'])
+    
+    def persist_caches(self):
+        """Save the answer cache to disk, if persistence is configured."""
+        if self.answer_cache is not None:
+            self.answer_cache.save()
     
     def clear_conversation_history(self):
         """Clear conversation history."""
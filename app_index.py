@@ -0,0 +1,313 @@
+import bisect
+import difflib
+import json
+import os
+import platform
+import re
+import shlex
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from config import APP_INDEX_SETTINGS
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Desktop-entry Exec field codes (%f, %U, ...) are placeholders for files to open
+EXEC_FIELD_CODE = re.compile(r"\s*%[a-zA-Z]")
+
+# Keys derived from an application's display name count for less than the name itself
+NAME_SCORE, COMMAND_SCORE, DERIVED_SCORE = 3, 2, 1
+
+def normalize_name(text: str) -> str:
+    """Lowercase and drop everything but letters and digits ("VS Code" -> "vscode")."""
+    return "".join(WORD_PATTERN.findall(text.lower()))
+
+def name_keys(name: str) -> List[str]:
+    """
+    Lookup keys derived from an application name.
+
+    Besides the full name, leading words may be abbreviated to initials and leading
+    words dropped: "Visual Studio Code" gives "visualstudiocode", "vstudiocode",
+    "vscode", "vsc", "studiocode" and "code".
+    """
+    words = WORD_PATTERN.findall(name.lower())
+    keys = []
+    for split in range(1, len(words) + 1):
+        keys.append("".join(w[0] for w in words[:split]) + "".join(words[split:]))
+    for start in range(1, len(words)):
+        keys.append("".join(words[start:]))
+    return keys
+
+def default_sources(system: str) -> List[Tuple[str, int, str]]:
+    """(directory, max depth, kind) for the places applications are installed on this platform."""
+    home = os.path.expanduser("~")
+    if system == "Windows":
+        appdata = os.environ.get("APPDATA", os.path.join(home, "AppData", "Roaming"))
+        programdata = os.environ.get("PROGRAMDATA", "C:\\ProgramData")
+        return [
+            (os.path.join(appdata, "Microsoft", "Windows", "Start Menu", "Programs"), 3, "lnk"),
+            (os.path.join(programdata, "Microsoft", "Windows", "Start Menu", "Programs"), 3, "lnk"),
+            (os.path.join(home, "Desktop"), 0, "lnk"),
+            (os.path.join(home, "AppData", "Local", "Programs"), 2, "exe"),
+        ]
+    if system == "Darwin":
+        return [
+            ("/Applications", 1, "app"),
+            ("/System/Applications", 1, "app"),
+            (os.path.join(home, "Applications"), 1, "app"),
+        ]
+    data_home = os.environ.get("XDG_DATA_HOME", os.path.join(home, ".local", "share"))
+    return [
+        ("/usr/share/applications", 1, "desktop"),
+        ("/usr/local/share/applications", 1, "desktop"),
+        (os.path.join(data_home, "applications"), 1, "desktop"),
+        ("/var/lib/flatpak/exports/share/applications", 0, "desktop"),
+        (os.path.join(data_home, "flatpak", "exports", "share", "applications"), 0, "desktop"),
+        ("/var/lib/snapd/desktop/applications", 0, "desktop"),
+    ]
+
+def parse_desktop_entry(path: str) -> Optional[Dict[str, Any]]:
+    """Read the [Desktop Entry] group of a .desktop file; None if it isn't a visible application."""
+    fields = {}
+    in_entry = False
+    try:
+        with open(path, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["):
+                    if in_entry:
+                        break
+                    in_entry = line == "[Desktop Entry]"
+                elif in_entry and "=" in line:
+                    key, value = line.split("=", 1)
+                    fields.setdefault(key.strip(), value.strip())
+    except OSError:
+        return None
+
+    if (fields.get("Type") != "Application" or not fields.get("Name") or not fields.get("Exec")
+            or fields.get("NoDisplay") == "true" or fields.get("Hidden") == "true"):
+        return None
+    aliases = [fields[key] for key in ("GenericName",) if fields.get(key)]
+    aliases.extend(keyword for keyword in fields.get("Keywords", "").split(";") if keyword)
+    return {
+        'name': fields["Name"],
+        'target': EXEC_FIELD_CODE.sub("", fields["Exec"]).strip(),
+        'kind': "desktop",
+        'aliases': aliases
+    }
+
+def command_name(entry: Dict[str, Any]) -> str:
+    """The executable an entry launches, without directory or extension ("code", "firefox")."""
+    target = entry['target']
+    if entry['kind'] == "desktop":
+        try:
+            target = shlex.split(target)[0] if target else ""
+        except ValueError:
+            target = target.split()[0] if target.split() else ""
+    return os.path.splitext(os.path.basename(target))[0]
+
+class AppIndex:
+    """
+    Persistent index of launchable applications with fast fuzzy lookup.
+
+    Built from Start-menu shortcuts and install directories (Windows), .app bundles
+    (macOS) or freedesktop .desktop files (Linux). Every directory scanned is stored
+    with its mtime, so refresh() only lists directories whose contents changed since
+    the last scan; the rest costs one stat each. The index is saved to persist_path
+    and loaded at startup, so lookups never wait for a filesystem crawl.
+
+    Lookups go through a precomputed key table (full names, launch commands and
+    abbreviations such as "vscode" for "Visual Studio Code"), then a prefix match,
+    then difflib as a last resort.
+    """
+
+    def __init__(self, persist_path=None, sources=None, fuzzy_cutoff=0.8):
+        self.system = platform.system()
+        self.persist_path = persist_path
+        self.sources = sources if sources is not None else default_sources(self.system)
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self.directories: Dict[str, Dict[str, Any]] = {}  # path -> {'mtime', 'entries', 'subdirs'}
+        self._keys: Dict[str, Tuple[int, Dict[str, Any]]] = {}
+        self._sorted_keys: List[str] = []
+        self._refreshing = threading.Lock()
+        self.stats = {'lookups': 0, 'hits': 0, 'fuzzy_hits': 0, 'misses': 0, 'refreshes': 0,
+                      'directories_listed': 0, 'last_refresh_ms': 0.0, 'total_lookup_us': 0.0}
+
+    @property
+    def entries(self) -> List[Dict[str, Any]]:
+        """Every indexed application."""
+        return [entry for directory in self.directories.values() for entry in directory['entries']]
+
+    def _scan_files(self, path, kind):
+        """List one directory: its application entries and its subdirectories."""
+        entries, subdirs = [], []
+        with os.scandir(path) as items:
+            for item in items:
+                name = item.name
+                if kind == "app" and name.endswith(".app"):
+                    # Bundles are directories, but never descend into them
+                    entries.append({'name': name[:-4], 'target': item.path, 'kind': "app", 'aliases': []})
+                elif item.is_dir(follow_symlinks=False):
+                    subdirs.append(item.path)
+                elif kind == "desktop" and name.endswith(".desktop"):
+                    entry = parse_desktop_entry(item.path)
+                    if entry is not None:
+                        entries.append(entry)
+                elif kind in ("lnk", "exe") and name.lower().endswith("." + kind):
+                    stem = name[:-len(kind) - 1]
+                    if "uninstall" not in stem.lower():
+                        entries.append({'name': stem, 'target': item.path, 'kind': kind, 'aliases': []})
+        return entries, subdirs
+
+    def _refresh_directory(self, path, kind, depth, directories, listed):
+        """Reuse or rescan one directory (by mtime), then recurse into its subdirectories."""
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return
+        record = self.directories.get(path)
+        if record is None or record['mtime'] != mtime:
+            try:
+                entries, subdirs = self._scan_files(path, kind)
+            except OSError:
+                return
+            record = {'mtime': mtime, 'entries': entries, 'subdirs': subdirs}
+            listed.append(path)
+        directories[path] = record
+        if depth > 0:
+            for subdir in record['subdirs']:
+                self._refresh_directory(subdir, kind, depth - 1, directories, listed)
+
+    def refresh(self):
+        """
+        Bring the index up to date, listing only directories that changed.
+
+        Returns:
+            int: Number of directories that had to be listed
+        """
+        with self._refreshing:
+            start = time.perf_counter()
+            directories, listed = {}, []
+            for path, depth, kind in self.sources:
+                self._refresh_directory(path, kind, depth, directories, listed)
+            changed = bool(listed) or directories.keys() != self.directories.keys()
+            self.directories = directories
+            if changed or not self._keys:
+                self._build_keys()
+            self.stats['refreshes'] += 1
+            self.stats['directories_listed'] += len(listed)
+            self.stats['last_refresh_ms'] = (time.perf_counter() - start) * 1000
+        if changed:
+            self.save()
+        return len(listed)
+
+    def refresh_in_background(self):
+        """Start refresh() on a background thread unless one is already running."""
+        if self._refreshing.locked():
+            return
+        threading.Thread(target=self.refresh, name="jarvis-app-index", daemon=True).start()
+
+    def _build_keys(self):
+        """Rebuild the lookup table: each key maps to its best-scoring entry."""
+        keys = {}
+
+        def add(key, score, entry):
+            if key and (key not in keys or keys[key][0] < score):
+                keys[key] = (score, entry)
+
+        for entry in self.entries:
+            add(normalize_name(entry['name']), NAME_SCORE, entry)
+            add(normalize_name(command_name(entry)), COMMAND_SCORE, entry)
+            for alias in entry['aliases']:
+                add(normalize_name(alias), DERIVED_SCORE, entry)
+            for key in name_keys(entry['name']):
+                add(key, DERIVED_SCORE, entry)
+        self._keys = keys
+        self._sorted_keys = sorted(keys)
+
+    def lookup(self, name: str) -> Optional[Dict[str, Any]]:
+        """Find the application best matching a spoken name, or None."""
+        start = time.perf_counter()
+        key = normalize_name(name)
+        self.stats['lookups'] += 1
+        match = self._keys.get(key)
+        if match is None and len(key) >= 3:
+            # Prefix ("spot" -> "spotify"): the first completion in sorted order
+            position = bisect.bisect_left(self._sorted_keys, key)
+            if position < len(self._sorted_keys) and self._sorted_keys[position].startswith(key):
+                match = self._keys[self._sorted_keys[position]]
+        if match is not None:
+            self.stats['hits'] += 1
+        elif key:
+            close = difflib.get_close_matches(key, self._sorted_keys, n=1, cutoff=self.fuzzy_cutoff)
+            if close:
+                match = self._keys[close[0]]
+                self.stats['fuzzy_hits'] += 1
+        if match is None:
+            self.stats['misses'] += 1
+        self.stats['total_lookup_us'] += (time.perf_counter() - start) * 1e6
+        return match[1] if match is not None else None
+
+    def save(self):
+        """Write the index to persist_path (atomically)."""
+        if not self.persist_path:
+            return
+        try:
+            directory = os.path.dirname(os.path.abspath(self.persist_path))
+            os.makedirs(directory, exist_ok=True)
+            temp_path = self.persist_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({'system': self.system, 'directories': self.directories}, f)
+            os.replace(temp_path, self.persist_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Could not save application index: {e}")
+
+    def load(self):
+        """Load the index saved by a previous run. Returns True if there was one."""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return False
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not load application index: {e}")
+            return False
+        if data.get('system') != self.system:
+            return False
+        self.directories = data.get('directories', {})
+        self._build_keys()
+        return True
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lookup counters, index size and refresh cost."""
+        lookups = self.stats['lookups']
+        return dict(
+            self.stats,
+            applications=sum(len(d['entries']) for d in self.directories.values()),
+            directories=len(self.directories),
+            average_lookup_us=self.stats['total_lookup_us'] / lookups if lookups else 0.0
+        )
+
+_app_index = None
+_app_index_lock = threading.Lock()
+
+def get_app_index() -> AppIndex:
+    """
+    The process-wide AppIndex, loaded from disk on first use.
+
+    Without a saved index, the first build runs in the background; lookups miss until
+    it is done rather than waiting for it.
+    """
+    global _app_index
+    if _app_index is None:
+        with _app_index_lock:
+            if _app_index is None:
+                index = AppIndex(
+                    persist_path=APP_INDEX_SETTINGS['persist_path'],
+                    sources=default_sources(platform.system()) + [tuple(source) for source in APP_INDEX_SETTINGS['extra_sources']],
+                    fuzzy_cutoff=APP_INDEX_SETTINGS['fuzzy_cutoff']
+                )
+                if not index.load():
+                    index.refresh_in_background()
+                _app_index = index
+    return _app_index
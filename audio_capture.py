@@ -0,0 +1,286 @@
+import threading
+import time
+import numpy as np
+import pyaudio
+import speech_recognition as sr
+
+SAMPLE_WIDTH = 2  # 16-bit mono PCM
+MAX_READ_ERRORS = 5  # Consecutive failed reads before the device is considered gone
+
+class AudioCapture:
+    """
+    Long-lived microphone capture into a fixed-size ring buffer.
+
+    One PyAudio stream is opened at start() and read by a background thread for the
+    lifetime of the process, so nothing is lost between utterances and no stream is
+    opened per utterance. Readers keep their own position (a count of samples since
+    start) and read forward from it.
+
+    Audio captured while muted (e.g. while Jarvis is speaking) is skipped by readers,
+    so the assistant doesn't transcribe its own voice.
+
+    If the device stops delivering audio (e.g. an unplugged headset), capture moves to
+    the default input device without readers noticing: the ring buffer and positions
+    carry on across the switch.
+    """
+
+    def __init__(self, device_index=None, sample_rate=16000, chunk=1024, buffer_seconds=30):
+        self.device_index = device_index
+        self.sample_rate = sample_rate
+        self.chunk = chunk
+        self.buffer_seconds = buffer_seconds
+        self.capacity = int(sample_rate * buffer_seconds)
+        self.buffer = np.zeros(self.capacity, dtype=np.int16)
+
+        self.written = 0  # Total samples captured since start
+        self.overruns = 0  # Samples a reader lost because it fell more than a buffer behind
+        self._muted_from = None
+        self._muted_ranges = []  # (start, end) sample positions readers skip
+        self._condition = threading.Condition()
+
+        self._audio = None
+        self._stream = None
+        self._thread = None
+        self._running = False
+        self._switch_to = None  # (device_index,) requested by switch_device()
+        self.failovers = 0
+
+    def start(self):
+        """Open the input stream and start the capture thread."""
+        self._audio = pyaudio.PyAudio()
+        try:
+            self._stream = self._open_stream(self.sample_rate)
+        except (OSError, ValueError):
+            # Some devices can't capture at the requested rate; use the device default instead
+            info = (self._audio.get_device_info_by_index(self.device_index) if self.device_index is not None
+                    else self._audio.get_default_input_device_info())
+            self.sample_rate = int(info['defaultSampleRate'])
+            self.capacity = int(self.sample_rate * self.buffer_seconds)
+            self.buffer = np.zeros(self.capacity, dtype=np.int16)
+            self._stream = self._open_stream(self.sample_rate)
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="jarvis-capture", daemon=True)
+        self._thread.start()
+
+    def _open_stream(self, sample_rate):
+        """Open a 16-bit mono input stream on the configured device."""
+        return self._audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=sample_rate,
+            input=True,
+            input_device_index=self.device_index,
+            frames_per_buffer=self.chunk
+        )
+
+    def switch_device(self, device_index):
+        """
+        Move capture to another input device (None = default) without interrupting readers.
+        Switching to the current device reopens it with a fresh PortAudio instance.
+        """
+        self._switch_to = (device_index,)
+
+    def _reopen(self, device_index):
+        """Close the current stream and open one on device_index (capture thread only)."""
+        try:
+            self._stream.close()
+        except OSError:
+            pass
+        # A fresh PortAudio instance sees devices plugged in or removed since start()
+        self._audio.terminate()
+        self._audio = pyaudio.PyAudio()
+        self.device_index = device_index
+        self._stream = self._open_stream(self.sample_rate)
+
+    def _run(self):
+        """Capture thread: copy each chunk into the ring buffer and wake waiting readers."""
+        errors = 0
+        while self._running:
+            if self._switch_to is not None:
+                (device_index,), self._switch_to = self._switch_to, None
+                previous = self.device_index
+                try:
+                    self._reopen(device_index)
+                    if device_index != previous:
+                        print(f"Audio capture switched to {'the default microphone' if device_index is None else f'device {device_index}'}.")
+                    errors = 0
+                except (OSError, ValueError) as e:
+                    print(f"Could not open microphone: {e}; retrying...")
+                    if self._switch_to is None:
+                        self._switch_to = (device_index,)
+                    time.sleep(1)
+                    continue
+
+            try:
+                data = self._stream.read(self.chunk, exception_on_overflow=False)
+                errors = 0
+            except OSError as e:
+                print(f"Audio capture error: {e}")
+                errors += 1
+                if errors >= MAX_READ_ERRORS:
+                    # The device is gone; fall back to the default microphone (retrying until one opens)
+                    self.failovers += 1
+                    self._switch_to = (None,)
+                    time.sleep(0.2)
+                continue
+            samples = np.frombuffer(data, dtype=np.int16)
+
+            start = self.written % self.capacity
+            end = start + len(samples)
+            if end <= self.capacity:
+                self.buffer[start:end] = samples
+            else:
+                split = self.capacity - start
+                self.buffer[start:] = samples[:split]
+                self.buffer[:end - self.capacity] = samples[split:]
+
+            with self._condition:
+                self.written += len(samples)
+                self._condition.notify_all()
+
+    @property
+    def position(self):
+        """Number of samples captured so far (the position of the next sample)."""
+        return self.written
+
+    def is_quiet(self, seconds, energy_threshold):
+        """Whether the last seconds of captured audio stayed below energy_threshold (RMS)."""
+        with self._condition:
+            count = min(int(self.sample_rate * seconds), self.written, self.capacity)
+            if count == 0:
+                return True
+            samples = self._copy(self.written - count, count)
+        return float(np.sqrt(np.mean(samples.astype(np.float64) ** 2))) < energy_threshold
+
+    def mute(self):
+        """Start skipping captured audio (until unmute())."""
+        with self._condition:
+            if self._muted_from is None:
+                self._muted_from = self.written
+
+    def unmute(self, at=None):
+        """
+        Stop skipping captured audio.
+
+        Args:
+            at: Position where skipping ends (default: now). An earlier position hands
+                audio captured since then back to readers, e.g. speech that interrupted TTS.
+        """
+        with self._condition:
+            if self._muted_from is not None:
+                end = self.written if at is None else max(self._muted_from, min(at, self.written))
+                self._muted_ranges.append((self._muted_from, end))
+                self._muted_from = None
+                self._condition.notify_all()
+
+    def _readable_end(self, position, skip_muted=True):
+        """Position up to which a reader at position may read right now (caller holds the condition)."""
+        if not skip_muted:
+            return self.written
+        end = self.written if self._muted_from is None else min(self.written, self._muted_from)
+        for range_start, _ in self._muted_ranges:
+            if range_start > position:
+                return min(end, range_start)
+        return end
+
+    def _skip_muted(self, position):
+        """Move a read position past any muted range it falls in (caller holds the condition)."""
+        while self._muted_ranges and self._muted_ranges[0][1] <= position:
+            # Ranges are ordered; drop the ones the reader is already past
+            self._muted_ranges.pop(0)
+        if self._muted_ranges and self._muted_ranges[0][0] <= position:
+            position = self._muted_ranges.pop(0)[1]
+        return position
+
+    def _copy(self, position, count):
+        """Copy count samples starting at position out of the ring buffer."""
+        start = position % self.capacity
+        end = start + count
+        if end <= self.capacity:
+            return self.buffer[start:end].copy()
+        return np.concatenate((self.buffer[start:], self.buffer[:end - self.capacity]))
+
+    def read(self, position, count, timeout=None, skip_muted=True):
+        """
+        Read count samples starting at position, waiting for them to be captured.
+
+        Readers that must hear everything (e.g. barge-in detection while Jarvis is
+        speaking) pass skip_muted=False.
+
+        Returns:
+            tuple: (samples as int16 array, position after the samples). Fewer than count
+                   samples are returned only on timeout or when capture stops.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        pieces = []
+        remaining = count
+        with self._condition:
+            while remaining > 0:
+                if skip_muted:
+                    position = self._skip_muted(position)
+                if self.written - position > self.capacity:
+                    self.overruns += self.written - position - self.capacity
+                    position = self.written - self.capacity
+
+                available = self._readable_end(position, skip_muted) - position
+                if available <= 0:
+                    wait = None if deadline is None else deadline - time.monotonic()
+                    if not self._running or (wait is not None and wait <= 0):
+                        break
+                    self._condition.wait(wait)
+                    continue
+
+                taken = min(remaining, available)
+                pieces.append(self._copy(position, taken))
+                position += taken
+                remaining -= taken
+
+        samples = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.int16)
+        return samples, position
+
+    def stop(self):
+        """Stop capturing and close the stream."""
+        self._running = False
+        with self._condition:
+            self._condition.notify_all()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+        if self._stream is not None:
+            self._stream.stop_stream()
+            self._stream.close()
+        if self._audio is not None:
+            self._audio.terminate()
+
+class CaptureStream:
+    """File-like stream over an AudioCapture that remembers where it stopped reading."""
+
+    def __init__(self, capture: AudioCapture):
+        self.capture = capture
+        self.position = capture.position
+
+    def read(self, size):
+        """Read size frames of 16-bit PCM, blocking until they have been captured."""
+        samples, self.position = self.capture.read(self.position, size)
+        return samples.tobytes()
+
+class CaptureSource(sr.AudioSource):
+    """
+    speech_recognition audio source backed by the shared capture ring buffer.
+
+    Entering it doesn't open anything: the stream is already running, and reading
+    resumes where the previous utterance ended.
+    """
+
+    def __init__(self, capture: AudioCapture):
+        self.capture = capture
+        self.SAMPLE_RATE = capture.sample_rate
+        self.SAMPLE_WIDTH = SAMPLE_WIDTH
+        self.CHUNK = capture.chunk
+        self.stream = CaptureStream(capture)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
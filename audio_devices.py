@@ -0,0 +1,241 @@
+import platform
+import threading
+import time
+import pyaudio
+from config import AUDIO_SETTINGS
+
+# Rescans of a hardware change that PortAudio doesn't show before it is taken as
+# one that doesn't affect the device list (e.g. a sound card without PCM devices)
+MAX_STALE_RESCANS = 12
+
+# Without a hardware fingerprint a change is never known to be pending, so release
+# callbacks are only asked to reopen devices every this many rescans
+BLIND_RELEASE_EVERY = 6
+
+class AudioDeviceManager:
+    """
+    Cached audio device enumeration with hot-plug detection.
+
+    Devices are enumerated with a single PyAudio instance and kept until a rescan.
+    A monitor thread checks for added or removed devices every rescan_interval
+    seconds and notifies listeners with the new device list. On Linux the check
+    only compares /proc/asound/cards, so PortAudio is re-initialized only when
+    something actually changed. Elsewhere the monitor re-enumerates each interval,
+    off the listening path.
+
+    PortAudio only picks up device changes once every PyAudio instance in the
+    process has been terminated. Streams that are still open (e.g. the microphone
+    capture) keep the old list alive until they are reopened, so a hardware change
+    the rescan can't see yet stays pending: release callbacks are asked to reopen
+    their PyAudio instances and the rescan is retried every interval until it shows.
+    """
+
+    def __init__(self, rescan_interval=5.0):
+        self.rescan_interval = rescan_interval
+        self.devices = None
+        self.default_input_index = None
+        self.default_output_index = None
+        self._signature = None
+        self._stale_checks = 0
+        self._blind_checks = 0
+        self._listeners = []
+        self._release_callbacks = []
+        self._lock = threading.Lock()
+        self._monitor = None
+        self._running = False
+        self.stats = {'scans': 0, 'changes': 0, 'stale_rescans': 0, 'last_scan_ms': 0.0}
+
+    def _scan(self):
+        """Enumerate every device with one PyAudio instance."""
+        start = time.perf_counter()
+        devices = []
+        default_input = default_output = None
+        p = pyaudio.PyAudio()
+        try:
+            for i in range(p.get_device_count()):
+                device_info = p.get_device_info_by_index(i)
+                devices.append({
+                    'index': i,
+                    'name': device_info['name'],
+                    'input_channels': device_info['maxInputChannels'],
+                    'output_channels': device_info['maxOutputChannels'],
+                    'sample_rate': int(device_info['defaultSampleRate'])
+                })
+            try:
+                default_input = p.get_default_input_device_info()['index']
+            except (IOError, OSError):
+                pass
+            try:
+                default_output = p.get_default_output_device_info()['index']
+            except (IOError, OSError):
+                pass
+        finally:
+            p.terminate()
+
+        with self._lock:
+            self.devices = devices
+            self.default_input_index = default_input
+            self.default_output_index = default_output
+            self.stats['scans'] += 1
+            self.stats['last_scan_ms'] = (time.perf_counter() - start) * 1000
+        return devices
+
+    def refresh(self):
+        """Re-enumerate devices now. Returns True if the device list changed."""
+        previous = self.devices
+        try:
+            devices = self._scan()
+        except Exception as e:
+            print(f"Error listing audio devices: {e}")
+            return False
+        changed = previous is not None and self._names(previous) != self._names(devices)
+        if changed:
+            self.stats['changes'] += 1
+        return changed
+
+    @staticmethod
+    def _names(devices):
+        """What identifies a device list across rescans (indices shift when devices come and go)."""
+        return sorted((d['name'], d['input_channels'] > 0, d['output_channels'] > 0) for d in devices)
+
+    def get_devices(self):
+        """All devices (enumerated on first use, then cached)."""
+        if self.devices is None:
+            self.refresh()
+        return list(self.devices or [])
+
+    def input_devices(self):
+        """Devices with input channels (microphones)."""
+        return [
+            {'index': d['index'], 'name': d['name'], 'channels': d['input_channels'], 'sample_rate': d['sample_rate']}
+            for d in self.get_devices() if d['input_channels'] > 0
+        ]
+
+    def output_devices(self):
+        """Devices with output channels (speakers)."""
+        return [
+            {'index': d['index'], 'name': d['name'], 'channels': d['output_channels'], 'sample_rate': d['sample_rate']}
+            for d in self.get_devices() if d['output_channels'] > 0
+        ]
+
+    def unique_input_devices(self):
+        """Input devices deduplicated by (whitespace-normalized) name, first occurrence kept."""
+        seen_names = set()
+        unique_devices = []
+        for device in self.input_devices():
+            normalized_name = ' '.join(device['name'].split())
+            if normalized_name not in seen_names:
+                seen_names.add(normalized_name)
+                unique_devices.append(device)
+        return unique_devices
+
+    def get_device(self, index):
+        """Cached info for a device index, or None."""
+        return next((d for d in self.get_devices() if d['index'] == index), None)
+
+    def find_input_device(self, name):
+        """Current index of the input device with this name, or None if it isn't connected."""
+        for device in self.input_devices():
+            if device['name'] == name:
+                return device['index']
+        return None
+
+    @staticmethod
+    def _read_signature():
+        """Cheap fingerprint of the connected sound hardware, or None if the platform has none."""
+        if platform.system() != "Linux":
+            return None
+        try:
+            with open("/proc/asound/cards") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def add_listener(self, callback):
+        """Call callback(devices) whenever the device list changes."""
+        self._listeners.append(callback)
+
+    def add_release_callback(self, callback):
+        """
+        Call callback() when the hardware changed but PortAudio still reports the old
+        device list (or, without a hardware fingerprint, every BLIND_RELEASE_EVERY
+        rescans in case it does), so the owner of an open PyAudio instance can reopen it.
+        """
+        self._release_callbacks.append(callback)
+
+    def start_monitor(self):
+        """Start checking for added/removed devices in the background."""
+        if self._monitor is not None or not self.rescan_interval:
+            return
+        self._signature = self._read_signature()
+        self._running = True
+        self._monitor = threading.Thread(target=self._monitor_loop, name="jarvis-devices", daemon=True)
+        self._monitor.start()
+
+    def _monitor_loop(self):
+        """Monitor thread: check for hardware changes every rescan_interval seconds."""
+        while self._running:
+            time.sleep(self.rescan_interval)
+            self.check_for_changes()
+
+    def check_for_changes(self):
+        """
+        Rescan if the hardware changed and notify listeners of the new device list.
+
+        The new hardware signature is only recorded once the rescan shows the change
+        (or after MAX_STALE_RESCANS attempts); until then every check rescans again.
+
+        Returns:
+            bool: True if listeners were notified
+        """
+        signature = self._read_signature()
+        if signature is not None and signature == self._signature:
+            self._stale_checks = 0
+            return False
+        if not self.refresh():
+            if signature is None:
+                # No hardware fingerprint: an open instance may be hiding a change
+                self._blind_checks += 1
+                if self._blind_checks % BLIND_RELEASE_EVERY == 0:
+                    self._notify(self._release_callbacks)
+                return False
+            self._stale_checks += 1
+            self.stats['stale_rescans'] += 1
+            if self._stale_checks >= MAX_STALE_RESCANS:
+                self._signature = signature
+                self._stale_checks = 0
+            else:
+                # PortAudio is still serving the old list from an open instance
+                self._notify(self._release_callbacks)
+            return False
+        self._signature = signature
+        self._stale_checks = 0
+        self._notify(self._listeners, self.get_devices())
+        return True
+
+    @staticmethod
+    def _notify(callbacks, *args):
+        """Call each callback, reporting (not raising) errors."""
+        for callback in list(callbacks):
+            try:
+                callback(*args)
+            except Exception as e:
+                print(f"Error handling audio device change: {e}")
+
+    def stop_monitor(self):
+        """Stop the monitor thread."""
+        self._running = False
+        self._monitor = None
+
+    def get_stats(self):
+        """Get scan count, device changes seen and the last enumeration time."""
+        return dict(self.stats, devices=len(self.devices or []))
+
+_device_manager = None
+
+def get_device_manager():
+    """The process-wide AudioDeviceManager (created on first use)."""
+    global _device_manager
+    if _device_manager is None:
+        _device_manager = AudioDeviceManager(AUDIO_SETTINGS['device_rescan_interval'])
+    return _device_manager
@@ -19,7 +19,16 @@ RECOGNITION_SETTINGS = {
     'energy_threshold': 100,
     'dynamic_energy_threshold': False,
     'pause_threshold': 0.8,  # Increased pause threshold for longer phrases
-    'operation_timeout': None
+    'operation_timeout': None,
+    'endpointing': 'vad',  # 'vad' (NumPy voice activity detection, ends ~250 ms after speech) or 'energy' (pause_threshold)
+    'vad_frame_ms': 20,  # VAD frame length (10-30 ms)
+    'vad_margin_db': 9.0,  # How far above the adaptive noise floor a frame must be to count as speech
+    'vad_min_band_ratio': 0.5,  # Minimum share of frame energy in the 300-3400 Hz speech band
+    'vad_onset_ms': 60,  # Consecutive speech needed to start an utterance
+    'vad_hangover_ms': 250,  # Silence that ends an utterance
+    'vad_preroll_ms': 300,  # Audio kept from before the detected start
+    'backend': 'google',  # 'google' (online) or 'vosk' (offline, streams partial transcripts; pip install vosk)
+    'vosk_model_path': None  # Path to an unpacked Vosk model directory (required for the 'vosk' backend)
 }
 
 # Speech Listening Settings
@@ -28,11 +37,52 @@ LISTENING_SETTINGS = {
     'phrase_time_limit': 15  # Increased from 6 to 15 seconds for longer commands
 }
 
+# Wake Word Settings
+# When enabled, audio only goes to speech recognition after the wake word is heard on-device
+WAKE_WORD_SETTINGS = {
+    'enabled': False,
+    'engine': 'vosk',  # 'vosk' (one-word grammar; pip install vosk) or 'porcupine' (pip install pvporcupine)
+    'keyword': 'jarvis',
+    'sensitivity': 0.5,  # 0-1; higher detects more readily but triggers more false positives
+    'vosk_model_path': None,  # None = use RECOGNITION_SETTINGS['vosk_model_path']
+    'porcupine_access_key': os.getenv("PORCUPINE_ACCESS_KEY")
+}
+
+# Speculative Request Settings
+# With a recognizer that reports partial transcripts, the first model turn starts while the
+# user is still speaking and is kept if the final transcript matches
+SPECULATION_SETTINGS = {
+    'enabled': True,
+    'stable_partials': 3,  # Consecutive identical partial transcripts before speculating
+    'min_words': 2  # Don't speculate on shorter partial transcripts
+}
+
 AUDIO_SETTINGS = {
     'mic_device_index': None,  # None = default, or set to a specific device index
     'auto_select_device': True,  # If True, prompts user to select device on startup
     'tts_delay_after_speak': 0.3,  # Delay in seconds after TTS completes before resuming listening
-    'audio_output_device_index': None  # Optional: specify output device index
+    'audio_output_device_index': None,  # Optional: specify output device index
+    'persistent_capture': True,  # Keep one microphone stream open and capture continuously into a ring buffer
+    'capture_sample_rate': 16000,  # Capture rate in Hz (falls back to the device default if unsupported)
+    'capture_chunk': 1024,  # Samples per read from the microphone
+    'capture_buffer_seconds': 30,  # Ring buffer length; audio older than this is dropped if not yet processed
+    'device_rescan_interval': 5.0,  # Seconds between checks for plugged/unplugged audio devices (0 = never)
+    'barge_in': True,  # Stop speaking as soon as the user talks over Jarvis (needs persistent_capture)
+    'barge_in_margin_db': 18.0,  # Speech must be this far above the noise floor; higher than vad_margin_db so Jarvis's own voice doesn't trigger it
+    'barge_in_onset_ms': 150  # Sustained speech needed before interrupting
+}
+
+# Phrase Audio Cache Settings
+# Rendered speech for repeated phrases is kept in memory and played without the TTS engine
+PHRASE_CACHE_SETTINGS = {
+    'enabled': True,
+    'max_bytes': 8 * 1024 * 1024,  # Total PCM kept in memory (LRU eviction)
+    'min_uses': 2,  # Times a phrase must be spoken before it is cached ("Opened Chrome", ...)
+    'prerender': [  # Rendered at startup so they play instantly the first time
+        "Yes, sir? How can I help you?",
+        "Conversation history cleared.",
+        "Shutting down Jarvis. Goodbye!"
+    ]
 }
 
 # Browser Settings
@@ -57,6 +107,15 @@ APPLICATION_PATHS = {
     # Add more as needed
 }
 
+# Application Index Settings
+# Launchable applications are indexed once and kept on disk, so "open X" never crawls the filesystem
+APP_INDEX_SETTINGS = {
+    'enabled': True,
+    'persist_path': os.path.join(os.path.expanduser("~"), ".jarvis", "app_index.json"),
+    'fuzzy_cutoff': 0.8,  # Minimum difflib similarity for a fuzzy name match
+    'extra_sources': []  # Additional (directory, max_depth, kind) to index; kind is 'lnk', 'exe', 'desktop' or 'app'
+}
+
 # Automation Settings
 AUTOMATION_SETTINGS = {
     'default_delay': 0.1,  # Default delay between actions (seconds)
@@ -91,11 +150,32 @@ SYSTEM_INTEGRATION = {
 
 # Performance Settings
 PERFORMANCE_SETTINGS = {
-    'max_concurrent_operations': 3,  # Maximum concurrent operations
+    'max_concurrent_operations': 3,  # Maximum concurrent operations (size of the tool-call thread pool)
     'operation_timeout': 30,  # Timeout for operations (seconds)
     'cache_enabled': True,  # Enable caching for frequently accessed data
     'cache_ttl': 300,  # Cache time-to-live (seconds)
-    'enable_async_operations': False  # Enable async operations (experimental)
+    'cache_max_entries': 128,  # Maximum number of cached function results (LRU eviction)
+    'enable_async_operations': False,  # Asyncio main loop: keep listening while answering (experimental)
+    'startup_warmup': True,  # Warm up TTS, microphone, connections and tool indexes concurrently at startup
+    'startup_warmup_timeout': 10.0  # Seconds to wait for warm-up before listening anyway (the rest finishes in the background)
+}
+
+# Semantic Answer Cache Settings
+# Web lookups and final answers are reused for differently worded versions of the same question
+SEMANTIC_CACHE_SETTINGS = {
+    'enabled': True,
+    'similarity_threshold': 0.8,  # Minimum Jaccard similarity of content words to count as the same question
+    'max_entries': 256,  # Entries across all namespaces (LRU eviction)
+    'default_ttl': 6 * 3600,  # Seconds an answer stays fresh when no freshness rule matches
+    'freshness_rules': [  # (keywords, ttl seconds); the first rule with a keyword in the question wins
+        (['score', 'stock', 'price', 'live', 'breaking', 'traffic'], 300),
+        (['weather', 'forecast', 'temperature', 'news', 'latest', 'tonight', 'tomorrow'], 1800),
+        (['capital', 'define', 'definition', 'meaning', 'history', 'invented', 'born', 'wrote'], 7 * 24 * 3600)
+    ],
+    'tools': {'get_web_data': 'query'},  # Tools looked up by similarity, and the argument holding their question
+    'answer_tools': ['get_web_data'],  # Final answers are cached only when they used nothing but these tools
+    'persist_path': None,  # JSON file to keep the cache across restarts (None = memory only)
+    'save_interval': 30  # Minimum seconds between saves to persist_path
 }
 
 # UI/UX Settings
@@ -110,13 +190,16 @@ UI_SETTINGS = {
 
 # Advanced AI Settings
 ADVANCED_AI_SETTINGS = {
-    'enable_streaming': False,  # Enable streaming responses (if supported)
+    'enable_streaming': True,  # Stream responses and speak them sentence by sentence
+    'stream_min_sentence_chars': 20,  # Merge shorter fragments into the next sentence before speaking
     'enable_function_caching': True,  # Cache function results
     'max_function_depth': 5,  # Maximum nested function calls
-    'enable_parallel_tool_calls': False,  # Enable parallel tool execution
+    'enable_parallel_tool_calls': True,  # Allow several tool calls per model turn and run independent ones concurrently
     'tool_call_retry_on_failure': True,  # Retry failed tool calls
     'enable_smart_retry': True,  # Use AI to determine if retry is needed
-    'response_optimization': True  # Optimize responses for speed
+    'response_optimization': True,  # Optimize responses for speed
+    'enable_local_router': True,  # Answer common commands ("what time is it", "scroll down") without calling OpenAI
+    'local_router_min_confidence': 0.85  # Minimum router confidence to dispatch locally instead of asking the model
 }
 
 # Security Settings
@@ -171,70 +254,120 @@ PERPLEXITY_SETTINGS = {
     'timeout': 10
 }
 
+# HTTP Client Settings
+# Perplexity and OpenAI requests go through shared keep-alive connection pools
+HTTP_SETTINGS = {
+    'pool_connections': 4,  # Hosts kept in the Perplexity session's pool
+    'pool_maxsize': 8,  # Keep-alive connections per host
+    'keepalive_expiry': 120,  # Seconds an idle connection is kept open (httpx closes them after 5 by default)
+    'connect_timeout': 3.05,  # Seconds to establish a connection
+    'openai_timeout': 30,  # Seconds to wait for an OpenAI response
+    'retries': 2,  # Retries on connection errors (and, for Perplexity, on retry_statuses); never on read timeouts
+    'retry_backoff': 0.3,  # Exponential backoff factor between retries (seconds)
+    'retry_statuses': [429, 500, 502, 503, 504]
+}
+
 # Conversation Context Settings
 CONTEXT_SETTINGS = {
     'max_context_length': 10,  # Number of previous interactions to remember
     'max_tokens_per_message': 100,  # Max tokens per message in context
     'enable_context': True,  # Enable/disable conversation context
-    'context_window': 5  # Number of recent messages to include in context
+    'context_window': 5,  # Number of recent messages to include in context
+    'max_prompt_tokens': 4000  # Total prompt budget; context fills what's left after system prompt, tools, query and reply
 }
 
 # Autonomous Agent Settings
 AUTONOMOUS_SETTINGS = {
-    'max_tool_calls': 5,  # Maximum number of tool calls per query
+    'max_tool_calls': 5,  # Maximum number of tool-calling model turns per query
     'enable_autonomous': True,  # Enable autonomous multi-tool execution
     'tool_call_timeout': 30,  # Timeout for tool execution in seconds
-    'enable_planning': True,  # Enable planning before tool execution
+    'enable_planning': False,  # Ask the model for a plan before tool execution (costs one extra call)
     'max_planning_steps': 3  # Maximum planning steps
 }
 
+# Tool Selection Settings
+TOOL_SELECTION_SETTINGS = {
+    # Send only the tools relevant to each query instead of every schema. Off by default: a
+    # changing tool list also changes the prompt prefix, so it can't be served from the cache
+    'enable_tool_pruning': False,
+    'top_k': 6,  # Number of best-matching tools offered per query (in addition to the core tools)
+    'recent_turns': 3,  # Tools used in this many previous turns stay offered ("do that again")
+    'core_tools': ['get_web_data', 'open_application', 'open_any_url']  # Always offered
+}
+
 # System Prompt
-SYSTEM_PROMPT = """You are Jarvis, a witty, efficient AI assistant inspired by Iron Man's AI. 
+# The prompt is assembled from a header, one purpose line and optional guidelines per tool,
+# and a footer, so the tool section can list just the tools offered for a query.
+SYSTEM_PROMPT_HEADER = """You are Jarvis, a witty, efficient AI assistant inspired by Iron Man's AI. 
 Respond concisely and helpfully. Use a formal but friendly tone. 
 
-Keep responses short and concise (10-20 words max).
-
-Available tools and their purposes:
-- get_web_data: Search the web for real-time information, news, facts, or any query
-- open_any_url: Open a specific website URL in the default browser
-- open_application: Launch desktop applications by name (e.g., "cursor", "whatsapp", "terminal", "calculator", "chrome", "spotify", "discord", "vscode", "word", "excel", "teams", "zoom"). For Chrome, you can specify a profile_name to open with a specific profile.
-- list_chrome_profiles: List all available Chrome browser profiles
-- open_chrome_with_profile: Open Chrome with a specific profile (by name or ID)
-- get_system_stats: Get computer system information (CPU, memory, disk, etc.)
-- take_screenshot: Capture a screenshot of the entire screen
-- get_current_time: Get the current system time
-- simple_calculator: Perform mathematical calculations
-- close_active_window: Close the currently active window
-- minimize_window: Minimize the currently active window
-- get_running_apps: List currently running applications
-- copy_to_clipboard: Copy text to the system clipboard
-- open_system_settings: Open Windows system settings (display, accessibility, sound, network, privacy, updates)
-- change_font_size: Change system font/text size on Windows (increase, decrease, or set to specific percentage like 200%)
-- list_voices: List all available TTS voices
-- set_voice: Change the TTS voice used by Jarvis (by index or name)
-- click_position: Click at specific screen coordinates (x, y)
-- type_text: Type text at the current cursor position
-- press_key: Press a specific key (enter, space, tab, escape, etc.)
-- scroll: Scroll up or down on the current page
-- get_screen_size: Get screen dimensions
-- get_mouse_position: Get current mouse cursor position
-
-Tool usage guidelines:
-- For finding information or answering questions: use get_web_data
-- For opening websites: use open_any_url with the full URL (include https://)
-- For launching apps: use open_application with the app name (try common names like "cursor", "whatsapp", "terminal", "calculator")
-- For calculations: use simple_calculator with the mathematical expression
-- For time queries: use get_current_time
-- For system info: use get_system_stats
-- For opening Windows Settings: use open_system_settings with setting type (e.g., "display", "font size", "accessibility")
-- For changing font size: use change_font_size with action "increase" or "decrease"
-
-When opening applications:
+Keep responses short and concise (10-20 words max)."""
+
+TOOL_PURPOSES = {
+    'get_web_data': 'Search the web for real-time information, news, facts, or any query',
+    'open_any_url': 'Open a specific website URL in the default browser',
+    'open_application': 'Launch desktop applications by name (e.g., "cursor", "whatsapp", "terminal", "calculator", "chrome", "spotify", "discord", "vscode", "word", "excel", "teams", "zoom"). For Chrome, you can specify a profile_name to open with a specific profile.',
+    'list_chrome_profiles': 'List all available Chrome browser profiles',
+    'open_chrome_with_profile': 'Open Chrome with a specific profile (by name or ID)',
+    'get_system_stats': 'Get computer system information (CPU, memory, disk, etc.)',
+    'take_screenshot': 'Capture a screenshot of the entire screen',
+    'get_current_time': 'Get the current system time',
+    'simple_calculator': 'Perform mathematical calculations',
+    'close_active_window': 'Close the currently active window',
+    'minimize_window': 'Minimize the currently active window',
+    'get_running_apps': 'List currently running applications',
+    'copy_to_clipboard': 'Copy text to the system clipboard',
+    'open_system_settings': 'Open Windows system settings (display, accessibility, sound, network, privacy, updates)',
+    'change_font_size': 'Change system font/text size on Windows (increase, decrease, or set to specific percentage like 200%)',
+    'list_voices': 'List all available TTS voices',
+    'set_voice': 'Change the TTS voice used by Jarvis (by index or name)',
+    'click_position': 'Click at specific screen coordinates (x, y)',
+    'type_text': 'Type text at the current cursor position',
+    'press_key': 'Press a specific key (enter, space, tab, escape, etc.)',
+    'scroll': 'Scroll up or down on the current page',
+    'get_screen_size': 'Get screen dimensions',
+    'get_mouse_position': 'Get current mouse cursor position'
+}
+
+TOOL_GUIDELINES = {
+    'get_web_data': 'For finding information or answering questions: use get_web_data',
+    'open_any_url': 'For opening websites: use open_any_url with the full URL (include https://)',
+    'open_application': 'For launching apps: use open_application with the app name (try common names like "cursor", "whatsapp", "terminal", "calculator")',
+    'simple_calculator': 'For calculations: use simple_calculator with the mathematical expression',
+    'get_current_time': 'For time queries: use get_current_time',
+    'get_system_stats': 'For system info: use get_system_stats',
+    'open_system_settings': 'For opening Windows Settings: use open_system_settings with setting type (e.g., "display", "font size", "accessibility")',
+    'change_font_size': 'For changing font size: use change_font_size with action "increase" or "decrease"'
+}
+
+APPLICATION_GUIDELINES = """When opening applications:
 - Use the exact app name the user says (e.g., "cursor" for Cursor IDE, "whatsapp" for WhatsApp, "terminal" for Windows Terminal)
 - Common app names: cursor, whatsapp, terminal, calculator, chrome, edge, firefox, spotify, discord, vscode, code, word, excel, powerpoint, outlook, teams, zoom, slack, steam, obs, photoshop
-- For Chrome: If user asks to open Chrome with a profile or select a profile, use list_chrome_profiles first to see available profiles, then use open_chrome_with_profile or open_application with profile_name parameter
+- For Chrome: If user asks to open Chrome with a profile or select a profile, use list_chrome_profiles first to see available profiles, then use open_chrome_with_profile or open_application with profile_name parameter"""
 
-You can execute multiple tools in sequence if needed to complete a complex task.
+SYSTEM_PROMPT_FOOTER = """You can execute multiple tools in sequence if needed to complete a complex task.
 Always use the most appropriate tool for each request.
 Maintain conversation context and refer to previous interactions when relevant.
-If a request is unclear, ask for clarification or make a reasonable assumption based on context.""" 
\ No newline at end of file
+If a request is unclear, ask for clarification or make a reasonable assumption based on context."""
+
+def build_system_prompt(tool_names=None):
+    """
+    Build the system prompt describing the given tools (all tools if None).
+
+    Tools are listed in TOOL_PURPOSES order regardless of the order of tool_names,
+    so the same selection always produces the same prompt.
+    """
+    selected = TOOL_PURPOSES.keys() if tool_names is None else set(tool_names)
+    names = [name for name in TOOL_PURPOSES if name in selected]
+
+    sections = [SYSTEM_PROMPT_HEADER]
+    sections.append("Available tools and their purposes:\n" + "\n".join(f"- {name}: {TOOL_PURPOSES[name]}" for name in names))
+    guidelines = [f"- {guideline}" for name, guideline in TOOL_GUIDELINES.items() if name in selected]
+    if guidelines:
+        sections.append("Tool usage guidelines:\n" + "\n".join(guidelines))
+    if 'open_application' in names:
+        sections.append(APPLICATION_GUIDELINES)
+    sections.append(SYSTEM_PROMPT_FOOTER)
+    return "\n\n".join(sections)
+
+SYSTEM_PROMPT = build_system_prompt()
@@ -1,7 +1,10 @@
 import time
 import json
+import threading
+from contextvars import ContextVar
 from typing import List, Dict, Any, Optional
 from config import CONTEXT_SETTINGS, AUTONOMOUS_SETTINGS
+from token_counter import count_tokens, truncate_to_tokens, TOKENS_PER_MESSAGE
 
 class ConversationManager:
     def __init__(self):
@@ -10,6 +13,12 @@ class ConversationManager:
         self.max_tokens_per_message = CONTEXT_SETTINGS['max_tokens_per_message']
         self.enable_context = CONTEXT_SETTINGS['enable_context']
         self.context_window = CONTEXT_SETTINGS['context_window']
+        self.max_prompt_tokens = CONTEXT_SETTINGS['max_prompt_tokens']
+        
+        # Turns of queries answered concurrently, in the order the queries arrived
+        self._open_turns = []
+        self._turn_lock = threading.Lock()
+        self._current_turn = ContextVar('current_turn', default=None)
         
         # Autonomous settings
         self.max_tool_calls = AUTONOMOUS_SETTINGS['max_tool_calls']
@@ -18,52 +27,109 @@ class ConversationManager:
         self.enable_planning = AUTONOMOUS_SETTINGS['enable_planning']
         self.max_planning_steps = AUTONOMOUS_SETTINGS['max_planning_steps']
     
+    def begin_turn(self):
+        """
+        Open a turn for a query that is answered concurrently with others.
+        
+        Interactions added in the calling task until end_turn() are held back until every
+        earlier turn has ended, so the history keeps the order the queries arrived in
+        rather than the order their answers finished.
+        
+        Returns:
+            tuple: Handle to pass to end_turn()
+        """
+        turn = {'interactions': [], 'ended': False}
+        with self._turn_lock:
+            self._open_turns.append(turn)
+        return turn, self._current_turn.set(turn)
+    
+    def end_turn(self, handle):
+        """Close a turn opened by begin_turn() and add whatever turns are now complete to the history."""
+        turn, token = handle
+        self._current_turn.reset(token)
+        with self._turn_lock:
+            turn['ended'] = True
+            while self._open_turns and self._open_turns[0]['ended']:
+                for interaction in self._open_turns.pop(0)['interactions']:
+                    self._append(interaction)
+    
     def add_interaction(self, user_query: str, assistant_response: str, tool_calls: List[Dict] = None):
-        """Add a new interaction to the conversation history."""
+        """Add a new interaction to the conversation history (or to the current turn, if one is open)."""
+        # Truncate and count tokens once here, so building context is just a lookup
+        context_user = self._truncate_text(user_query)
+        context_assistant = self._truncate_text(assistant_response or "")
         interaction = {
             'timestamp': time.time(),
             'user_query': user_query,
             'assistant_response': assistant_response,
-            'tool_calls': tool_calls or []
+            'tool_calls': tool_calls or [],
+            'context_user': context_user,
+            'context_assistant': context_assistant,
+            'context_tokens': count_tokens(context_user) + count_tokens(context_assistant) + 2 * TOKENS_PER_MESSAGE
         }
         
+        turn = self._current_turn.get()
+        if turn is not None:
+            turn['interactions'].append(interaction)
+        else:
+            self._append(interaction)
+    
+    def _append(self, interaction):
+        """Append an interaction to the history, dropping the oldest beyond max_context_length."""
         self.conversation_history.append(interaction)
         
         # Maintain conversation length
         if len(self.conversation_history) > self.max_context_length:
             self.conversation_history.pop(0)
     
-    def get_context_messages(self) -> List[Dict[str, str]]:
-        """Get recent conversation context for AI processing."""
+    def get_context_messages(self, token_budget: Optional[int] = None) -> List[Dict[str, str]]:
+        """
+        Get recent conversation context for AI processing.
+        
+        Interactions are packed newest-first until the token budget is used up, then
+        returned in chronological order. The most recent one is included even if it
+        exceeds the budget on its own.
+        
+        Args:
+            token_budget: Maximum tokens the context may use. None = no limit beyond context_window.
+        """
         if not self.enable_context or not self.conversation_history:
             return []
         
-        context_messages = []
-        recent_interactions = self.conversation_history[-self.context_window:]
+        packed = []
+        used_tokens = 0
+        for interaction in reversed(self.conversation_history[-self.context_window:]):
+            # The most recent interaction always goes in: without it follow-ups make no sense
+            if packed and token_budget is not None and used_tokens + interaction['context_tokens'] > token_budget:
+                break
+            used_tokens += interaction['context_tokens']
+            packed.append(interaction)
         
-        for interaction in recent_interactions:
-            # Truncate messages if too long
-            user_query = self._truncate_text(interaction['user_query'])
-            assistant_response = self._truncate_text(interaction['assistant_response'])
-            
+        context_messages = []
+        for interaction in reversed(packed):
             context_messages.append({
                 'role': 'user',
-                'content': user_query
+                'content': interaction['context_user']
             })
             context_messages.append({
                 'role': 'assistant',
-                'content': assistant_response
+                'content': interaction['context_assistant']
             })
         
         return context_messages
     
     def _truncate_text(self, text: str) -> str:
-        """Truncate text to fit token limits."""
-        if len(text) <= self.max_tokens_per_message:
-            return text
-        
-        # Simple truncation - in production, you might want to use a proper tokenizer
-        return text[:self.max_tokens_per_message] + "..."
+        """Truncate text to at most max_tokens_per_message tokens."""
+        return truncate_to_tokens(text, self.max_tokens_per_message)
+    
+    def get_recent_tools(self, turns: int) -> List[str]:
+        """Names of the tools called in the last few interactions, most recent first."""
+        names = []
+        for interaction in reversed(self.conversation_history[-turns:] if turns > 0 else []):
+            for tool_call in interaction.get('tool_calls', []):
+                if tool_call.get('function') and tool_call['function'] not in names:
+                    names.append(tool_call['function'])
+        return names
     
     def get_conversation_summary(self) -> str:
         """Get a summary of recent conversation for context."""
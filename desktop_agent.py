@@ -1,11 +1,14 @@
 import subprocess
 import os
 import platform
+import shlex
 import pyautogui
 import time
 import json
 from PIL import Image
 import psutil
+from config import APP_INDEX_SETTINGS
+from app_index import get_app_index
 
 class DesktopAgent:
     def __init__(self):
@@ -14,6 +17,32 @@ class DesktopAgent:
         pyautogui.FAILSAFE = True
         pyautogui.PAUSE = 0.1
     
+    def _find_application(self, app_name):
+        """Look an application up in the index (no filesystem access); None if it isn't indexed."""
+        if not APP_INDEX_SETTINGS['enabled']:
+            return None
+        index = get_app_index()
+        entry = index.lookup(app_name)
+        if entry is None:
+            # Maybe it was installed since the last scan; pick it up for next time
+            index.refresh_in_background()
+        return entry
+    
+    def _launch_indexed(self, entry):
+        """Launch an application index entry. Returns the response, or None if it couldn't be started."""
+        try:
+            if entry['kind'] == "desktop":
+                subprocess.Popen(shlex.split(entry['target']))
+            elif entry['kind'] == "app":
+                subprocess.run(["open", entry['target']], check=True)
+            else:
+                os.startfile(entry['target'])
+            return f"Opened {entry['name']}"
+        except Exception:
+            # Stale entry (e.g. uninstalled); rescan changed directories for next time
+            get_app_index().refresh_in_background()
+            return None
+    
     def open_application(self, app_name):
         """Open an application by name."""
         try:
@@ -45,6 +74,12 @@ class DesktopAgent:
                 app_name_lower = app_name.lower()
                 actual_app_name = app_mapping.get(app_name_lower, app_name)
                 
+                entry = self._find_application(actual_app_name)
+                if entry is not None:
+                    response = self._launch_indexed(entry)
+                    if response:
+                        return response
+                
                 subprocess.run(["open", "-a", actual_app_name])
                 return f"Opened {actual_app_name}"
                 
@@ -131,6 +166,13 @@ class DesktopAgent:
                     except Exception:
                         pass
                 
+                # Start-menu shortcuts and installed programs, from the application index
+                entry = self._find_application(app_name)
+                if entry is not None:
+                    response = self._launch_indexed(entry)
+                    if response:
+                        return response
+                
                 # Try Windows Start Menu search using shell:AppsFolder
                 try:
                     # Use 'start' command to search Windows Start Menu
@@ -149,48 +191,6 @@ class DesktopAgent:
                 except Exception:
                     pass
                 
-                # Try common installation paths (limited depth for performance)
-                common_paths = [
-                    (os.path.expanduser("~\\AppData\\Local\\Programs"), 2),  # (path, max_depth)
-                    (os.path.expanduser("~\\AppData\\Local"), 1),
-                ]
-                
-                # Search for the app in common paths
-                app_name_variants = [
-                    app_name + ".exe",
-                    app_name.capitalize() + ".exe",
-                    app_name.title().replace(" ", "") + ".exe"
-                ]
-                
-                def search_path(path, max_depth, current_depth=0):
-                    """Recursively search path with depth limit."""
-                    if current_depth > max_depth:
-                        return None
-                    try:
-                        for item in os.listdir(path):
-                            item_path = os.path.join(path, item)
-                            if os.path.isfile(item_path):
-                                for variant in app_name_variants:
-                                    if item.lower() == variant.lower():
-                                        return item_path
-                            elif os.path.isdir(item_path) and current_depth < max_depth:
-                                result = search_path(item_path, max_depth, current_depth + 1)
-                                if result:
-                                    return result
-                    except (PermissionError, OSError):
-                        pass
-                    return None
-                
-                for path, max_depth in common_paths:
-                    if os.path.exists(path):
-                        result = search_path(path, max_depth)
-                        if result:
-                            try:
-                                subprocess.Popen(result)
-                                return f"Opened {app_name}"
-                            except Exception:
-                                continue
-                
                 return f"Could not find or open {app_name}. Please check if it's installed."
                 
             elif self.system == "Linux":
@@ -205,8 +205,15 @@ class DesktopAgent:
                 }
                 
                 app_name_lower = app_name.lower()
-                actual_app_name = app_mapping.get(app_name_lower, app_name)
                 
+                # Installed applications (.desktop files), from the application index
+                entry = self._find_application(app_name)
+                if entry is not None:
+                    response = self._launch_indexed(entry)
+                    if response:
+                        return response
+                
+                actual_app_name = app_mapping.get(app_name_lower, app_name)
                 subprocess.Popen([actual_app_name])
                 return f"Opened {actual_app_name}"
                 
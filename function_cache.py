@@ -0,0 +1,90 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+class FunctionCache:
+    """Bounded LRU cache of tool results with per-entry time-to-live."""
+
+    def __init__(self, max_entries: int, default_ttl: float):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        # Tool calls from one model turn may run concurrently
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @staticmethod
+    def _normalize(value):
+        """Normalize argument values so trivially different calls share an entry."""
+        if isinstance(value, str):
+            return " ".join(value.lower().split())
+        if isinstance(value, dict):
+            return {k: FunctionCache._normalize(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [FunctionCache._normalize(v) for v in value]
+        return value
+
+    @staticmethod
+    def make_key(function_name: str, arguments: Dict[str, Any]) -> Tuple[str, str]:
+        """Build a cache key from a tool name and its (bound) arguments."""
+        normalized = FunctionCache._normalize(arguments)
+        return (function_name, json.dumps(normalized, sort_keys=True, default=str))
+
+    def get(self, key) -> Tuple[bool, Any]:
+        """
+        Look up a cached result.
+
+        Returns:
+            tuple: (hit, value) - value is None on a miss
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return False, None
+
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, value
+
+    def set(self, key, value, ttl: float = None):
+        """Store a result, evicting the least recently used entries beyond capacity."""
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Remove all cached results (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
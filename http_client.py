@@ -0,0 +1,208 @@
+import asyncio
+import threading
+import time
+import weakref
+from config import HTTP_SETTINGS, PERPLEXITY_SETTINGS
+
+class ConnectionStats:
+    """
+    Request and new-connection counts for one service, fed by an httpcore trace hook.
+
+    httpcore reports connect/TLS events only when it opens a connection, so every
+    request without them reused a pooled keep-alive connection.
+    """
+
+    def __init__(self):
+        self.requests = 0
+        self.new_connections = 0
+        self.tls_handshakes = 0
+        self.connect_ms = 0.0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def on_request(self, request):
+        """httpx request event hook: count the request and attach the trace callback."""
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self.trace
+
+    async def aon_request(self, request):
+        """Async variant of on_request, for httpx.AsyncClient."""
+        with self._lock:
+            self.requests += 1
+        request.extensions["trace"] = self.atrace
+
+    def trace(self, event_name, info):
+        """httpcore trace callback: record new connections and how long they took to set up."""
+        if event_name == "connection.connect_tcp.started":
+            self._local.connect_started = time.perf_counter()
+        elif event_name in ("connection.connect_tcp.complete", "connection.start_tls.complete"):
+            started = getattr(self._local, "connect_started", None)
+            with self._lock:
+                if event_name == "connection.connect_tcp.complete":
+                    self.new_connections += 1
+                else:
+                    self.tls_handshakes += 1
+                if started is not None:
+                    now = time.perf_counter()
+                    self.connect_ms += (now - started) * 1000
+                    self._local.connect_started = now
+
+    async def atrace(self, event_name, info):
+        """Async variant of trace."""
+        self.trace(event_name, info)
+
+    def get_stats(self, pool_requests=0, pool_connections=0):
+        """Get counters, adding those of a requests/urllib3 pool if given."""
+        with self._lock:
+            requests = self.requests + pool_requests
+            connections = self.new_connections + pool_connections
+            return {
+                'requests': requests,
+                'new_connections': connections,
+                'tls_handshakes': self.tls_handshakes,
+                'reused': max(0, requests - connections),
+                'reuse_rate': max(0, requests - connections) / requests if requests else 0.0,
+                'average_connect_ms': self.connect_ms / self.new_connections if self.new_connections else 0.0
+            }
+
+# Per-service counters and the clients that feed them, created on first use
+STATS = {'perplexity': ConnectionStats(), 'openai': ConnectionStats()}
+_clients = {}
+_async_clients = weakref.WeakKeyDictionary()  # event loop -> {name: client}; httpx async pools are tied to one loop
+_lock = threading.Lock()
+
+def _retry_policy():
+    """
+    urllib3 retry policy for the Perplexity session: connection failures and the
+    statuses in retry_statuses only. A read timeout means the query may already be
+    running (and billed) upstream, so it is never retried.
+    """
+    from urllib3.util.retry import Retry
+    options = dict(
+        total=HTTP_SETTINGS['retries'],
+        read=0,
+        backoff_factor=HTTP_SETTINGS['retry_backoff'],
+        status_forcelist=HTTP_SETTINGS['retry_statuses'],
+        raise_on_status=False
+    )
+    try:
+        return Retry(allowed_methods=frozenset(["GET", "HEAD", "POST"]), **options)
+    except TypeError:
+        # urllib3 < 1.26
+        return Retry(method_whitelist=frozenset(["GET", "HEAD", "POST"]), **options)
+
+def _create(name):
+    """Create the shared client called name."""
+    if name == 'perplexity_session':
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=HTTP_SETTINGS['pool_connections'],
+            pool_maxsize=HTTP_SETTINGS['pool_maxsize'],
+            max_retries=_retry_policy()
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    import httpx
+    limits = httpx.Limits(
+        max_connections=HTTP_SETTINGS['pool_maxsize'],
+        max_keepalive_connections=HTTP_SETTINGS['pool_maxsize'],
+        keepalive_expiry=HTTP_SETTINGS['keepalive_expiry']
+    )
+    if name == 'perplexity_async':
+        timeout = httpx.Timeout(PERPLEXITY_SETTINGS['timeout'], connect=HTTP_SETTINGS['connect_timeout'])
+        return httpx.AsyncClient(
+            limits=limits, timeout=timeout,
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=HTTP_SETTINGS['retries']),
+            event_hooks={'request': [STATS['perplexity'].aon_request]}
+        )
+
+    timeout = httpx.Timeout(HTTP_SETTINGS['openai_timeout'], connect=HTTP_SETTINGS['connect_timeout'])
+    if name == 'openai':
+        return httpx.Client(
+            limits=limits, timeout=timeout,
+            transport=httpx.HTTPTransport(limits=limits, retries=HTTP_SETTINGS['retries']),
+            event_hooks={'request': [STATS['openai'].on_request]}
+        )
+    if name == 'openai_async':
+        return httpx.AsyncClient(
+            limits=limits, timeout=timeout,
+            transport=httpx.AsyncHTTPTransport(limits=limits, retries=HTTP_SETTINGS['retries']),
+            event_hooks={'request': [STATS['openai'].aon_request]}
+        )
+    raise ValueError(f"Unknown HTTP client: {name}")
+
+def _get(name):
+    """Get (creating on first use) the shared client called name."""
+    client = _clients.get(name)
+    if client is None:
+        with _lock:
+            client = _clients.get(name)
+            if client is None:
+                client = _clients[name] = _create(name)
+    return client
+
+def _get_async(name):
+    """Get (creating on first use) the async client called name for the running event loop."""
+    loop = asyncio.get_running_loop()
+    with _lock:
+        clients = _async_clients.setdefault(loop, {})
+        client = clients.get(name)
+        if client is None:
+            client = clients[name] = _create(name)
+    return client
+
+def get_perplexity_session():
+    """Pooled keep-alive requests.Session with retries, shared by all Perplexity calls."""
+    return _get('perplexity_session')
+
+def get_perplexity_async_client():
+    """Pooled httpx.AsyncClient for async Perplexity calls in the running event loop."""
+    return _get_async('perplexity_async')
+
+def get_openai_http_client():
+    """Explicitly configured httpx.Client (pool limits, timeouts, connect retries) for the OpenAI client."""
+    return _get('openai')
+
+def get_openai_async_http_client():
+    """httpx.AsyncClient counterpart of get_openai_http_client, for AsyncOpenAI in the running event loop."""
+    return _get_async('openai_async')
+
+def warm_up_perplexity(url):
+    """Open a keep-alive connection to the Perplexity API ahead of the first web query."""
+    # Any response will do: the point is DNS, TCP and TLS setup, after which the connection stays pooled
+    get_perplexity_session().head(url, timeout=HTTP_SETTINGS['connect_timeout'])
+
+def _pool_counters(session):
+    """(requests, new connections) across a requests.Session's urllib3 pools."""
+    requests = connections = 0
+    # The same adapter is mounted for http:// and https://
+    for adapter in {id(a): a for a in session.adapters.values()}.values():
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                requests += pool.num_requests
+                connections += pool.num_connections
+    return requests, connections
+
+def get_connection_stats():
+    """Get request, new-connection and reuse counts per service."""
+    session = _clients.get('perplexity_session')
+    pool_requests, pool_connections = _pool_counters(session) if session is not None else (0, 0)
+    return {
+        'perplexity': STATS['perplexity'].get_stats(pool_requests, pool_connections),
+        'openai': STATS['openai'].get_stats()
+    }
+
+def close_clients():
+    """Close the shared clients (synchronous ones; async clients are dropped with their event loop)."""
+    with _lock:
+        for name in ('perplexity_session', 'openai'):
+            client = _clients.pop(name, None)
+            if client is not None:
+                client.close()
@@ -0,0 +1,181 @@
+import re
+from typing import Any, Dict, List, Optional
+
+# Polite filler around a command that doesn't change its meaning
+FILLER_PATTERN = re.compile(
+    r"^(?:(?:hey|ok|okay|please|can you|could you|would you|will you|i want you to|i'd like you to)\s+)+"
+    r"|(?:\s+(?:please|for me|now|right now|thanks|thank you))+$"
+)
+PUNCTUATION_PATTERN = re.compile(r"[?!,;]+|\.(?=\s|$)")
+
+# Apps we know how to launch by name on every platform (see DesktopAgent.open_application)
+KNOWN_APPS = {
+    "calculator", "calc", "chrome", "google chrome", "browser", "edge", "microsoft edge",
+    "firefox", "safari", "terminal", "cmd", "command prompt", "powershell", "notepad",
+    "explorer", "file explorer", "finder", "files", "cursor", "vscode", "vs code",
+    "visual studio code", "code", "whatsapp", "discord", "spotify", "slack", "teams",
+    "zoom", "steam", "obs", "vlc", "word", "excel", "powerpoint", "outlook", "photoshop",
+    "notes", "mail", "messages", "music", "photos", "calendar", "settings"
+}
+
+NUMBER = r"-?\d+(?:\.\d+)?"
+SPOKEN_OPERATORS = [
+    (re.compile(r"\bto the power of\b"), "**"),
+    (re.compile(r"\bmultiplied by\b|\btimes\b|(?<=\d)\s*x\s*(?=\d)|×"), "*"),
+    (re.compile(r"\bdivided by\b|\bover\b|÷"), "/"),
+    (re.compile(r"\bplus\b"), "+"),
+    (re.compile(r"\bminus\b"), "-")
+]
+EXPRESSION_PATTERN = re.compile(rf"^\(*{NUMBER}\)*(?:\s*(?:\*\*|[-+*/])\s*\(*{NUMBER}\)*)+$")
+POWER_PATTERN = re.compile(rf"\*\*\s*\(*({NUMBER})")
+
+# Largest exponent evaluated locally: "10 to the power of 10 to the power of 10" would
+# keep simple_calculator busy for minutes, so powers beyond this go to the model
+MAX_EXPONENT = 100
+
+class IntentMatch:
+    """A locally recognized command: the tool to call, its arguments and a confidence score."""
+
+    def __init__(self, name: str, arguments: Dict[str, Any], confidence: float):
+        self.name = name
+        self.arguments = arguments
+        self.confidence = confidence
+
+    def __repr__(self):
+        return f"IntentMatch({self.name!r}, {self.arguments!r}, {self.confidence:.2f})"
+
+def _spoken_expression(text: str) -> Optional[str]:
+    """Convert a spoken arithmetic expression ("15 plus 27") into symbols, or None if it isn't one."""
+    expression = text
+    for pattern, symbol in SPOKEN_OPERATORS:
+        expression = pattern.sub(f" {symbol} ", expression)
+    expression = " ".join(expression.split())
+    if not EXPRESSION_PATTERN.match(expression):
+        return None
+    exponents = POWER_PATTERN.findall(expression)
+    if len(exponents) > 1 or any(abs(float(exponent)) > MAX_EXPONENT for exponent in exponents):
+        return None
+    return expression
+
+def _calculator_slots(match):
+    expression = _spoken_expression(match.group("expression"))
+    if expression is None:
+        return None
+    return {"expression": expression}, 0.95
+
+def _scroll_slots(match):
+    arguments = {"direction": match.group("direction")}
+    if match.group("amount"):
+        arguments["amount"] = int(match.group("amount"))
+    return arguments, 0.95
+
+def _open_app_slots(match):
+    app_name = match.group("app").strip()
+    # Unknown names are left to the model, which can pick a better tool (or URL)
+    confidence = 0.95 if app_name in KNOWN_APPS else 0.6
+    return {"app_name": app_name}, confidence
+
+def _open_url_slots(match):
+    url = match.group("url")
+    if not url.startswith(("http://", "https://")):
+        url = "https://" + url
+    return {"url": url}, 0.95
+
+def _key_slots(match):
+    return {"key": match.group("key")}, 0.95
+
+def _no_slots(match):
+    return {}, 0.95
+
+class IntentRouter:
+    """
+    Match common spoken commands against a compiled grammar of FUNCTION_MAP tools.
+
+    Every rule must match the whole (normalized) utterance, so anything with extra
+    clauses ("open chrome and search for...") falls through to the model.
+    """
+
+    # (tool name, pattern, slot extractor)
+    GRAMMAR = [
+        ("get_current_time",
+         r"(?:what(?:'s| is) the (?:current )?time|what time is it|tell me the time|(?:the )?current time|time)",
+         _no_slots),
+        ("simple_calculator",
+         r"(?:calculate|compute|evaluate|what(?:'s| is)|how much is)\s+(?P<expression>.+?)",
+         _calculator_slots),
+        ("scroll",
+         r"scroll (?P<direction>up|down)(?: by)?(?: (?P<amount>\d+))?(?: (?:units?|times|lines|clicks))?",
+         _scroll_slots),
+        ("open_any_url",
+         r"(?:open|go to|visit|navigate to|browse to)\s+(?P<url>(?:https?://)?[a-z0-9\-]+(?:\.[a-z0-9\-]+)+(?:/\S*)?)",
+         _open_url_slots),
+        ("open_application",
+         r"(?:open|launch|start|run)\s+(?:up\s+)?(?:the\s+)?(?P<app>[a-z][a-z0-9 +\-]*?)(?:\s+app(?:lication)?)?",
+         _open_app_slots),
+        ("get_screen_size",
+         r"(?:what(?:'s| is) (?:my |the )?)?screen (?:size|resolution)",
+         _no_slots),
+        ("get_mouse_position",
+         r"(?:where is (?:my |the )?mouse|(?:what(?:'s| is) (?:my |the )?)?mouse position)",
+         _no_slots),
+        ("close_active_window",
+         r"close (?:this |the |current |active |the current |the active )?window",
+         _no_slots),
+        ("minimize_window",
+         r"minimi[sz]e (?:this |the |current |active |the current |the active )?window",
+         _no_slots),
+        ("take_screenshot",
+         r"(?:take (?:a )?)?screenshot|capture (?:the )?screen",
+         _no_slots),
+        ("get_system_stats",
+         r"(?:show |get |what are (?:my |the )?)?system (?:stats|statistics|info|information|status)",
+         _no_slots),
+        ("get_running_apps",
+         r"(?:what apps are running|(?:list |show )?running (?:apps|applications))",
+         _no_slots),
+        ("press_key",
+         r"(?:press|hit) (?:the )?(?P<key>enter|return|escape|tab|space|backspace|delete|up|down|left|right)(?: key)?",
+         _key_slots),
+        ("list_voices",
+         r"(?:list (?:the )?voices|what voices are available|show (?:me )?(?:the )?voices)",
+         _no_slots)
+    ]
+
+    def __init__(self, tool_names=None):
+        """
+        Compile the grammar.
+
+        Args:
+            tool_names: Optional set of available tool names; rules for other tools are dropped
+        """
+        self.rules: List[tuple] = []
+        for name, pattern, slots in self.GRAMMAR:
+            if tool_names is not None and name not in tool_names:
+                continue
+            self.rules.append((name, re.compile(rf"^(?:{pattern})$"), slots))
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """Lowercase, drop punctuation and polite filler."""
+        text = PUNCTUATION_PATTERN.sub(" ", text.lower())
+        text = " ".join(text.split())
+        return FILLER_PATTERN.sub("", text).strip()
+
+    def route(self, text: str) -> Optional[IntentMatch]:
+        """Return the best local match for an utterance, or None if no rule matches."""
+        normalized = self.normalize(text)
+        if not normalized:
+            return None
+
+        best = None
+        for name, pattern, slots in self.rules:
+            match = pattern.match(normalized)
+            if not match:
+                continue
+            extracted = slots(match)
+            if extracted is None:
+                continue
+            arguments, confidence = extracted
+            if best is None or confidence > best.confidence:
+                best = IntentMatch(name, arguments, confidence)
+        return best
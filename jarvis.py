@@ -1,6 +1,12 @@
+import asyncio
 from speech_handler import SpeechHandler
 from ai_handler import AIHandler
-from config import OPENAI_API_KEY, PERPLEXITY_API_KEY
+from config import OPENAI_API_KEY, PERPLEXITY_API_KEY, ADVANCED_AI_SETTINGS, PERFORMANCE_SETTINGS, SPECULATION_SETTINGS, APP_INDEX_SETTINGS
+from speculation import Speculator
+from startup_profiler import PROFILER, phase
+from warmup import WarmupTasks
+from http_client import close_clients
+from app_index import get_app_index
 import tools
 
 class Jarvis:
@@ -11,10 +17,21 @@ class Jarvis:
         Args:
             mic_device_index: Index of the microphone device to use. If None, uses default.
         """
-        self.speech_handler = SpeechHandler(mic_device_index=mic_device_index)
+        with phase("speech handler"):
+            self.speech_handler = SpeechHandler(mic_device_index=mic_device_index)
         # Set the global speech handler reference so voice functions can access it
         tools._current_speech_handler = self.speech_handler
-        self.ai_handler = AIHandler()
+        with phase("AI handler"):
+            self.ai_handler = AIHandler()
+        # Starts the first model turn on stable partial transcripts (synchronous loop only)
+        self.speculator = None
+        if SPECULATION_SETTINGS['enabled']:
+            self.speculator = Speculator(
+                self.ai_handler.speculate_first_turn,
+                stable_partials=SPECULATION_SETTINGS['stable_partials'],
+                min_words=SPECULATION_SETTINGS['min_words']
+            )
+        self.warmup = None
         self.is_running = False
     
     def start(self):
@@ -23,71 +40,214 @@ class Jarvis:
         print(f"OpenAI API Key loaded: {'Yes' if OPENAI_API_KEY else 'No'}")
         print(f"Perplexity API Key loaded: {'Yes' if PERPLEXITY_API_KEY else 'No'}")
         
-        # Calibrate microphone
-        self.speech_handler.calibrate_microphone()
+        if PERFORMANCE_SETTINGS['startup_warmup']:
+            with phase("warm-up"):
+                self._warm_up()
+        else:
+            # Calibrate microphone
+            with phase("calibrate microphone"):
+                self.speech_handler.calibrate_microphone()
+        PROFILER.report()
         
         self.is_running = True
-        self._main_loop()
+        if PERFORMANCE_SETTINGS['enable_async_operations']:
+            asyncio.run(self._async_main_loop())
+        else:
+            self._main_loop()
+    
+    def _warm_up(self):
+        """
+        Run independent startup tasks concurrently and wait until they are ready, so the
+        first command doesn't pay for engine init, connection setup or cold caches.
+        """
+        self.warmup = WarmupTasks()
+        self.warmup.add("tts engine", self.speech_handler.wait_until_tts_ready)
+        self.warmup.add("microphone calibration", self.speech_handler.calibrate_microphone)
+        self.warmup.add("openai connection", self.ai_handler.warm_up_connection)
+        self.warmup.add("perplexity connection", tools.warm_up_web_data)
+        self.warmup.add("tool prompts", self.ai_handler.warm_up_prompts)
+        self.warmup.add("desktop agent", tools.get_desktop_agent)
+        if APP_INDEX_SETTINGS['enabled']:
+            # Incremental: only directories changed since the saved index are listed
+            self.warmup.add("application index", lambda: get_app_index().refresh())
+        self.warmup.start()
+        self.warmup.wait_until_ready(PERFORMANCE_SETTINGS['startup_warmup_timeout'])
+        print(self.warmup.summary())
     
     def stop(self):
         """Stop Jarvis."""
         self.is_running = False
+        self.ai_handler.persist_caches()
         self.speech_handler.speak("Shutting down Jarvis. Goodbye!")
+        self.speech_handler.wait_until_done()
+        self.speech_handler.close()
+        close_clients()
         print("Jarvis has been shut down.")
     
     def _main_loop(self):
         """Main loop for processing user input."""
         while self.is_running:
             # Listen for speech
-            text = self.speech_handler.listen_for_speech()
+            text = self.speech_handler.listen_for_speech(on_partial=self._on_partial_transcript if self.speculator else None)
             
             if text is None:
+                self._discard_speculation()
                 continue
             
             # Check for stop command
             if text.lower() == "stop":
+                self._discard_speculation()
                 self.stop()
                 break
             
             # Check for conversation management commands
-            if text.lower() == "clear history":
-                response = self.ai_handler.clear_conversation_history()
-                print(f"Jarvis: {response}")
-                self.speech_handler.speak(response)
-                continue
-            
-            if text.lower() == "conversation stats":
-                stats = self.ai_handler.get_conversation_stats()
-                response = f"Conversation stats: {stats['total_interactions']} interactions, {stats['total_tool_calls']} tool calls, average {stats['average_tools_per_interaction']:.1f} tools per interaction."
+            response = self._builtin_command_response(text)
+            if response is not None:
+                self._discard_speculation()
                 print(f"Jarvis: {response}")
                 self.speech_handler.speak(response)
                 continue
             
             # Process query if it contains "jarvis"
-            query = text.lower().replace("jarvis", "").strip()
+            query = self._extract_query(text)
             if query:
-                    # Get response from AI
-                    response = self.ai_handler.process_query(query)
-                    
-                    # Speak the response
-                    print(f"Jarvis: {response}")
-                    self.speech_handler.speak(response)
+                    # Use the first model turn if it was already started on a matching partial transcript
+                    first_turn = self.speculator.resolve(query) if self.speculator else None
+                    if ADVANCED_AI_SETTINGS['enable_streaming']:
+                        # Speak each sentence as soon as it has been generated
+                        self._respond_streaming(query, first_turn)
+                    else:
+                        # Get response from AI
+                        response = self.ai_handler.process_query(query, first_turn)
+                        
+                        # Speak the response
+                        print(f"Jarvis: {response}")
+                        self.speech_handler.speak(response)
             else:
+                self._discard_speculation()
                 self.speech_handler.speak("Yes, sir? How can I help you?")
     
+    @staticmethod
+    def _extract_query(text):
+        """Turn recognized speech into the query sent to the AI (drops the wake word)."""
+        return text.lower().replace("jarvis", "").strip()
+    
+    def _on_partial_transcript(self, text):
+        """Feed a partial transcript to the speculator."""
+        query = self._extract_query(text)
+        if query:
+            self.speculator.on_partial(query)
+    
+    def _discard_speculation(self):
+        """Drop any speculative request when the utterance isn't a query."""
+        if self.speculator:
+            self.speculator.discard()
+    
+    def _builtin_command_response(self, text):
+        """Handle conversation management commands. Returns the response, or None if text isn't one."""
+        if text.lower() == "clear history":
+            return self.ai_handler.clear_conversation_history()
+        
+        if text.lower() == "conversation stats":
+            stats = self.ai_handler.get_conversation_stats()
+            return f"Conversation stats: {stats['total_interactions']} interactions, {stats['total_tool_calls']} tool calls, average {stats['average_tools_per_interaction']:.1f} tools per interaction."
+        
+        return None
+    
+    async def _async_main_loop(self):
+        """
+        Asyncio main loop, used when PERFORMANCE_SETTINGS['enable_async_operations'] is on.
+        
+        The microphone keeps listening for the next command while earlier ones are being
+        answered. Replies are spoken one at a time.
+        """
+        loop = asyncio.get_running_loop()
+        speaking = asyncio.Lock()
+        pending = set()
+        
+        async def speak(text):
+            async with speaking:
+                print(f"Jarvis: {text}")
+                await loop.run_in_executor(None, self.speech_handler.speak, text)
+        
+        async def respond(query):
+            response = await self.ai_handler.aprocess_query(query)
+            await speak(response)
+        
+        while self.is_running:
+            text = await loop.run_in_executor(None, self.speech_handler.listen_for_speech)
+            
+            if text is None:
+                continue
+            
+            if text.lower() == "stop":
+                for task in pending:
+                    task.cancel()
+                async with speaking:
+                    await loop.run_in_executor(None, self.stop)
+                break
+            
+            response = self._builtin_command_response(text)
+            if response is not None:
+                await speak(response)
+                continue
+            
+            query = self._extract_query(text)
+            if query:
+                task = asyncio.create_task(respond(query))
+                pending.add(task)
+                task.add_done_callback(pending.discard)
+            else:
+                await speak("Yes, sir? How can I help you?")
+    
+    def _respond_streaming(self, query, first_turn=None):
+        """Stream the AI response for a query, speaking it sentence by sentence."""
+        sentences = []
+        interruptions = self.speech_handler.interruptions
+        responses = self.ai_handler.process_query_stream(query, first_turn)
+        try:
+            for sentence in responses:
+                if self.speech_handler.interruptions != interruptions:
+                    # The user talked over the reply; stop generating the rest of it
+                    break
+                print(f"Jarvis: {sentence}")
+                self.speech_handler.speak(sentence)
+                sentences.append(sentence)
+        finally:
+            # Closing the generator records the interrupted turn and closes the model's stream
+            responses.close()
+        return " ".join(sentences)
+    
     def process_text_command(self, text):
         """Process a text command (useful for testing or alternative input methods)."""
         if "jarvis" in text.lower():
-            query = text.lower().replace("jarvis", "").strip()
+            query = self._extract_query(text)
             if query:
                 response = self.ai_handler.process_query(query)
                 print(f"Jarvis: {response}")
                 return response
         return None
     
+    async def aprocess_text_command(self, text):
+        """Async variant of process_text_command, for callers running their own event loop."""
+        if "jarvis" in text.lower():
+            query = self._extract_query(text)
+            if query:
+                response = await self.ai_handler.aprocess_query(query)
+                print(f"Jarvis: {response}")
+                return response
+        return None
+    
     def get_conversation_stats(self):
         """Get conversation statistics."""
-        return self.ai_handler.get_conversation_stats()
+        stats = self.ai_handler.get_conversation_stats()
+        stats['speculation'] = self.speculator.get_stats() if self.speculator else None
+        stats['wake_word'] = self.speech_handler.get_wake_word_stats()
+        stats['tts'] = self.speech_handler.get_tts_stats()
+        stats['audio_devices'] = self.speech_handler.get_device_stats()
+        stats['startup'] = self.warmup.get_stats() if self.warmup else None
+        stats['app_index'] = get_app_index().get_stats() if APP_INDEX_SETTINGS['enabled'] else None
+        return stats
     
     def clear_history(self):
         """Clear conversation history."""
@@ -4,9 +4,11 @@ Jarvis - AI Voice Assistant
 A modular voice assistant with speech recognition, AI processing, and function calling.
 """
 
-from jarvis import Jarvis
-from speech_handler import SpeechHandler
-from config import AUDIO_SETTINGS
+import argparse
+from startup_profiler import PROFILER, phase
+
+# Everything else is imported inside main(), after the profiler is enabled and the
+# microphone is chosen, so heavy dependencies (openai, pyautogui, ...) load only when needed
 
 def select_audio_device():
     """
@@ -15,6 +17,8 @@ def select_audio_device():
     Returns:
         int or None: Selected microphone device index, or None for default
     """
+    from speech_handler import SpeechHandler
+    
     # Get unique devices (deduplicated)
     devices = SpeechHandler.list_unique_audio_devices()
     
@@ -64,15 +68,33 @@ def select_audio_device():
             print("\nUsing default microphone.")
             return None
 
+def parse_args():
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Jarvis - AI Voice Assistant")
+    parser.add_argument(
+        "--startup-profile",
+        action="store_true",
+        help="Report per-module import time and per-phase init time once Jarvis is ready"
+    )
+    return parser.parse_args()
+
 def main():
     """Main entry point for the Jarvis application."""
+    args = parse_args()
+    if args.startup_profile:
+        PROFILER.enable()
+    
     try:
+        with phase("load config"):
+            from config import AUDIO_SETTINGS
+        
         # Get microphone device index from config or user selection
         mic_device_index = None
         
         if AUDIO_SETTINGS['auto_select_device']:
-            # Prompt user to select device
-            mic_device_index = select_audio_device()
+            # Prompt user to select device (the time spent waiting for input is part of this phase)
+            with phase("select audio device"):
+                mic_device_index = select_audio_device()
         else:
             # Use device from config
             mic_device_index = AUDIO_SETTINGS['mic_device_index']
@@ -82,7 +104,10 @@ def main():
                 print("Using default microphone device.")
         
         # Create and start Jarvis with selected device
-        jarvis = Jarvis(mic_device_index=mic_device_index)
+        with phase("import jarvis"):
+            from jarvis import Jarvis
+        with phase("initialize jarvis"):
+            jarvis = Jarvis(mic_device_index=mic_device_index)
         jarvis.start()
     except KeyboardInterrupt:
         print("\nJarvis interrupted by user.")
@@ -0,0 +1,89 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Tuple
+
+class PhraseCache:
+    """
+    Rendered speech for phrases Jarvis says again and again, kept in memory.
+
+    Entries are keyed by (text, voice, rate, volume) and hold the synthesized PCM,
+    so a cached phrase is played without going through the TTS engine at all. The
+    cache is bounded by total PCM bytes and evicts least recently used phrases.
+
+    A phrase is cached once it has been spoken min_uses times, so one-off sentences
+    from model replies don't push out the fixed ones ("Yes, sir? How can I help
+    you?", "Opened Chrome", ...). Phrases rendered ahead of time are always cached.
+    """
+
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, min_uses: int = 2, max_tracked: int = 512):
+        self.max_bytes = max_bytes
+        self.min_uses = min_uses
+        self.max_tracked = max_tracked
+        self.entries: "OrderedDict[Tuple, Any]" = OrderedDict()
+        self.size = 0
+        self._uses: "OrderedDict[Tuple, int]" = OrderedDict()  # Times each uncached phrase was spoken
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'invalidations': 0}
+
+    @staticmethod
+    def key(text: str, voice: Hashable, rate: Any, volume: Any) -> Tuple:
+        """Cache key for a phrase spoken with the given engine settings."""
+        return (" ".join(text.split()), voice, rate, volume)
+
+    def get(self, key: Tuple):
+        """Return the cached clip for key (marking it recently used), or None."""
+        with self._lock:
+            clip = self.entries.get(key)
+            if clip is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return clip
+
+    def should_cache(self, key: Tuple) -> bool:
+        """Count a use of an uncached phrase; True once it has been used often enough to keep."""
+        with self._lock:
+            uses = self._uses.pop(key, 0) + 1
+            if uses >= self.min_uses:
+                return True
+            self._uses[key] = uses
+            if len(self._uses) > self.max_tracked:
+                self._uses.popitem(last=False)
+            return False
+
+    def put(self, key: Tuple, clip):
+        """Store a rendered clip, evicting least recently used phrases to stay under max_bytes."""
+        size = len(clip.pcm)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self.entries:
+                self.size -= len(self.entries.pop(key).pcm)
+            self._uses.pop(key, None)
+            while self.entries and self.size + size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted.pcm)
+                self.stats['evictions'] += 1
+            self.entries[key] = clip
+            self.size += size
+
+    def clear(self):
+        """Drop every cached phrase (e.g. after the voice changed)."""
+        with self._lock:
+            if self.entries:
+                self.stats['invalidations'] += 1
+            self.entries.clear()
+            self._uses.clear()
+            self.size = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and memory use."""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return dict(
+                self.stats,
+                phrases=len(self.entries),
+                bytes=self.size,
+                hit_rate=self.stats['hits'] / lookups if lookups else 0.0
+            )
@@ -0,0 +1,230 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, FrozenSet, List, Tuple
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Words that don't change what is being asked ("what's the weather in nyc" vs "weather new york today")
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "at", "by", "with", "about",
+    "what", "whats", "how", "who", "which", "does", "do",
+    "me", "my", "i", "you", "your", "please", "tell", "show", "give", "find", "search", "look",
+    "up", "can", "could", "would", "jarvis", "s", "today", "now", "right", "currently", "current"
+}
+
+# Common abbreviations expanded before comparison
+ALIASES = {
+    "nyc": "new york",
+    "ny": "new york",
+    "la": "los angeles",
+    "sf": "san francisco",
+    "uk": "united kingdom",
+    "us": "united states",
+    "usa": "united states",
+    "temp": "temperature"
+}
+
+def _stem(word: str) -> str:
+    """Strip a plural "s" so "prices"/"price" compare equal."""
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+def content_words(text: str) -> List[str]:
+    """Lowercased words of text with aliases expanded and stopwords dropped (not stemmed)."""
+    words = []
+    for word in WORD_PATTERN.findall(text.lower().replace("'", "")):
+        words.extend(ALIASES.get(word, word).split())
+    return [word for word in words if word not in STOPWORDS]
+
+def shingles(text: str) -> FrozenSet[str]:
+    """Normalize text into the set of content words used for similarity."""
+    return frozenset(_stem(word) for word in content_words(text))
+
+def jaccard(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two shingle sets."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+class SemanticCache:
+    """
+    Bounded cache keyed by similar text rather than exact text.
+
+    Entries are looked up by Jaccard similarity of normalized content words, found
+    through an inverted index so a lookup only compares entries sharing a word.
+    Entries live in separate namespaces (e.g. one per tool, one for final answers)
+    and expire according to freshness rules: "weather today" goes stale long before
+    "capital of France".
+    """
+
+    def __init__(self, max_entries: int, threshold: float, default_ttl: float,
+                 freshness_rules: List[Tuple[List[str], float]] = None, persist_path: str = None,
+                 save_interval: float = 30):
+        self.max_entries = max_entries
+        self.threshold = threshold
+        self.default_ttl = default_ttl
+        self.freshness_rules = [(frozenset(keywords), ttl) for keywords, ttl in (freshness_rules or [])]
+        self.persist_path = persist_path
+        self.save_interval = save_interval
+
+        self._entries = OrderedDict()  # (namespace, shingles) -> entry dict
+        self._index = defaultdict(set)  # (namespace, word) -> entry keys
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if persist_path:
+            self.load()
+
+    def ttl_for(self, text: str) -> float:
+        """Pick the time-to-live for text from the first freshness rule it matches."""
+        # Keywords match a word or its singular, but are never stemmed themselves ("news" isn't "new")
+        words = content_words(text)
+        words = set(words) | {_stem(word) for word in words}
+        for keywords, ttl in self.freshness_rules:
+            if words & keywords:
+                return ttl
+        return self.default_ttl
+
+    def get(self, namespace: str, text: str) -> Tuple[bool, Any]:
+        """
+        Look up the value stored for the most similar text in a namespace.
+
+        Returns:
+            tuple: (hit, value) - value is None on a miss
+        """
+        words = shingles(text)
+        now = time.time()
+        with self._lock:
+            best_key, best_score = None, 0.0
+            candidates = set()
+            for word in words:
+                candidates |= self._index.get((namespace, word), set())
+            for key in candidates:
+                entry = self._entries[key]
+                if entry['expires_at'] <= now:
+                    self._remove(key)
+                    self.expirations += 1
+                    continue
+                # Numbers and other differing words that carry digits change the question entirely
+                if any(any(c.isdigit() for c in word) for word in words ^ key[1]):
+                    continue
+                score = jaccard(words, key[1])
+                if score > best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None or best_score < self.threshold:
+                self.misses += 1
+                return False, None
+
+            self._entries.move_to_end(best_key)
+            self.hits += 1
+            return True, self._entries[best_key]['value']
+
+    def set(self, namespace: str, text: str, value: Any, ttl: float = None):
+        """Store a value for text, evicting the least recently used entries beyond capacity."""
+        words = shingles(text)
+        if not words:
+            return
+        ttl = self.ttl_for(text) if ttl is None else ttl
+        key = (namespace, words)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = {'text': text, 'value': value, 'expires_at': time.time() + ttl}
+            for word in words:
+                self._index[(namespace, word)].add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._dirty = True
+
+        if self.persist_path and time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def _remove(self, key):
+        """Drop an entry and its index postings (caller holds the lock)."""
+        del self._entries[key]
+        namespace, words = key
+        for word in words:
+            postings = self._index.get((namespace, word))
+            if postings is not None:
+                postings.discard(key)
+                if not postings:
+                    del self._index[(namespace, word)]
+
+    def clear(self):
+        """Remove all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._index.clear()
+            self._dirty = True
+
+    def save(self):
+        """Write unexpired entries to persist_path (atomically), if anything changed."""
+        if not self.persist_path:
+            return
+        now = time.time()
+        with self._lock:
+            if not self._dirty:
+                return
+            records = [
+                {'namespace': namespace, 'text': entry['text'], 'value': entry['value'], 'expires_at': entry['expires_at']}
+                for (namespace, _), entry in self._entries.items()
+                if entry['expires_at'] > now
+            ]
+            self._dirty = False
+            self._last_save = time.monotonic()
+
+        try:
+            directory = os.path.dirname(os.path.abspath(self.persist_path))
+            os.makedirs(directory, exist_ok=True)
+            temp_path = self.persist_path + ".tmp"
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump(records, f)
+            os.replace(temp_path, self.persist_path)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"Could not save answer cache: {e}")
+
+    def load(self):
+        """Load unexpired entries from persist_path, oldest first so recency order is kept."""
+        if not self.persist_path or not os.path.exists(self.persist_path):
+            return
+        try:
+            with open(self.persist_path, "r", encoding="utf-8") as f:
+                records = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not load answer cache: {e}")
+            return
+
+        now = time.time()
+        for record in records:
+            remaining = record['expires_at'] - now
+            if remaining > 0:
+                self.set(record['namespace'], record['text'], record['value'], ttl=remaining)
+        self._dirty = False
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache hit/miss/eviction counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'threshold': self.threshold,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
@@ -0,0 +1,78 @@
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """
+    Coalesce concurrent calls for the same key into one upstream call.
+
+    The first caller for a key (the leader) runs the call; callers arriving while it
+    is in flight wait for the same result instead of making their own. Once the call
+    finishes the key is forgotten, so later calls go upstream again (caching is a
+    separate concern). Threads and coroutines share the same in-flight calls: a
+    coroutine can wait on a call a thread started, and vice versa.
+    """
+
+    def __init__(self):
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'upstream': 0, 'coalesced': 0}
+
+    def _join(self, key):
+        """Return (future, is_leader) for key, registering a new in-flight call if there is none."""
+        with self._lock:
+            self.stats['calls'] += 1
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.stats['coalesced'] += 1
+                return future, False
+            future = Future()
+            self._in_flight[key] = future
+            self.stats['upstream'] += 1
+            return future, True
+
+    def _finish(self, key, future, result=None, error=None):
+        """Publish the leader's result (or exception) to every waiter and forget the key."""
+        with self._lock:
+            self._in_flight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: Hashable, call: Callable[[], Any]) -> Any:
+        """Run call() for key, or wait for the identical call already in flight."""
+        future, leader = self._join(key)
+        if not leader:
+            return future.result()
+        try:
+            result = call()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    async def ado(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        """Async variant of do(): await call() for key, or the identical call already in flight."""
+        future, leader = self._join(key)
+        if not leader:
+            return await asyncio.wrap_future(future)
+        try:
+            result = await call()
+        except BaseException as e:
+            self._finish(key, future, error=e)
+            raise
+        self._finish(key, future, result)
+        return result
+
+    def get_stats(self):
+        """Get call counts and how many upstream calls were saved by coalescing."""
+        with self._lock:
+            calls = self.stats['calls']
+            return dict(
+                self.stats,
+                in_flight=len(self._in_flight),
+                saved_rate=self.stats['coalesced'] / calls if calls else 0.0
+            )
@@ -0,0 +1,140 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from text_utils import normalize_text
+
+class SpeculativeRequest:
+    """A first model turn started early for a partial transcript."""
+
+    def __init__(self, key: str, future):
+        self.key = key
+        self.future = future
+        self.started_at = time.perf_counter()
+        self.finished_at = None
+
+class Speculator:
+    """
+    Start the first model turn while the user is still speaking.
+
+    Partial transcripts are fed to on_partial(). Once the same hypothesis has been seen
+    stable_partials times in a row, start_request(query) runs in the background. When
+    the final transcript arrives, resolve() commits the speculative result if it matches
+    (after normalization) or discards it. start_request must be free of side effects,
+    since discarded results are simply dropped.
+    """
+
+    def __init__(self, start_request: Callable[[str], Any], stable_partials: int = 3, min_words: int = 2,
+                 max_workers: int = 2):
+        self.start_request = start_request
+        self.stable_partials = stable_partials
+        self.min_words = min_words
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="jarvis-speculate")
+        self._lock = threading.Lock()
+
+        self._last_partial = None
+        self._repeats = 0
+        self._pending: Optional[SpeculativeRequest] = None
+
+        self.stats = {'started': 0, 'committed': 0, 'wasted': 0, 'skipped': 0, 'missed': 0, 'saved_ms': 0.0}
+
+    def _run(self, request: SpeculativeRequest, query: str):
+        """Run start_request on a worker thread, recording when it finished."""
+        try:
+            return self.start_request(query)
+        finally:
+            request.finished_at = time.perf_counter()
+
+    def on_partial(self, text: str):
+        """Feed a partial transcript; starts a speculative request once it has been stable long enough."""
+        key = normalize_text(text)
+        if not key:
+            return
+
+        with self._lock:
+            if key == self._last_partial:
+                self._repeats += 1
+            else:
+                self._last_partial = key
+                self._repeats = 1
+
+            if self._repeats < self.stable_partials or len(key.split()) < self.min_words:
+                return
+            if self._pending is not None:
+                if self._pending.key == key:
+                    return
+                # The hypothesis moved on after we started: the earlier request is wasted
+                self._discard_pending()
+
+            request = SpeculativeRequest(key, None)
+            request.future = self.executor.submit(self._run, request, text)
+            self._pending = request
+            self.stats['started'] += 1
+
+    def resolve(self, final_text: Optional[str]):
+        """
+        Match the final transcript against the speculative request.
+
+        Returns:
+            The speculative result if it was started for this transcript and succeeded,
+            otherwise None (the caller then processes the transcript normally)
+        """
+        resolved_at = time.perf_counter()
+        with self._lock:
+            request = self._pending
+            self._pending = None
+            self._last_partial = None
+            self._repeats = 0
+
+            if request is None:
+                if final_text:
+                    self.stats['missed'] += 1
+                return None
+
+            if not final_text or normalize_text(final_text) != request.key:
+                request.future.cancel()
+                self.stats['wasted'] += 1
+                return None
+
+        try:
+            result = request.future.result()
+        except Exception as e:
+            print(f"Speculative request failed: {e}")
+            with self._lock:
+                self.stats['wasted'] += 1
+            return None
+
+        with self._lock:
+            if result is None:
+                # start_request declined (e.g. the query is answered locally); no model call was made
+                self.stats['skipped'] += 1
+                return None
+            # Latency saved: how much of the request ran before the final transcript was known
+            self.stats['committed'] += 1
+            self.stats['saved_ms'] += (min(request.finished_at, resolved_at) - request.started_at) * 1000
+        return result
+
+    def discard(self):
+        """Drop any speculative request, e.g. when nothing was recognized."""
+        with self._lock:
+            self._discard_pending()
+            self._last_partial = None
+            self._repeats = 0
+
+    def _discard_pending(self):
+        """Cancel the pending request and count it as wasted (caller holds the lock)."""
+        if self._pending is not None:
+            self._pending.future.cancel()
+            self.stats['wasted'] += 1
+            self._pending = None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get speculation counters, including the share of started requests that were wasted."""
+        with self._lock:
+            started = self.stats['started']
+            committed = self.stats['committed']
+            return dict(
+                self.stats,
+                waste_rate=self.stats['wasted'] / started if started else 0.0,
+                average_saved_ms=self.stats['saved_ms'] / committed if committed else 0.0
+            )
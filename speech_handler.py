@@ -1,8 +1,142 @@
+import json
+import os
+import threading
+import time
 import speech_recognition as sr
-import pyttsx3
-import pyaudio
 import platform
-from config import VOICE_SETTINGS, RECOGNITION_SETTINGS, LISTENING_SETTINGS
+from config import VOICE_SETTINGS, RECOGNITION_SETTINGS, LISTENING_SETTINGS, AUDIO_SETTINGS, WAKE_WORD_SETTINGS, PHRASE_CACHE_SETTINGS
+from audio_capture import AudioCapture, CaptureSource
+from wake_word import load_vosk_model, create_wake_word_detector
+from vad import VoiceActivityDetector, listen_with_vad
+from tts_worker import SpeechWorker
+from phrase_cache import PhraseCache
+from audio_devices import get_device_manager
+from startup_profiler import phase
+
+class RecognitionBackend:
+    """Turns speech from an open microphone source into text."""
+    
+    name = "base"
+    
+    def listen(self, source, timeout, phrase_time_limit, on_partial=None):
+        """
+        Listen for one utterance on an open sr.Microphone source.
+        
+        Returns:
+            str or None: The recognized text, or None if nothing was recognized
+        """
+        raise NotImplementedError
+
+class GoogleRecognitionBackend(RecognitionBackend):
+    """Google Speech Recognition: records the whole phrase, then sends it for recognition."""
+    
+    name = "google"
+    
+    def __init__(self, recognizer, vad=None):
+        self.recognizer = recognizer
+        self.vad = vad
+    
+    def listen(self, source, timeout, phrase_time_limit, on_partial=None):
+        try:
+            if self.vad is not None:
+                audio = listen_with_vad(source, self.vad, timeout, phrase_time_limit, RECOGNITION_SETTINGS['vad_preroll_ms'])
+            else:
+                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
+            return self.recognizer.recognize_google(audio)
+        except sr.WaitTimeoutError:
+            print("No speech detected, continuing to listen...")
+            return None
+        except sr.UnknownValueError:
+            print("Could not understand audio")
+            return None
+        except sr.RequestError as e:
+            print(f"Could not request results from Google Speech Recognition service; {e}")
+            return None
+
+class VoskRecognitionBackend(RecognitionBackend):
+    """
+    Offline recognition with Vosk.
+    
+    The model is loaded once; microphone audio is fed to it chunk by chunk as it is
+    captured, so partial transcripts are available while the user is still speaking
+    and the final transcript is ready as soon as they stop. With a VAD, the utterance
+    ends when the VAD detects the end of speech instead of at Vosk's own endpoint.
+    """
+    
+    name = "vosk"
+    
+    def __init__(self, model_path, vad=None):
+        self.model = load_vosk_model(model_path)
+        self.vad = vad
+    
+    def listen(self, source, timeout, phrase_time_limit, on_partial=None):
+        import vosk
+        recognizer = vosk.KaldiRecognizer(self.model, source.SAMPLE_RATE)
+        started_at = time.monotonic()
+        speech_started_at = None
+        if self.vad is not None:
+            self.vad.reset()
+        
+        try:
+            while True:
+                data = source.stream.read(source.CHUNK)
+                now = time.monotonic()
+                
+                if self.vad is not None:
+                    _, ended = self.vad.process(data)
+                    if ended:
+                        text = json.loads(recognizer.FinalResult()).get("text", "")
+                        if text:
+                            return text
+                        # Noise rather than words; keep listening
+                
+                if recognizer.AcceptWaveform(data):
+                    # End of an utterance; empty results are silence or noise, keep listening
+                    text = json.loads(recognizer.Result()).get("text", "")
+                    if text:
+                        return text
+                else:
+                    partial = json.loads(recognizer.PartialResult()).get("partial", "")
+                    if partial:
+                        if speech_started_at is None:
+                            speech_started_at = now
+                        if on_partial is not None:
+                            on_partial(partial)
+                
+                if speech_started_at is None:
+                    if timeout and now - started_at > timeout:
+                        print("No speech detected, continuing to listen...")
+                        return None
+                elif phrase_time_limit and now - speech_started_at > phrase_time_limit:
+                    return json.loads(recognizer.FinalResult()).get("text", "") or None
+        except OSError as e:
+            print(f"Error reading microphone audio: {e}")
+            return None
+
+def create_recognition_backend(recognizer, vad=None):
+    """Create the recognition backend selected in RECOGNITION_SETTINGS, falling back to Google."""
+    backend = RECOGNITION_SETTINGS.get('backend', 'google')
+    
+    if backend == 'vosk':
+        model_path = RECOGNITION_SETTINGS.get('vosk_model_path')
+        # Imported only when selected; loading vosk is slow and the default backend doesn't need it
+        try:
+            import vosk
+        except ImportError:
+            vosk = None
+        if vosk is None:
+            print("Vosk is not installed (pip install vosk); using Google Speech Recognition.")
+        elif not model_path or not os.path.isdir(model_path):
+            print(f"Vosk model not found at {model_path!r}; using Google Speech Recognition.")
+        else:
+            try:
+                return VoskRecognitionBackend(model_path, vad)
+            except Exception as e:
+                print(f"Could not load Vosk model: {e}; using Google Speech Recognition.")
+    elif backend != 'google':
+        print(f"Unknown recognition backend {backend!r}; using Google Speech Recognition.")
+    
+    return GoogleRecognitionBackend(recognizer, vad)
 
 class SpeechHandler:
     def __init__(self, mic_device_index=None):
@@ -13,26 +147,93 @@ class SpeechHandler:
             mic_device_index: Index of the microphone device to use. If None, uses default.
         """
         self.recognizer = sr.Recognizer()
-        self.engine = pyttsx3.init()
         
-        # Initialize microphone with selected device or default
-        if mic_device_index is not None:
-            self.mic = sr.Microphone(device_index=mic_device_index)
-            self.mic_device_index = mic_device_index
-        else:
-            self.mic = sr.Microphone()
-            self.mic_device_index = None
+        self.mic_device_index = mic_device_index
         
-        # Configure voice settings (platform-specific)
-        self._configure_voice()
-        self.engine.setProperty('rate', VOICE_SETTINGS['rate'])
-        self.engine.setProperty('volume', VOICE_SETTINGS['volume'])
+        # Devices are enumerated once; the manager watches for hot-plug changes so an
+        # unplugged microphone falls back to the default device instead of ending the session
+        self.device_manager = get_device_manager()
+        selected = self.device_manager.get_device(mic_device_index) if mic_device_index is not None else None
+        self.mic_device_name = selected['name'] if selected else None
+        self._failed_over = False
+        self.device_manager.add_listener(self._on_devices_changed)
+        self.device_manager.add_release_callback(self._release_audio_devices)
+        self.device_manager.start_monitor()
+        
+        # Capture continuously from one long-lived stream, so nothing is lost between
+        # utterances; otherwise open the microphone for each utterance
+        self.capture = None
+        if AUDIO_SETTINGS['persistent_capture']:
+            try:
+                self.capture = AudioCapture(
+                    device_index=mic_device_index,
+                    sample_rate=AUDIO_SETTINGS['capture_sample_rate'],
+                    chunk=AUDIO_SETTINGS['capture_chunk'],
+                    buffer_seconds=AUDIO_SETTINGS['capture_buffer_seconds']
+                )
+                with phase("audio capture"):
+                    self.capture.start()
+                self.mic = CaptureSource(self.capture)
+            except Exception as e:
+                print(f"Could not start persistent audio capture: {e}. Opening the microphone per utterance.")
+                self.capture = None
+        
+        # Initialize microphone with selected device or default
+        if self.capture is None:
+            if mic_device_index is not None:
+                self.mic = sr.Microphone(device_index=mic_device_index)
+            else:
+                self.mic = sr.Microphone()
         
         # Configure recognition settings
         self.recognizer.energy_threshold = RECOGNITION_SETTINGS['energy_threshold']
         self.recognizer.dynamic_energy_threshold = RECOGNITION_SETTINGS['dynamic_energy_threshold']
         self.recognizer.pause_threshold = RECOGNITION_SETTINGS['pause_threshold']
         self.recognizer.operation_timeout = RECOGNITION_SETTINGS['operation_timeout']
+        
+        # Voice activity detection ends utterances shortly after speech stops,
+        # instead of waiting out pause_threshold of silence
+        self.vad = None
+        if RECOGNITION_SETTINGS['endpointing'] == 'vad':
+            self.vad = VoiceActivityDetector(
+                self.mic.SAMPLE_RATE,
+                frame_ms=RECOGNITION_SETTINGS['vad_frame_ms'],
+                margin_db=RECOGNITION_SETTINGS['vad_margin_db'],
+                min_band_ratio=RECOGNITION_SETTINGS['vad_min_band_ratio'],
+                onset_ms=RECOGNITION_SETTINGS['vad_onset_ms'],
+                hangover_ms=RECOGNITION_SETTINGS['vad_hangover_ms']
+            )
+        
+        # Loaded once here; local engines keep their model in memory between utterances
+        with phase("recognition backend"):
+            self.recognition_backend = create_recognition_backend(self.recognizer, self.vad)
+        
+        # Optional on-device wake word: nothing is sent to speech recognition until it is heard
+        with phase("wake word"):
+            self.wake_word_detector = create_wake_word_detector(
+                WAKE_WORD_SETTINGS, self.mic.SAMPLE_RATE, RECOGNITION_SETTINGS.get('vosk_model_path')
+            )
+        
+        # Speech is synthesized and played on background threads; speak() only queues it
+        self.phrase_cache = None
+        if PHRASE_CACHE_SETTINGS['enabled']:
+            self.phrase_cache = PhraseCache(PHRASE_CACHE_SETTINGS['max_bytes'], PHRASE_CACHE_SETTINGS['min_uses'])
+        self._speaking = threading.Event()
+        self.tts = SpeechWorker(
+            self._create_engine,
+            output_device_index=AUDIO_SETTINGS['audio_output_device_index'],
+            tail_seconds=AUDIO_SETTINGS['tts_delay_after_speak'],
+            on_start=self._on_speech_start,
+            on_idle=self._on_speech_idle,
+            phrase_cache=self.phrase_cache
+        )
+        self.tts.prerender(PHRASE_CACHE_SETTINGS['prerender'])
+        
+        # Barge-in: watch the live microphone while speaking and stop as soon as the user talks
+        self._barge_in_thread = None
+        if self.capture is not None and AUDIO_SETTINGS['barge_in']:
+            self._barge_in_thread = threading.Thread(target=self._monitor_barge_in, name="jarvis-barge-in", daemon=True)
+            self._barge_in_thread.start()
     
     @staticmethod
     def list_audio_input_devices():
@@ -42,27 +243,7 @@ class SpeechHandler:
         Returns:
             list: List of dictionaries containing device info (index, name, channels)
         """
-        devices = []
-        try:
-            p = pyaudio.PyAudio()
-            device_count = p.get_device_count()
-            
-            for i in range(device_count):
-                device_info = p.get_device_info_by_index(i)
-                # Check if device has input channels (microphone)
-                if device_info['maxInputChannels'] > 0:
-                    devices.append({
-                        'index': i,
-                        'name': device_info['name'],
-                        'channels': device_info['maxInputChannels'],
-                        'sample_rate': int(device_info['defaultSampleRate'])
-                    })
-            
-            p.terminate()
-        except Exception as e:
-            print(f"Error listing audio devices: {e}")
-        
-        return devices
+        return get_device_manager().input_devices()
     
     @staticmethod
     def list_audio_output_devices():
@@ -72,27 +253,7 @@ class SpeechHandler:
         Returns:
             list: List of dictionaries containing device info (index, name, channels)
         """
-        devices = []
-        try:
-            p = pyaudio.PyAudio()
-            device_count = p.get_device_count()
-            
-            for i in range(device_count):
-                device_info = p.get_device_info_by_index(i)
-                # Check if device has output channels (speakers)
-                if device_info['maxOutputChannels'] > 0:
-                    devices.append({
-                        'index': i,
-                        'name': device_info['name'],
-                        'channels': device_info['maxOutputChannels'],
-                        'sample_rate': int(device_info['defaultSampleRate'])
-                    })
-            
-            p.terminate()
-        except Exception as e:
-            print(f"Error listing audio devices: {e}")
-        
-        return devices
+        return get_device_manager().output_devices()
     
     @staticmethod
     def list_unique_audio_devices():
@@ -103,53 +264,91 @@ class SpeechHandler:
         Returns:
             list: List of unique device dictionaries with the first occurrence of each device name
         """
-        input_devices = SpeechHandler.list_audio_input_devices()
-        
-        if not input_devices:
-            return []
-        
-        # Deduplicate by device name (normalized)
-        seen_names = set()
-        unique_devices = []
-        
-        for device in input_devices:
-            # Normalize name for comparison (remove extra whitespace)
-            normalized_name = ' '.join(device['name'].split())
-            
-            if normalized_name not in seen_names:
-                seen_names.add(normalized_name)
-                unique_devices.append(device)
-        
-        return unique_devices
+        return get_device_manager().unique_input_devices()
+    
+    def _on_devices_changed(self, devices):
+        """Fail over to the default microphone when the selected one is unplugged, and back when it returns."""
+        if self.mic_device_name is None:
+            return
+        index = self.device_manager.find_input_device(self.mic_device_name)
+        if index is None and not self._failed_over:
+            print(f"Microphone '{self.mic_device_name}' was disconnected; using the default microphone.")
+            self._use_microphone(None)
+            self._failed_over = True
+        elif index is not None and self._failed_over:
+            print(f"Microphone '{self.mic_device_name}' is back; switching to it.")
+            self._use_microphone(index)
+            self._failed_over = False
+    
+    def _release_audio_devices(self):
+        """
+        While waiting for an unplugged microphone to come back, reopen the PortAudio
+        instances holding the old device list so the next rescan can see it.
+
+        The microphone is only reopened while nobody is talking, so no speech is lost.
+        """
+        if not self._failed_over:
+            return
+        self.tts.release_audio()
+        if (self.capture is not None and not self._speaking.is_set()
+                and self.capture.is_quiet(1.0, self.recognizer.energy_threshold)):
+            self.capture.switch_device(None)
+    
+    def _use_microphone(self, device_index):
+        """Switch input to device_index (None = default) without restarting the session."""
+        self.mic_device_index = device_index
+        if self.capture is not None:
+            # Readers keep their place in the ring buffer across the switch
+            self.capture.switch_device(device_index)
+        else:
+            self.mic = sr.Microphone(device_index=device_index)
+    
+    @property
+    def engine(self):
+        """
+        The pyttsx3 engine (initialized in the background on first use). It belongs to
+        the TTS synthesis thread; use list_available_voices() and set_voice() instead.
+        """
+        return self.tts.engine
+    
+    def _create_engine(self):
+        """Initialize pyttsx3 and apply the voice settings."""
+        import pyttsx3
+        engine = pyttsx3.init()
+        # Configure voice settings (platform-specific)
+        self._configure_voice(engine)
+        engine.setProperty('rate', VOICE_SETTINGS['rate'])
+        engine.setProperty('volume', VOICE_SETTINGS['volume'])
+        return engine
     
-    def _configure_voice(self):
+    def _configure_voice(self, engine):
         """Configure TTS voice based on platform."""
         system = platform.system()
         
         if system == "Windows":
             # Get available Windows voices
-            voices = self.engine.getProperty('voices')
+            voices = engine.getProperty('voices')
             if voices:
                 # Prefer SAPI5 voices (Windows built-in)
                 # Try to find a natural-sounding voice
                 for voice in voices:
                     # Look for Microsoft voices (usually better quality)
                     if 'microsoft' in voice.name.lower() or 'zira' in voice.name.lower() or 'david' in voice.name.lower():
-                        self.engine.setProperty('voice', voice.id)
+                        engine.setProperty('voice', voice.id)
                         print(f"Using voice: {voice.name}")
                         return
                 # Fallback to first available voice
                 if voices:
-                    self.engine.setProperty('voice', voices[0].id)
+                    engine.setProperty('voice', voices[0].id)
                     print(f"Using voice: {voices[0].name}")
         elif system == "Darwin":  # macOS
             # Use configured macOS voice
-            self.engine.setProperty('voice', VOICE_SETTINGS['voice'])
+            engine.setProperty('voice', VOICE_SETTINGS['voice'])
         else:  # Linux
             # Use default Linux voice
-            voices = self.engine.getProperty('voices')
+            voices = engine.getProperty('voices')
             if voices:
-                self.engine.setProperty('voice', voices[0].id)
+                engine.setProperty('voice', voices[0].id)
     
     @staticmethod
     def print_audio_devices():
@@ -174,61 +373,163 @@ class SpeechHandler:
         """Calibrate microphone for ambient noise."""
         print("Calibrating microphone for ambient noise...")
         with self.mic as source:
-            self.recognizer.adjust_for_ambient_noise(source, duration=duration)
+            if self.vad is not None:
+                # Seed the VAD noise floor; it keeps adapting while listening
+                chunks = max(1, int(duration * source.SAMPLE_RATE / source.CHUNK))
+                self.vad.calibrate(b"".join(source.stream.read(source.CHUNK) for _ in range(chunks)))
+            else:
+                self.recognizer.adjust_for_ambient_noise(source, duration=duration)
         print("Calibration complete. Jarvis is ready!")
     
-    def listen_for_speech(self, timeout=None, phrase_time_limit=None):
-        """Listen for speech input and return the recognized text."""
+    def listen_for_speech(self, timeout=None, phrase_time_limit=None, on_partial=None):
+        """
+        Listen for speech input and return the recognized text.
+        
+        Args:
+            timeout: Seconds to wait for speech to start (default from LISTENING_SETTINGS)
+            phrase_time_limit: Maximum phrase length in seconds (default from LISTENING_SETTINGS)
+            on_partial: Optional callback for partial transcripts while the user is speaking.
+                        Only backends that produce partial results (Vosk) call it; Google
+                        Speech Recognition returns the final transcript only.
+        """
         # Use configured defaults if not specified
         if timeout is None:
             timeout = LISTENING_SETTINGS['timeout']
         if phrase_time_limit is None:
             phrase_time_limit = LISTENING_SETTINGS['phrase_time_limit']
+        
+        # Without persistent capture, our own voice can't be skipped: let speech finish first
+        if self.capture is None:
+            self.tts.wait_until_done()
             
-        with self.mic as source:
-            print("Listening...")
+        try:
+            with self.mic as source:
+                if self.wake_word_detector is not None and not self._wait_for_wake_word(source, timeout):
+                    return None
+                print("Listening...")
+                text = self.recognition_backend.listen(source, timeout, phrase_time_limit, on_partial)
+                if text:
+                    print(f"You said: {text}")
+                return text or None
+        except OSError as e:
+            # The microphone went away between device scans
+            print(f"Error opening microphone: {e}")
+            if self.capture is None and self.mic_device_index is not None:
+                print("Using the default microphone.")
+                self._use_microphone(None)
+                self._failed_over = True
+            return None
+    
+    def _wait_for_wake_word(self, source, timeout=None):
+        """
+        Run the wake-word detector on incoming audio until it fires.
+        
+        Returns:
+            bool: True once the wake word was heard, False if timeout seconds passed without it
+        """
+        print("Waiting for wake word...")
+        started_at = time.monotonic()
+        while True:
             try:
-                audio = self.recognizer.listen(source, timeout=timeout, phrase_time_limit=phrase_time_limit)
-                text = self.recognizer.recognize_google(audio)
-                print(f"You said: {text}")
-                return text
-            except sr.WaitTimeoutError:
-                print("No speech detected, continuing to listen...")
-                return None
-            except sr.UnknownValueError:
-                print("Could not understand audio")
-                return None
-            except sr.RequestError as e:
-                print(f"Could not request results from Google Speech Recognition service; {e}")
-                return None
+                data = source.stream.read(source.CHUNK)
+            except OSError as e:
+                print(f"Error reading microphone audio: {e}")
+                return False
+            
+            if self.wake_word_detector.feed(data):
+                self.wake_word_detector.reset()
+                print("Wake word detected.")
+                return True
+            
+            if timeout and time.monotonic() - started_at > timeout:
+                return False
+    
+    def get_wake_word_stats(self):
+        """Get wake-word detections and CPU cost per second of audio, or None if gating is off."""
+        return self.wake_word_detector.get_stats() if self.wake_word_detector is not None else None
     
     def speak(self, text):
-        """Convert text to speech and wait for it to complete."""
+        """Queue text to be spoken and return immediately (sentences are spoken in order)."""
         if not text or not text.strip():
             return
-        try:
-            self.engine.say(text)
-            self.engine.runAndWait()
-            # Add a small delay after TTS completes to ensure audio finishes
-            import time
-            time.sleep(0.3)  # Small buffer to ensure audio playback completes
-        except Exception as e:
-            print(f"Error in TTS: {e}")
-            # Fallback to print if TTS fails
-            print(f"Jarvis (TTS failed): {text}")
+        self.tts.speak(text)
+    
+    def wait_until_done(self, timeout=None):
+        """Block until everything queued with speak() has been spoken or interrupted."""
+        return self.tts.wait_until_done(timeout)
+    
+    @property
+    def interruptions(self):
+        """Number of times speech has been interrupted; callers compare it to stop queuing a stale reply."""
+        return self.tts.stats['interrupted']
+    
+    def _on_speech_start(self):
+        """Called by the TTS worker when it starts speaking."""
+        # Don't transcribe our own voice: captured audio is skipped while speaking
+        if self.capture is not None:
+            self.capture.mute()
+        self._speaking.set()
+    
+    def _on_speech_idle(self):
+        """Called by the TTS worker once everything queued has been spoken (or interrupted)."""
+        self._speaking.clear()
+        if self.capture is not None:
+            self.capture.unmute()
+    
+    def _monitor_barge_in(self):
+        """
+        Barge-in thread: while Jarvis is speaking, run a strict VAD on the live microphone
+        audio (muted audio included). When the user starts talking, stop speaking and hand
+        the audio from just before they started back to the listener.
+        """
+        capture = self.capture
+        vad = VoiceActivityDetector(
+            capture.sample_rate,
+            frame_ms=RECOGNITION_SETTINGS['vad_frame_ms'],
+            margin_db=AUDIO_SETTINGS['barge_in_margin_db'],
+            min_band_ratio=RECOGNITION_SETTINGS['vad_min_band_ratio'],
+            onset_ms=AUDIO_SETTINGS['barge_in_onset_ms'],
+            hangover_ms=RECOGNITION_SETTINGS['vad_hangover_ms']
+        )
+        # Speech began this long before it was confirmed
+        lookback = int(capture.sample_rate * (AUDIO_SETTINGS['barge_in_onset_ms'] + RECOGNITION_SETTINGS['vad_preroll_ms']) / 1000)
+        
+        while self.capture is not None:
+            if not self._speaking.wait(timeout=0.5):
+                continue
+            
+            # Seed the noise floor from the moments before speech started
+            position = capture.position
+            noise, _ = capture.read(max(0, position - capture.chunk), min(position, capture.chunk), timeout=0, skip_muted=False)
+            vad.reset()
+            vad.calibrate(noise.tobytes())
+            
+            while self._speaking.is_set():
+                samples, position = capture.read(position, capture.chunk, timeout=0.2, skip_muted=False)
+                if not len(samples):
+                    continue
+                started, _ = vad.process(samples.tobytes())
+                if started:
+                    print("Barge-in detected, stopping speech.")
+                    capture.unmute(at=position - lookback)
+                    self.tts.interrupt()
+                    break
+    
+    def wait_until_tts_ready(self, timeout=None):
+        """Block until the TTS engine has been initialized (voice selected) in the background."""
+        return self.tts.wait_until_ready(timeout)
+    
+    def get_tts_stats(self):
+        """Get spoken and interrupted sentence counts and synthesis time."""
+        return self.tts.get_stats()
     
     def list_available_voices(self):
         """List all available TTS voices."""
         try:
-            voices = self.engine.getProperty('voices')
+            self.tts.wait_until_ready(timeout=10)
             voice_list = []
-            for i, voice in enumerate(voices):
-                voice_list.append({
-                    'index': i,
-                    'id': voice.id,
-                    'name': voice.name,
-                    'languages': getattr(voice, 'languages', [])
-                })
+            for i, voice in enumerate(self.tts.voices):
+                voice_list.append(dict(voice, index=i))
             return voice_list
         except Exception as e:
             print(f"Error listing voices: {e}")
@@ -243,24 +544,25 @@ class SpeechHandler:
             voice_id: ID of the voice to use
         """
         try:
-            voices = self.engine.getProperty('voices')
+            self.tts.wait_until_ready(timeout=10)
+            voices = self.tts.voices
             if not voices:
                 return False, "No voices available"
             
             if voice_id:
                 # Find voice by ID
                 for voice in voices:
-                    if voice.id == voice_id:
-                        self.engine.setProperty('voice', voice.id)
-                        return True, f"Changed voice to {voice.name}"
+                    if voice['id'] == voice_id:
+                        self._change_voice(voice['id'])
+                        return True, f"Changed voice to {voice['name']}"
                 return False, f"Voice ID not found: {voice_id}"
             
             elif voice_index is not None:
                 # Use voice by index
                 if 0 <= voice_index < len(voices):
                     voice = voices[voice_index]
-                    self.engine.setProperty('voice', voice.id)
-                    return True, f"Changed voice to {voice.name}"
+                    self._change_voice(voice['id'])
+                    return True, f"Changed voice to {voice['name']}"
                 else:
                     return False, f"Invalid voice index. Available: 0-{len(voices)-1}"
             
@@ -268,6 +570,32 @@ class SpeechHandler:
         except Exception as e:
             return False, f"Error changing voice: {str(e)}"
     
+    def _change_voice(self, voice_id):
+        """Switch the TTS voice (on the synthesis thread) and re-render the fixed phrases with it."""
+        if voice_id == self.tts.voice:
+            return
+        self.tts.set_voice(voice_id)
+        if self.phrase_cache is not None:
+            self.tts.prerender(PHRASE_CACHE_SETTINGS['prerender'])
+    
     def stop_speaking(self):
-        """Stop current speech output."""
-        self.engine.stop() 
\ No newline at end of file
+        """Stop current speech output and drop anything still queued."""
+        self.tts.interrupt()
+    
+    def get_device_stats(self):
+        """Get device enumeration counters and microphone failovers."""
+        return dict(
+            self.device_manager.get_stats(),
+            microphone=self.mic_device_name or 'default',
+            failed_over=self._failed_over,
+            capture_failovers=self.capture.failovers if self.capture is not None else 0
+        )
+    
+    def close(self):
+        """Stop the TTS worker, device monitor and background audio capture."""
+        self.device_manager.stop_monitor()
+        self.tts.close()
+        if self.capture is not None:
+            capture = self.capture
+            self.capture = None
+            capture.stop()
\ No newline at end of file
@@ -0,0 +1,126 @@
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+class _ImportTimer:
+    """
+    sys.meta_path hook that times how long each module takes to execute.
+
+    Specs are found by the finders after it; their loaders get a timed exec_module.
+    Time spent importing submodules is subtracted to get each module's own time.
+    """
+
+    def __init__(self, profiler):
+        self.profiler = profiler
+        self._local = threading.local()
+
+    def find_spec(self, fullname, path, target=None):
+        for finder in sys.meta_path:
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        loader = spec.loader
+        # Loaders that are classes (built-in and frozen modules) are shared; leave them alone
+        if loader is not None and not isinstance(loader, type) and hasattr(loader, "exec_module"):
+            loader.exec_module = self._timed(fullname, loader.exec_module)
+        return spec
+
+    def _timed(self, name, exec_module):
+        """Wrap exec_module to record own and cumulative time for module name."""
+        def run(module):
+            stack = self._local.__dict__.setdefault("stack", [])
+            stack.append(0.0)
+            start = time.perf_counter()
+            try:
+                exec_module(module)
+            finally:
+                total = time.perf_counter() - start
+                children = stack.pop()
+                if stack:
+                    stack[-1] += total
+                self.profiler.imports.append((name, total - children, total, len(stack)))
+        return run
+
+class StartupProfiler:
+    """
+    Per-module import time and per-phase init time for --startup-profile.
+
+    Phases are marked with phase(name) around startup steps; they cost nothing when
+    profiling is off. Imports are timed once enable() has installed the import hook,
+    so enable() must run before the modules of interest are imported.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.started_at = None
+        self.phases = []  # (name, seconds, nesting depth)
+        self.imports = []  # (module, own seconds, cumulative seconds, nesting depth)
+        self._depth = 0
+        self._timer = None
+
+    def enable(self):
+        """Start profiling: install the import hook and start the clock."""
+        if self.enabled:
+            return
+        self.enabled = True
+        self.started_at = time.perf_counter()
+        self._timer = _ImportTimer(self)
+        sys.meta_path.insert(0, self._timer)
+
+    def disable(self):
+        """Stop timing imports."""
+        if self._timer in sys.meta_path:
+            sys.meta_path.remove(self._timer)
+        self.enabled = False
+
+    @contextmanager
+    def phase(self, name):
+        """Time a startup phase (no-op unless profiling is enabled)."""
+        if not self.enabled:
+            yield
+            return
+        index = len(self.phases)
+        self.phases.append((name, 0.0, self._depth))
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth -= 1
+            self.phases[index] = (name, time.perf_counter() - start, self._depth)
+
+    def report(self, top=15):
+        """Print phase timings and the slowest imports."""
+        if not self.enabled:
+            return
+        total = time.perf_counter() - self.started_at
+
+        print("\n" + "="*60)
+        print(f"STARTUP PROFILE ({total * 1000:.0f} ms since launch)")
+        print("="*60)
+        print("Phases:")
+        for name, seconds, depth in self.phases:
+            print(f"  {'  ' * depth}{name:<{40 - 2 * depth}} {seconds * 1000:8.1f} ms")
+
+        print(f"\nSlowest imports (own time, cumulative; {len(self.imports)} modules):")
+        for name, own, cumulative, _ in sorted(self.imports, key=lambda i: i[1], reverse=True)[:top]:
+            print(f"  {name:<40} {own * 1000:8.1f} ms {cumulative * 1000:8.1f} ms")
+
+        top_level = [i for i in self.imports if i[3] == 0]
+        print("\nTop-level imports (cumulative):")
+        for name, _, cumulative, _ in sorted(top_level, key=lambda i: i[2], reverse=True)[:top]:
+            print(f"  {name:<40} {cumulative * 1000:8.1f} ms")
+        print("="*60 + "\n")
+
+# Shared by main.py and the modules that mark startup phases
+PROFILER = StartupProfiler()
+
+def phase(name):
+    """Time a startup phase with the shared profiler."""
+    return PROFILER.phase(name)
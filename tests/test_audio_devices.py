@@ -0,0 +1,88 @@
+import pytest
+
+pytest.importorskip("pyaudio")
+pytest.importorskip("dotenv")
+
+import audio_devices
+from audio_devices import AudioDeviceManager
+
+HEADSET = {'index': 0, 'name': "USB Headset", 'input_channels': 1, 'output_channels': 2, 'sample_rate': 48000}
+BUILT_IN = {'index': 1, 'name': "Built-in Microphone", 'input_channels': 1, 'output_channels': 0, 'sample_rate': 48000}
+
+class FakeHardware:
+    """What /proc/asound/cards and PortAudio report, set by each test."""
+
+    def __init__(self, signature, devices):
+        self.signature = signature
+        self.devices = devices
+        self.scans = 0
+
+    def scan(self, manager):
+        self.scans += 1
+        manager.devices = [dict(d) for d in self.devices]
+        return manager.devices
+
+@pytest.fixture
+def hardware(monkeypatch):
+    hardware = FakeHardware("0 USB Headset\n1 HDA Intel\n", [HEADSET, BUILT_IN])
+    monkeypatch.setattr(AudioDeviceManager, "_read_signature", staticmethod(lambda: hardware.signature))
+    monkeypatch.setattr(AudioDeviceManager, "_scan", lambda self: hardware.scan(self))
+    return hardware
+
+@pytest.fixture
+def manager(hardware):
+    manager = AudioDeviceManager(rescan_interval=5.0)
+    manager.get_devices()
+    manager._signature = hardware.signature
+    return manager
+
+def test_unchanged_hardware_is_not_rescanned(hardware, manager):
+    assert not manager.check_for_changes()
+    assert hardware.scans == 1
+
+def test_stale_rescan_is_retried_until_the_change_shows(hardware, manager):
+    notified, released = [], []
+    manager.add_listener(notified.append)
+    manager.add_release_callback(lambda: released.append(True))
+
+    # Headset unplugged, but an open PyAudio instance still serves the old list
+    hardware.signature = "1 HDA Intel\n"
+    assert not manager.check_for_changes()
+    assert notified == []
+    assert released == [True]
+    assert manager.stats['stale_rescans'] == 1
+
+    # Once the instance has been reopened the rescan sees the change
+    hardware.devices = [dict(BUILT_IN, index=0)]
+    assert manager.check_for_changes()
+    assert [d['name'] for d in notified[0]] == ["Built-in Microphone"]
+    assert manager.find_input_device("USB Headset") is None
+
+    assert not manager.check_for_changes()
+    assert hardware.scans == 3
+
+def test_change_reverted_before_it_showed_is_dropped(hardware, manager):
+    original = hardware.signature
+    hardware.signature = "1 HDA Intel\n"
+    assert not manager.check_for_changes()
+    hardware.signature = original
+    assert not manager.check_for_changes()
+    assert hardware.scans == 2
+
+def test_hardware_change_invisible_to_portaudio_is_given_up_on(hardware, manager):
+    hardware.signature = "0 USB Headset\n1 HDA Intel\n2 HDMI\n"
+    for _ in range(audio_devices.MAX_STALE_RESCANS):
+        assert not manager.check_for_changes()
+    scans = hardware.scans
+    assert not manager.check_for_changes()
+    assert hardware.scans == scans
+
+def test_without_fingerprint_devices_are_only_released_now_and_then(hardware, manager):
+    released = []
+    manager.add_release_callback(lambda: released.append(True))
+    hardware.signature = None
+    for _ in range(audio_devices.BLIND_RELEASE_EVERY - 1):
+        assert not manager.check_for_changes()
+    assert released == []
+    assert not manager.check_for_changes()
+    assert released == [True]
@@ -0,0 +1,52 @@
+import pytest
+
+from intent_router import IntentRouter
+
+# ADVANCED_AI_SETTINGS['local_router_min_confidence']: below it, queries go to the model
+MIN_CONFIDENCE = 0.85
+
+def dispatched_locally(match):
+    return match is not None and match.confidence >= MIN_CONFIDENCE
+
+@pytest.fixture
+def router():
+    return IntentRouter()
+
+@pytest.mark.parametrize("text, name, arguments", [
+    ("What time is it?", "get_current_time", {}),
+    ("what is 15 plus 27", "simple_calculator", {"expression": "15 + 27"}),
+    ("calculate 6 times 7 divided by 3", "simple_calculator", {"expression": "6 * 7 / 3"}),
+    ("what is 2 to the power of 10", "simple_calculator", {"expression": "2 ** 10"}),
+    ("scroll down by 5", "scroll", {"direction": "down", "amount": 5}),
+    ("scroll up", "scroll", {"direction": "up"}),
+    ("please open chrome", "open_application", {"app_name": "chrome"}),
+    ("go to github.com", "open_any_url", {"url": "https://github.com"}),
+    ("press the enter key", "press_key", {"key": "enter"}),
+    ("take a screenshot", "take_screenshot", {}),
+])
+def test_slots(router, text, name, arguments):
+    match = router.route(text)
+    assert match is not None
+    assert (match.name, match.arguments) == (name, arguments)
+    assert dispatched_locally(match)
+
+@pytest.mark.parametrize("text", [
+    "what is the weather",
+    "open chrome and search for python tutorials",
+    "what is 10 to the power of 10 to the power of 10",
+    "what is 10 to the power of 1000",
+    "",
+])
+def test_falls_through(router, text):
+    assert not dispatched_locally(router.route(text))
+
+def test_unknown_app_is_left_to_the_model(router):
+    match = router.route("open the door")
+    assert match.name == "open_application"
+    assert match.confidence == 0.6
+    assert not dispatched_locally(match)
+
+def test_rules_for_unavailable_tools_are_dropped():
+    router = IntentRouter(tool_names={"get_current_time"})
+    assert router.route("scroll down") is None
+    assert router.route("what time is it").name == "get_current_time"
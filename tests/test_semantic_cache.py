@@ -0,0 +1,27 @@
+from semantic_cache import SemanticCache
+
+RULES = [
+    (['score', 'stock', 'price', 'live', 'breaking', 'traffic'], 300),
+    (['weather', 'forecast', 'temperature', 'news', 'latest', 'tonight', 'tomorrow'], 1800)
+]
+
+def make_cache():
+    return SemanticCache(max_entries=10, threshold=0.6, default_ttl=6 * 3600, freshness_rules=RULES)
+
+def test_new_is_not_news():
+    cache = make_cache()
+    assert cache.ttl_for("population of new york") == 6 * 3600
+    assert cache.ttl_for("when does the new iPhone come out") == 6 * 3600
+    assert cache.ttl_for("population of nyc") == 6 * 3600
+
+def test_freshness_keywords_still_match():
+    cache = make_cache()
+    assert cache.ttl_for("latest news about the election") == 1800
+    assert cache.ttl_for("what are the stock prices for apple") == 300
+    assert cache.ttl_for("weather in new york") == 1800
+
+def test_tense_changes_the_question():
+    cache = make_cache()
+    cache.set('answer', "who is the president of france", "Emmanuel Macron")
+    assert cache.get('answer', "who is the president of france?") == (True, "Emmanuel Macron")
+    assert cache.get('answer', "who was the president of france") == (False, None)
@@ -0,0 +1,7 @@
+import re
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+def normalize_text(text: str) -> str:
+    """Lowercase and drop punctuation so "Open Chrome." and "open chrome" compare equal."""
+    return " ".join(WORD_PATTERN.findall(text.lower()))
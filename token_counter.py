@@ -0,0 +1,75 @@
+import threading
+from typing import Dict, List
+from config import OPENAI_SETTINGS
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+# Chat formatting overhead per message and for priming the reply (OpenAI chat format)
+TOKENS_PER_MESSAGE = 3
+TOKENS_PER_REPLY = 3
+
+# Fallback when tiktoken (or its BPE file, downloaded on first use) isn't available:
+# OpenAI's rule of thumb of about 4 characters per token, for prose and JSON alike
+CHARS_PER_TOKEN = 4
+
+_encoding = None
+_encoding_loaded = False
+_encoding_lock = threading.Lock()
+
+def _get_encoding():
+    """Get (and cache) the tokenizer for the configured model, or None if it can't be loaded."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                _encoding = _load_encoding()
+                _encoding_loaded = True
+    return _encoding
+
+def _load_encoding():
+    """Load the tiktoken encoding once; on any failure warn and fall back to estimates."""
+    if tiktoken is None:
+        print("tiktoken is not installed; estimating token counts from text length.")
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(OPENAI_SETTINGS['model'])
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # e.g. offline: the BPE file is downloaded on first use
+        print(f"Could not load the tiktoken encoding ({e}); estimating token counts from text length.")
+        return None
+
+def count_tokens(text: str) -> int:
+    """Count the tokens in a piece of text."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text))
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Truncate text to at most max_tokens tokens, marking the cut with an ellipsis."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    encoding = _get_encoding()
+    if encoding is not None:
+        return encoding.decode(encoding.encode(text)[:max_tokens]) + "..."
+
+    # Fallback: cut at the character estimate, back to the last whole word if there is one
+    cut = text[:max_tokens * CHARS_PER_TOKEN]
+    if " " in cut:
+        cut = cut[:cut.rindex(" ")]
+    return cut.rstrip() + "..."
+
+def count_message_tokens(messages: List[Dict]) -> int:
+    """Count the prompt tokens of a list of chat messages (content plus formatting overhead)."""
+    total = TOKENS_PER_REPLY
+    for message in messages:
+        total += TOKENS_PER_MESSAGE + count_tokens(message.get("content") or "")
+    return total
@@ -0,0 +1,182 @@
+import inspect
+import json
+
+class ToolArgumentError(ValueError):
+    """Raised when tool call arguments do not match the tool's JSON schema."""
+
+class UnknownToolError(KeyError):
+    """Raised when a tool name has no registered implementation."""
+
+def _check_string(name, value):
+    if not isinstance(value, str):
+        raise ToolArgumentError(f"'{name}' must be a string")
+    return value
+
+def _check_integer(name, value):
+    # Models occasionally send integers as "3" or 3.0; accept those losslessly
+    if isinstance(value, bool):
+        raise ToolArgumentError(f"'{name}' must be an integer")
+    if isinstance(value, int):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, str):
+        try:
+            return int(value.strip())
+        except ValueError:
+            pass
+    raise ToolArgumentError(f"'{name}' must be an integer")
+
+def _check_number(name, value):
+    if isinstance(value, bool):
+        raise ToolArgumentError(f"'{name}' must be a number")
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value.strip().rstrip('%'))
+        except ValueError:
+            pass
+    raise ToolArgumentError(f"'{name}' must be a number")
+
+def _check_boolean(name, value):
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    raise ToolArgumentError(f"'{name}' must be a boolean")
+
+def _check_array(name, value):
+    if not isinstance(value, list):
+        raise ToolArgumentError(f"'{name}' must be an array")
+    return value
+
+def _check_object(name, value):
+    if not isinstance(value, dict):
+        raise ToolArgumentError(f"'{name}' must be an object")
+    return value
+
+TYPE_CHECKERS = {
+    "string": _check_string,
+    "integer": _check_integer,
+    "number": _check_number,
+    "boolean": _check_boolean,
+    "array": _check_array,
+    "object": _check_object
+}
+
+class ToolSpec:
+    """A tool implementation bound to its precompiled argument schema."""
+
+    def __init__(self, schema, func):
+        self.name = schema["name"]
+        self.func = func
+
+        parameters = schema.get("parameters", {})
+        properties = parameters.get("properties", {})
+        self.required = tuple(parameters.get("required", []))
+
+        signature = inspect.signature(func)
+        accepts_kwargs = any(p.kind == inspect.Parameter.VAR_KEYWORD for p in signature.parameters.values())
+
+        # Per-property validator: (checker, enum values or None)
+        self.validators = {}
+        for prop_name, prop_schema in properties.items():
+            if prop_name not in signature.parameters and not accepts_kwargs:
+                raise ValueError(f"Tool '{self.name}' declares parameter '{prop_name}' that {func.__name__}() does not accept")
+            checker = TYPE_CHECKERS.get(prop_schema.get("type"))
+            enum = frozenset(prop_schema["enum"]) if "enum" in prop_schema else None
+            self.validators[prop_name] = (checker, enum)
+
+        # Defaults come from the schema first, then from the Python signature
+        self.defaults = {}
+        for prop_name, prop_schema in properties.items():
+            if "default" in prop_schema:
+                self.defaults[prop_name] = prop_schema["default"]
+            elif prop_name in signature.parameters and signature.parameters[prop_name].default is not inspect.Parameter.empty:
+                self.defaults[prop_name] = signature.parameters[prop_name].default
+
+        missing = [name for name in self.required if name not in properties]
+        if missing:
+            raise ValueError(f"Tool '{self.name}' requires undeclared parameters: {', '.join(missing)}")
+
+    def bind(self, arguments):
+        """Validate arguments against the schema and return the keyword arguments to call with."""
+        missing = [name for name in self.required if arguments.get(name) is None]
+        if missing:
+            raise ToolArgumentError(f"Missing required argument(s) for {self.name}: {', '.join(missing)}")
+
+        kwargs = dict(self.defaults)
+        for name, value in arguments.items():
+            validator = self.validators.get(name)
+            if validator is None:
+                # Ignore arguments the tool does not declare instead of failing the call
+                continue
+            if value is None:
+                # Treat explicit nulls as "not provided" so defaults still apply
+                continue
+            checker, enum = validator
+            if checker is not None:
+                value = checker(name, value)
+            if enum is not None and value not in enum:
+                raise ToolArgumentError(f"'{name}' must be one of: {', '.join(map(str, sorted(enum)))}")
+            kwargs[name] = value
+        return kwargs
+
+class ToolDispatcher:
+    """Dispatch tool calls by name with schema validation, defaults and keyword binding."""
+
+    def __init__(self, functions, function_map):
+        schema_names = {schema["name"] for schema in functions}
+        unmapped = schema_names - function_map.keys()
+        undeclared = function_map.keys() - schema_names
+        if unmapped or undeclared:
+            raise ValueError(
+                f"FUNCTIONS and FUNCTION_MAP are out of sync "
+                f"(no implementation: {sorted(unmapped)}, no schema: {sorted(undeclared)})"
+            )
+
+        self.specs = {schema["name"]: ToolSpec(schema, function_map[schema["name"]]) for schema in functions}
+
+    def __contains__(self, name):
+        return name in self.specs
+
+    @staticmethod
+    def parse_arguments(arguments):
+        """Parse tool call arguments given as a JSON string (or an already-parsed dict)."""
+        if isinstance(arguments, dict):
+            return arguments
+        if not arguments or not arguments.strip():
+            return {}
+        try:
+            parsed = json.loads(arguments)
+        except json.JSONDecodeError as e:
+            raise ToolArgumentError(f"Arguments are not valid JSON: {e}")
+        if not isinstance(parsed, dict):
+            raise ToolArgumentError("Arguments must be a JSON object")
+        return parsed
+
+    def bind(self, name, arguments):
+        """
+        Validate arguments for a tool and return the keyword arguments to call it with.
+
+        Args:
+            name: Tool name as declared in FUNCTIONS
+            arguments: JSON string or dict of arguments
+
+        Raises:
+            UnknownToolError: If the tool is not registered
+            ToolArgumentError: If the arguments do not match the tool's schema
+        """
+        spec = self.specs.get(name)
+        if spec is None:
+            raise UnknownToolError(name)
+        return spec.bind(self.parse_arguments(arguments))
+
+    def call(self, name, kwargs):
+        """Execute a tool with keyword arguments previously returned by bind()."""
+        return self.specs[name].func(**kwargs)
+
+    def dispatch(self, name, arguments):
+        """Validate and execute a tool call (see bind() for arguments and errors)."""
+        return self.call(name, self.bind(name, arguments))
@@ -0,0 +1,87 @@
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = {
+    "a", "an", "the", "and", "or", "of", "to", "in", "on", "for", "with", "by", "at", "from",
+    "is", "are", "be", "it", "its", "this", "that", "me", "my", "you", "your", "i", "please",
+    "can", "could", "would", "will", "what", "whats", "how", "use", "when", "user", "asks",
+    "jarvis", "e", "g", "eg"
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+def _stem(word: str) -> str:
+    """Very light suffix stripping so "opening"/"opens"/"opened" match "open"."""
+    for suffix in ("ing", "ed", "es", "s"):
+        if len(word) > len(suffix) + 2 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    return word
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase, split into words, drop stopwords and stem."""
+    return [_stem(word) for word in TOKEN_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+
+class ToolIndex:
+    """
+    BM25 index over tool names, descriptions, parameter descriptions and example phrasings.
+
+    Used to send the model only the tools relevant to a query (plus a small core set)
+    instead of every schema on every call.
+    """
+
+    def __init__(self, functions: List[Dict], examples: Dict[str, List[str]], core_tools: Iterable[str]):
+        self.tool_order = [function["name"] for function in functions]
+        self.core_tools = set(core_tools) & set(self.tool_order)
+
+        self.postings = defaultdict(dict)  # term -> {tool name: term frequency}
+        self.doc_lengths = {}
+        for function in functions:
+            name = function["name"]
+            parts = [name.replace("_", " "), function.get("description", "")]
+            for prop in function.get("parameters", {}).get("properties", {}).values():
+                parts.append(prop.get("description", ""))
+            parts.extend(examples.get(name, []))
+
+            terms = Counter(tokenize(" ".join(parts)))
+            self.doc_lengths[name] = sum(terms.values())
+            for term, frequency in terms.items():
+                self.postings[term][name] = frequency
+
+        tool_count = len(self.tool_order)
+        self.average_length = sum(self.doc_lengths.values()) / max(tool_count, 1)
+        self.idf = {
+            term: math.log(1 + (tool_count - len(docs) + 0.5) / (len(docs) + 0.5))
+            for term, docs in self.postings.items()
+        }
+
+    def score(self, query: str) -> Dict[str, float]:
+        """BM25 score of every tool that shares at least one term with the query."""
+        scores = defaultdict(float)
+        for term in set(tokenize(query)):
+            for name, frequency in self.postings.get(term, {}).items():
+                length_norm = 1 - B + B * self.doc_lengths[name] / self.average_length
+                scores[name] += self.idf[term] * frequency * (K1 + 1) / (frequency + K1 * length_norm)
+        return scores
+
+    def select(self, query: str, top_k: int, recent_tools: Iterable[str] = ()) -> Tuple[str, ...]:
+        """
+        Pick the tools to offer the model for a query.
+
+        Args:
+            recent_tools: Tools used in the previous turns, kept for follow-ups such as
+                          "do that again" that name no tool themselves
+
+        Returns:
+            tuple: Core tools, recent tools and the top_k best-scoring tools, in FUNCTIONS
+                   order so the same selection always serializes identically
+        """
+        scores = self.score(query)
+        ranked = sorted(scores, key=scores.get, reverse=True)[:top_k]
+        selected = self.core_tools.union(ranked, recent_tools)
+        return tuple(name for name in self.tool_order if name in selected)
@@ -1,14 +1,31 @@
 import datetime
+import json
 import webbrowser
-import requests
 import platform
-import psutil
 import os
-from config import PERPLEXITY_API_KEY, PERPLEXITY_SETTINGS
-from desktop_agent import DesktopAgent
+import threading
+from config import PERPLEXITY_API_KEY, PERPLEXITY_SETTINGS, TOOL_SELECTION_SETTINGS, HTTP_SETTINGS
+from tool_dispatcher import ToolDispatcher
+from http_client import get_perplexity_session, get_perplexity_async_client, warm_up_perplexity
+from tool_index import ToolIndex
+from single_flight import SingleFlight
+from text_utils import normalize_text
 
-# Initialize desktop agent
-desktop_agent = DesktopAgent()
+# Desktop agent, created on first use: it pulls in pyautogui, PIL and psutil, which
+# are slow to import and not needed until a desktop tool runs
+_desktop_agent = None
+_desktop_agent_lock = threading.Lock()
+
+def get_desktop_agent():
+    """Get the shared DesktopAgent, importing and creating it on first use."""
+    global _desktop_agent
+    if _desktop_agent is None:
+        # Warm-up and an early tool call may both get here first
+        with _desktop_agent_lock:
+            if _desktop_agent is None:
+                from desktop_agent import DesktopAgent
+                _desktop_agent = DesktopAgent()
+    return _desktop_agent
 
 def get_current_time():
     """Get the current system time."""
@@ -35,6 +52,7 @@ def simple_calculator(expression):
 def get_system_stats():
     """Get comprehensive system specifications and statistics."""
     try:
+        import psutil
         stats = []
         
         # OS Information
@@ -86,60 +104,60 @@ def open_application(app_name, profile_name=None):
     """Open an application by name. For Chrome, optionally specify a profile name."""
     # If it's Chrome and a profile is specified, use the Chrome-specific function
     if "chrome" in app_name.lower() and profile_name:
-        return desktop_agent.open_chrome_with_profile(profile_name=profile_name)
-    return desktop_agent.open_application(app_name)
+        return get_desktop_agent().open_chrome_with_profile(profile_name=profile_name)
+    return get_desktop_agent().open_application(app_name)
 
 def list_chrome_profiles():
     """List all available Chrome profiles."""
-    return desktop_agent.list_chrome_profiles()
+    return get_desktop_agent().list_chrome_profiles()
 
 def open_chrome_with_profile(profile_name=None, profile_id=None):
     """Open Chrome with a specific profile."""
-    return desktop_agent.open_chrome_with_profile(profile_name=profile_name, profile_id=profile_id)
+    return get_desktop_agent().open_chrome_with_profile(profile_name=profile_name, profile_id=profile_id)
 
 def take_screenshot(filename=None):
     """Take a screenshot of the entire screen."""
-    return desktop_agent.take_screenshot(filename)
+    return get_desktop_agent().take_screenshot(filename)
 
 def click_position(x, y):
     """Click at specific coordinates."""
-    return desktop_agent.click_position(x, y)
+    return get_desktop_agent().click_position(x, y)
 
 def type_text(text):
     """Type text at current cursor position."""
-    return desktop_agent.type_text(text)
+    return get_desktop_agent().type_text(text)
 
 def press_key(key):
     """Press a specific key."""
-    return desktop_agent.press_key(key)
+    return get_desktop_agent().press_key(key)
 
 def get_screen_size():
     """Get screen dimensions."""
-    return desktop_agent.get_screen_size()
+    return get_desktop_agent().get_screen_size()
 
 def get_mouse_position():
     """Get current mouse position."""
-    return desktop_agent.get_mouse_position()
+    return get_desktop_agent().get_mouse_position()
 
 def scroll(direction, amount=3):
     """Scroll up or down."""
-    return desktop_agent.scroll(direction, amount)
+    return get_desktop_agent().scroll(direction, amount)
 
 def close_active_window():
     """Close the currently active window."""
-    return desktop_agent.close_active_window()
+    return get_desktop_agent().close_active_window()
 
 def minimize_window():
     """Minimize the currently active window."""
-    return desktop_agent.minimize_window()
+    return get_desktop_agent().minimize_window()
 
 def get_running_apps():
     """Get list of currently running applications."""
-    return desktop_agent.get_running_apps()
+    return get_desktop_agent().get_running_apps()
 
 def copy_to_clipboard(text):
     """Copy text to clipboard."""
-    return desktop_agent.copy_to_clipboard(text)
+    return get_desktop_agent().copy_to_clipboard(text)
 
 def open_system_settings(setting_type="general"):
     """
@@ -148,7 +166,7 @@ def open_system_settings(setting_type="general"):
     Args:
         setting_type: Type of settings (e.g., "display", "text size", "font size", "accessibility", "sound", "network", "privacy", "updates")
     """
-    return desktop_agent.open_system_settings(setting_type)
+    return get_desktop_agent().open_system_settings(setting_type)
 
 def change_font_size(action="increase", target_percentage=None):
     """
@@ -159,7 +177,7 @@ def change_font_size(action="increase", target_percentage=None):
         action: "increase" to make text larger, "decrease" to make it smaller, "set" to set specific percentage, or "open" to just open the settings page
         target_percentage: Target percentage (100-225). Use with action="set" or when user specifies a percentage like "200%"
     """
-    return desktop_agent.change_font_size(action, target_percentage)
+    return get_desktop_agent().change_font_size(action, target_percentage)
 
 # Global reference to the current speech handler (set by Jarvis)
 _current_speech_handler = None
@@ -208,38 +226,52 @@ def set_voice(voice_index=None, voice_name=None):
     else:
         return "Please provide either voice_index or voice_name. Use list_voices to see available voices."
 
+PERPLEXITY_URL = "https://api.perplexity.ai/chat/completions"
+
+def _perplexity_request(query):
+    """Build the headers and JSON body of a Perplexity web query."""
+    headers = {
+        "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
+        "Content-Type": "application/json"
+    }
+    
+    data = {
+        "model": PERPLEXITY_SETTINGS['model'],
+        "messages": [
+            {
+                "role": "system",
+                "content": "You are a helpful AI assistant. Provide only the final answer. Do not include explanations. Provide a list if needed with a short intro."
+            },
+            {
+                "role": "user", 
+                "content": query
+            }
+        ],
+        "max_tokens": PERPLEXITY_SETTINGS['max_tokens'],
+        "temperature": PERPLEXITY_SETTINGS['temperature']
+    }
+    return headers, data
+
+# Identical web queries in flight at the same time share one Perplexity request
+WEB_QUERIES = SingleFlight()
+
 def get_web_data(query):
     """Fetch real-time web data about a topic or question using Perplexity API."""
     if not PERPLEXITY_API_KEY:
         return "Sorry, I don't have access to web search at the moment."
-    
+    return WEB_QUERIES.do(normalize_text(query), lambda: _fetch_web_data(query))
+
+def _fetch_web_data(query):
+    """Send one query to the Perplexity API."""
     try:
-        headers = {
-            "Authorization": f"Bearer {PERPLEXITY_API_KEY}",
-            "Content-Type": "application/json"
-        }
-        
-        data = {
-            "model": PERPLEXITY_SETTINGS['model'],
-            "messages": [
-                {
-                    "role": "system",
-                    "content": "You are a helpful AI assistant. Provide only the final answer. Do not include explanations. Provide a list if needed with a short intro."
-                },
-                {
-                    "role": "user", 
-                    "content": query
-                }
-            ],
-            "max_tokens": PERPLEXITY_SETTINGS['max_tokens'],
-            "temperature": PERPLEXITY_SETTINGS['temperature']
-        }
+        headers, data = _perplexity_request(query)
         
-        response = requests.post(
-            "https://api.perplexity.ai/chat/completions",
+        # Pooled keep-alive session: DNS, TCP and TLS setup are paid once, not per query
+        response = get_perplexity_session().post(
+            PERPLEXITY_URL,
             headers=headers,
             json=data,
-            timeout=PERPLEXITY_SETTINGS['timeout']
+            timeout=(HTTP_SETTINGS['connect_timeout'], PERPLEXITY_SETTINGS['timeout'])
         )
         
         if response.status_code == 200:
@@ -251,6 +283,32 @@ def get_web_data(query):
     except Exception as e:
         return f"Sorry, I encountered an error while searching the web: {str(e)}"
 
+def warm_up_web_data():
+    """Open the Perplexity connection ahead of the first web query."""
+    if PERPLEXITY_API_KEY:
+        warm_up_perplexity(PERPLEXITY_URL)
+
+async def aget_web_data(query):
+    """Async variant of get_web_data; awaits the Perplexity request instead of blocking a thread."""
+    if not PERPLEXITY_API_KEY:
+        return "Sorry, I don't have access to web search at the moment."
+    return await WEB_QUERIES.ado(normalize_text(query), lambda: _afetch_web_data(query))
+
+async def _afetch_web_data(query):
+    """Async variant of _fetch_web_data."""
+    try:
+        headers, data = _perplexity_request(query)
+        response = await get_perplexity_async_client().post(PERPLEXITY_URL, headers=headers, json=data)
+        
+        if response.status_code == 200:
+            result = response.json()
+            return result["choices"][0]["message"]["content"]
+        else:
+            return f"Sorry, I couldn't fetch web data for that query."
+            
+    except Exception as e:
+        return f"Sorry, I encountered an error while searching the web: {str(e)}"
+
 # Function definitions for OpenAI
 FUNCTIONS = [
     {
@@ -435,10 +493,9 @@ FUNCTIONS = [
         "parameters": {
             "type": "object",
             "properties": {
-                "action": {"type": "string", "description": "Action to perform: 'increase' to make text larger, 'decrease' to make it smaller, 'set' to set to a specific percentage, or 'open' to just open the settings page", "enum": ["increase", "decrease", "set", "open"]},
+                "action": {"type": "string", "description": "Action to perform: 'increase' to make text larger, 'decrease' to make it smaller, 'set' to set to a specific percentage, or 'open' to just open the settings page", "enum": ["increase", "decrease", "set", "open"], "default": "increase"},
                 "target_percentage": {"type": "number", "description": "Target percentage (100-225). Required when action is 'set' or when user specifies a percentage like '200%'"}
-            },
-            "required": ["action"]
+            }
         }
     },
     {
@@ -460,6 +517,98 @@ FUNCTIONS = [
     }
 ]
 
+# Tool definitions in the format expected by the Chat Completions tools API.
+# Serialized once in canonical form so every request sends byte-identical tool
+# schemas, which keeps them inside the provider's cached prompt prefix.
+TOOLS_JSON = json.dumps(
+    [{"type": "function", "function": function} for function in FUNCTIONS],
+    sort_keys=True,
+    separators=(",", ":")
+)
+TOOLS = json.loads(TOOLS_JSON)
+TOOLS_BY_NAME = {tool["function"]["name"]: tool for tool in TOOLS}
+
+# Example phrasings per tool, indexed together with the schemas so everyday
+# wording ("what's the weather", "make the text bigger") finds the right tool
+TOOL_EXAMPLES = {
+    "get_web_data": ["search the web", "look up the latest news", "what's the weather today", "who won the game", "tell me about"],
+    "open_any_url": ["open youtube.com", "go to a website", "visit the link"],
+    "open_application": ["open an app", "launch spotify", "start the terminal", "run calculator"],
+    "list_chrome_profiles": ["which chrome profiles do I have", "show browser profiles"],
+    "open_chrome_with_profile": ["open chrome with my work profile", "switch chrome profile"],
+    "get_system_stats": ["how much memory is free", "cpu usage", "battery level", "disk space"],
+    "take_screenshot": ["take a screenshot", "capture the screen", "screen grab"],
+    "get_current_time": ["what time is it", "tell me the time", "today's date"],
+    "simple_calculator": ["calculate", "what is 15 times 4", "add numbers", "math sum multiply divide"],
+    "close_active_window": ["close this window", "close the tab", "quit the current window"],
+    "minimize_window": ["minimize this window", "hide the window"],
+    "get_running_apps": ["what apps are running", "list open programs", "running processes"],
+    "copy_to_clipboard": ["copy this text", "put it on the clipboard"],
+    "open_system_settings": ["open settings", "display settings", "sound settings", "network wifi settings"],
+    "change_font_size": ["make the text bigger", "increase font size", "smaller text", "zoom text"],
+    "list_voices": ["what voices are available", "list tts voices"],
+    "set_voice": ["change your voice", "use a different voice", "speak with a female voice"],
+    "click_position": ["click here", "click at coordinates", "mouse click"],
+    "type_text": ["type this", "write text", "enter text into the field"],
+    "press_key": ["press enter", "hit escape", "press tab key"],
+    "scroll": ["scroll down", "scroll up the page", "page down"],
+    "get_screen_size": ["what is my screen resolution", "screen size"],
+    "get_mouse_position": ["where is the mouse", "cursor position"]
+}
+
+# Retrieval index used to offer the model only the tools relevant to each query
+TOOL_INDEX = ToolIndex(FUNCTIONS, TOOL_EXAMPLES, TOOL_SELECTION_SETTINGS['core_tools'])
+
+# Tools without side effects that may run concurrently when the model requests several at once.
+# Everything else (clicks, typing, opening apps) runs sequentially in the requested order.
+PARALLEL_SAFE_TOOLS = {
+    "get_current_time",
+    "simple_calculator",
+    "get_system_stats",
+    "get_web_data",
+    "get_screen_size",
+    "get_mouse_position",
+    "get_running_apps",
+    "list_chrome_profiles",
+    "list_voices"
+}
+
+# Response policy per tool: how a tool result becomes the spoken reply.
+# "template" renders the result locally (no extra LLM call); "refine" sends it
+# back through the model. Tools not listed here default to "refine".
+TOOL_RESPONSE_POLICIES = {
+    "get_current_time": {"mode": "template", "template": "It's {result}."},
+    "simple_calculator": {"mode": "template", "template": "{result}"},
+    "get_screen_size": {"mode": "template", "template": "{result}."},
+    "get_mouse_position": {"mode": "template", "template": "{result}."},
+    "scroll": {"mode": "template", "template": "{result}."},
+    "close_active_window": {"mode": "template", "template": "{result}."},
+    "minimize_window": {"mode": "template", "template": "{result}."}
+}
+
+DEFAULT_RESPONSE_POLICY = {"mode": "refine"}
+
+def get_response_policy(function_name):
+    """Get the response policy for a tool."""
+    return TOOL_RESPONSE_POLICIES.get(function_name, DEFAULT_RESPONSE_POLICY)
+
+# Result caching per tool. Only tools listed here are cached; "ttl" is in seconds
+# (None = PERFORMANCE_SETTINGS['cache_ttl']). Tools with side effects (clicks,
+# typing, opening apps or windows) must never be listed.
+TOOL_CACHE_POLICIES = {
+    "get_web_data": {"ttl": None},
+    "simple_calculator": {"ttl": 3600},
+    "get_system_stats": {"ttl": 5},
+    "get_running_apps": {"ttl": 5},
+    "get_screen_size": {"ttl": 60},
+    "list_chrome_profiles": {"ttl": 60},
+    "list_voices": {"ttl": 60}
+}
+
+def get_cache_policy(function_name):
+    """Get the cache policy for a tool, or None if its results must not be cached."""
+    return TOOL_CACHE_POLICIES.get(function_name)
+
 # Function mapping for easy lookup
 FUNCTION_MAP = {
     "get_current_time": get_current_time,
@@ -485,4 +634,13 @@ FUNCTION_MAP = {
     "set_voice": set_voice,
     "list_chrome_profiles": list_chrome_profiles,
     "open_chrome_with_profile": open_chrome_with_profile
-} 
\ No newline at end of file
+}
+
+# Native coroutine implementations used by the async API; every other tool
+# is run on a worker thread so it never blocks the event loop
+ASYNC_FUNCTION_MAP = {
+    "get_web_data": aget_web_data
+}
+
+# Schema-driven dispatcher, built once at import (fails fast if FUNCTIONS and FUNCTION_MAP drift apart)
+TOOL_DISPATCHER = ToolDispatcher(FUNCTIONS, FUNCTION_MAP)
@@ -0,0 +1,397 @@
+import os
+import queue
+import tempfile
+import threading
+import time
+import wave
+import pyaudio
+
+class AudioClip:
+    """Synthesized speech as raw PCM."""
+
+    def __init__(self, pcm: bytes, sample_rate: int, sample_width: int, channels: int):
+        self.pcm = pcm
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.channels = channels
+
+    @property
+    def format_key(self):
+        """Sample rate, width and channels; clips with the same key share an output stream."""
+        return (self.sample_rate, self.sample_width, self.channels)
+
+class _SetVoice:
+    """Queued voice change, applied by the synthesis thread between sentences."""
+
+    def __init__(self, voice_id):
+        self.voice_id = voice_id
+
+class SpeechWorker:
+    """
+    Speak queued sentences in the background.
+
+    A synthesis thread renders each sentence to PCM with pyttsx3 while a playback
+    thread plays the previous one, so there is no gap between sentences and callers
+    never block on TTS. Playback is written in short chunks, so interrupt() silences
+    it immediately and drops everything still queued.
+
+    With a PhraseCache, frequently spoken phrases are played from memory instead of
+    being synthesized again.
+
+    If the TTS driver can't render to a WAV file, sentences are spoken directly
+    through the engine instead (no overlap or caching; interrupt() stops the engine).
+
+    pyttsx3 drivers aren't thread-safe, so the engine is only used on the synthesis
+    thread: voice changes are queued to it like sentences, and the voice list and
+    current voice, rate and volume are kept in plain attributes for other threads.
+    """
+
+    def __init__(self, engine_factory, output_device_index=None, tail_seconds=0.3, chunk_ms=40,
+                 on_start=None, on_idle=None, phrase_cache=None):
+        """
+        Args:
+            engine_factory: Creates the configured pyttsx3 engine. Called as soon as the
+                            synthesis thread starts, so pyttsx3 startup doesn't block the caller
+            output_device_index: PyAudio output device, or None for the default
+            tail_seconds: Pause after the last sentence before reporting idle (lets echo die down)
+            chunk_ms: Playback chunk length; bounds how long an interrupt takes to be heard
+            on_start: Called when speech starts after being idle
+            on_idle: Called when the queue has been spoken (or interrupted)
+            phrase_cache: Optional PhraseCache of rendered phrases
+        """
+        self._engine_factory = engine_factory
+        self._engine = None
+        self._engine_lock = threading.Lock()
+        self._engine_ready = threading.Event()
+        self.output_device_index = output_device_index
+        self.tail_seconds = tail_seconds
+        self.chunk_ms = chunk_ms
+        self.on_start = on_start
+        self.on_idle = on_idle
+        self.phrase_cache = phrase_cache
+        self.direct_mode = False
+        self.voices = []  # [{'id', 'name', 'languages'}], read from the engine once it is created
+        self.voice = self.rate = self.volume = None
+
+        self._texts = queue.Queue()
+        self._clips = queue.Queue(maxsize=1)  # Synthesis runs at most one sentence ahead of playback
+        self._generation = 0  # Bumped by interrupt(); queued items from older generations are dropped
+        self._pending = 0
+        self._active = False  # Between on_start and on_idle
+        self._idle = threading.Condition()
+        self._running = True
+
+        self._audio = None
+        self._stream = None
+        self._stream_format = None
+        self._audio_lock = threading.Lock()  # Held by the playback thread while it plays a clip
+
+        self.stats = {'sentences': 0, 'synthesized': 0, 'interrupted': 0, 'total_synthesis_ms': 0.0,
+                      'cached_starts': 0, 'total_cached_start_ms': 0.0}
+
+        self._synth_thread = threading.Thread(target=self._synthesis_loop, name="jarvis-tts-synth", daemon=True)
+        self._play_thread = threading.Thread(target=self._playback_loop, name="jarvis-tts-play", daemon=True)
+        self._synth_thread.start()
+        self._play_thread.start()
+
+    @property
+    def engine(self):
+        """The pyttsx3 engine, created on first use (synthesis thread only once it is running)."""
+        if self._engine is None:
+            with self._engine_lock:
+                if self._engine is None:
+                    self._engine = self._engine_factory()
+        return self._engine
+
+    def wait_until_ready(self, timeout=None):
+        """Block until the synthesis thread has initialized the TTS engine."""
+        return self._engine_ready.wait(timeout)
+
+    @property
+    def is_speaking(self):
+        """True while sentences are queued, being synthesized or playing."""
+        return self._pending > 0
+
+    def speak(self, text):
+        """Queue a sentence to be spoken and return immediately."""
+        with self._idle:
+            self._pending += 1
+            generation = self._generation
+            # Under the same lock as on_idle, so a stale idle report can't undo this start
+            if not self._active:
+                self._active = True
+                if self.on_start:
+                    self.on_start()
+        self._texts.put((generation, text, True, time.perf_counter()))
+
+    def set_voice(self, voice_id):
+        """
+        Switch to another voice from the next sentence on. Applied on the synthesis thread,
+        which also drops phrases cached with the old voice.
+        """
+        self._texts.put((self._generation, _SetVoice(voice_id), False, None))
+
+    def prerender(self, texts):
+        """Render phrases into the phrase cache in the background without speaking them."""
+        if self.phrase_cache is None:
+            return
+        for text in texts:
+            self._texts.put((self._generation, text, False, None))
+
+    def wait_until_done(self, timeout=None):
+        """Block until everything queued has been spoken (or interrupted)."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout=timeout)
+
+    def interrupt(self):
+        """Stop speaking now and drop all queued sentences (barge-in)."""
+        with self._idle:
+            if self._pending == 0:
+                return
+            self._generation += 1
+        self.stats['interrupted'] += 1
+
+        controls = []
+        for pending_queue in (self._texts, self._clips):
+            while True:
+                try:
+                    item = pending_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if pending_queue is self._texts and isinstance(item[1], _SetVoice):
+                    controls.append(item)  # Voice changes outlive the interrupted speech
+                elif pending_queue is self._clips or item[2]:  # Pre-rendering jobs aren't counted as pending
+                    self._done(tail=False)
+        for item in controls:
+            self._texts.put(item)
+
+        if self.direct_mode:
+            self.engine.stop()
+
+    def _done(self, tail=True):
+        """Mark one queued sentence finished; report idle once none are left."""
+        with self._idle:
+            self._pending -= 1
+            if self._pending:
+                return
+            self._idle.notify_all()
+        if tail and self.tail_seconds and self.on_idle:
+            time.sleep(self.tail_seconds)
+        with self._idle:
+            # Only report idle if nothing was queued since (during the tail, or just now)
+            if self._pending or not self._active:
+                return
+            self._active = False
+            if self.on_idle:
+                self.on_idle()
+
+    def _is_stale(self, generation):
+        """Whether an item was queued before the last interrupt()."""
+        return generation != self._generation
+
+    def _synthesize(self, text):
+        """Render text to PCM through a temporary WAV file. Returns None if the driver can't."""
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self.engine.save_to_file(text, path)
+            self.engine.runAndWait()
+            with wave.open(path, "rb") as wav:
+                return AudioClip(wav.readframes(wav.getnframes()), wav.getframerate(), wav.getsampwidth(), wav.getnchannels())
+        except (wave.Error, EOFError, OSError):
+            return None
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _render(self, text, keep=False):
+        """
+        Get PCM for text from the phrase cache, or synthesize it.
+
+        Returns:
+            tuple: (AudioClip or None if the driver can't render, whether it came from the cache)
+        """
+        key = None
+        if self.phrase_cache is not None:
+            key = self.phrase_cache.key(text, self.voice, self.rate, self.volume)
+            clip = self.phrase_cache.get(key)
+            if clip is not None:
+                return clip, True
+
+        start = time.perf_counter()
+        clip = self._synthesize(text)
+        if clip is not None:
+            self.stats['synthesized'] += 1
+            self.stats['total_synthesis_ms'] += (time.perf_counter() - start) * 1000
+            if key is not None and (keep or self.phrase_cache.should_cache(key)):
+                self.phrase_cache.put(key, clip)
+        return clip, False
+
+    def _synthesis_loop(self):
+        """Synthesis thread: render queued sentences to PCM for the playback thread."""
+        # Initialize the engine here, in the background, rather than on first speak()
+        try:
+            self._read_settings(self.engine)
+        except Exception as e:
+            print(f"Error initializing TTS engine: {e}")
+        self._engine_ready.set()
+
+        while self._running:
+            generation, text, play, queued_at = self._texts.get()
+            if text is None:
+                break
+            if isinstance(text, _SetVoice):
+                self._apply_voice(text.voice_id)
+                continue
+            if not play:
+                if not self.direct_mode:
+                    try:
+                        self._render(text, keep=True)
+                    except Exception as e:
+                        print(f"Error pre-rendering speech: {e}")
+                continue
+            if self._is_stale(generation):
+                self._done(tail=False)
+                continue
+
+            try:
+                if not self.direct_mode:
+                    clip, cached = self._render(text)
+                    if clip is not None:
+                        self._clips.put((generation, clip, queued_at, cached))
+                        continue
+                    print("TTS driver can't render to WAV; speaking sentences directly.")
+                    self.direct_mode = True
+
+                if not self._is_stale(generation):
+                    self.engine.say(text)
+                    self.engine.runAndWait()
+                    self.stats['sentences'] += 1
+            except Exception as e:
+                print(f"Error in TTS: {e}")
+                # Fallback to print if TTS fails
+                print(f"Jarvis (TTS failed): {text}")
+            self._done(tail=not self._is_stale(generation))
+
+    def _read_settings(self, engine):
+        """Copy the voice list and current voice, rate and volume out of the engine."""
+        self.voices = [{'id': voice.id, 'name': voice.name, 'languages': getattr(voice, 'languages', [])}
+                       for voice in engine.getProperty('voices') or []]
+        self.voice = engine.getProperty('voice')
+        self.rate = engine.getProperty('rate')
+        self.volume = engine.getProperty('volume')
+
+    def _apply_voice(self, voice_id):
+        """Set the engine's voice (synthesis thread only)."""
+        if voice_id == self.voice:
+            return
+        try:
+            self.engine.setProperty('voice', voice_id)
+        except Exception as e:
+            print(f"Error changing voice: {e}")
+            return
+        self.voice = voice_id
+        if self.phrase_cache is not None:
+            self.phrase_cache.clear()
+
+    def _open_stream(self, clip):
+        """Open (or reuse) an output stream matching the clip's format."""
+        if self._stream is not None and self._stream_format == clip.format_key:
+            return self._stream
+        if self._stream is not None:
+            self._stream.close()
+        if self._audio is None:
+            self._audio = pyaudio.PyAudio()
+        self._stream = self._audio.open(
+            format=self._audio.get_format_from_width(clip.sample_width),
+            channels=clip.channels,
+            rate=clip.sample_rate,
+            output=True,
+            output_device_index=self.output_device_index
+        )
+        self._stream_format = clip.format_key
+        return self._stream
+
+    def _playback_loop(self):
+        """Playback thread: play synthesized sentences in short, interruptible chunks."""
+        while self._running:
+            generation, clip, queued_at, cached = self._clips.get()
+            if clip is None:
+                break
+            if self._is_stale(generation):
+                self._done(tail=False)
+                continue
+
+            with self._audio_lock:
+                self._play(generation, clip, queued_at, cached)
+            self._done(tail=not self._is_stale(generation))
+
+    def _play(self, generation, clip, queued_at, cached):
+        """Write one clip to the output stream in chunks, stopping early if interrupted."""
+        try:
+            stream = self._open_stream(clip)
+            frame_bytes = clip.sample_width * clip.channels
+            chunk_bytes = max(1, int(clip.sample_rate * self.chunk_ms / 1000)) * frame_bytes
+            if cached and not self._is_stale(generation):
+                # Time from speak() to the first cached audio reaching the output stream
+                self.stats['cached_starts'] += 1
+                self.stats['total_cached_start_ms'] += (time.perf_counter() - queued_at) * 1000
+            for offset in range(0, len(clip.pcm), chunk_bytes):
+                if self._is_stale(generation):
+                    break
+                stream.write(clip.pcm[offset:offset + chunk_bytes])
+            else:
+                self.stats['sentences'] += 1
+        except Exception as e:
+            print(f"Error playing speech: {e}")
+
+    def release_audio(self):
+        """
+        Close the output stream and PortAudio instance if nothing is playing, so PortAudio
+        can see devices plugged in since. The next sentence reopens them.
+
+        Returns:
+            bool: True if the audio device was released
+        """
+        if not self._audio_lock.acquire(blocking=False):
+            return False
+        try:
+            if self.is_speaking or self._audio is None:
+                return False
+            if self._stream is not None:
+                self._stream.close()
+            self._audio.terminate()
+            self._audio = self._stream = self._stream_format = None
+            return True
+        finally:
+            self._audio_lock.release()
+
+    def close(self):
+        """Stop the worker threads and release the audio device."""
+        self.interrupt()
+        self._running = False
+        self._texts.put((self._generation, None, False, None))
+        try:
+            self._clips.put_nowait((self._generation, None, None, False))
+        except queue.Full:
+            pass
+        self._synth_thread.join(timeout=1)
+        self._play_thread.join(timeout=1)
+        if self._stream is not None:
+            self._stream.close()
+        if self._audio is not None:
+            self._audio.terminate()
+
+    def get_stats(self):
+        """Get spoken/interrupted sentence counts, average synthesis time and phrase cache use."""
+        synthesized = self.stats['synthesized']
+        cached_starts = self.stats['cached_starts']
+        return dict(
+            self.stats,
+            direct_mode=self.direct_mode,
+            average_synthesis_ms=self.stats['total_synthesis_ms'] / synthesized if synthesized else 0.0,
+            average_cached_start_ms=self.stats['total_cached_start_ms'] / cached_starts if cached_starts else 0.0,
+            phrase_cache=self.phrase_cache.get_stats() if self.phrase_cache is not None else None
+        )
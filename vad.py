@@ -0,0 +1,141 @@
+import collections
+import numpy as np
+import speech_recognition as sr
+
+# Most speech energy falls in this band; broadband noise (fans, hum, clicks) mostly doesn't
+SPEECH_BAND_HZ = (300, 3400)
+
+class VoiceActivityDetector:
+    """
+    Frame-level voice activity detection and endpointing on 16-bit mono PCM.
+
+    Each 10-30 ms frame is scored on two features computed for a whole chunk at once
+    with NumPy: log energy relative to a continuously adapted noise floor, and the
+    share of spectral energy in the speech band. An utterance starts after onset_ms of
+    consecutive speech frames and ends after hangover_ms without one, so brief dips
+    between words don't split it but the end is detected quickly.
+    """
+
+    def __init__(self, sample_rate, frame_ms=20, margin_db=9.0, min_band_ratio=0.5,
+                 noise_adapt_rate=0.05, onset_ms=60, hangover_ms=250):
+        self.sample_rate = sample_rate
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.frame_ms = frame_ms
+        self.margin_db = margin_db
+        self.min_band_ratio = min_band_ratio
+        self.noise_adapt_rate = noise_adapt_rate
+        self.onset_frames = max(1, round(onset_ms / frame_ms))
+        self.hangover_frames = max(1, round(hangover_ms / frame_ms))
+
+        self.window = np.hanning(self.frame_length).astype(np.float32)
+        freqs = np.fft.rfftfreq(self.frame_length, d=1.0 / sample_rate)
+        self.band = (freqs >= SPEECH_BAND_HZ[0]) & (freqs <= SPEECH_BAND_HZ[1])
+
+        self.noise_floor_db = None
+        self._pending = np.zeros(0, dtype=np.int16)
+        self.reset()
+
+    def reset(self):
+        """Start a new utterance (the noise floor is kept)."""
+        self.in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self._pending = np.zeros(0, dtype=np.int16)
+
+    def _features(self, samples):
+        """Per-frame energy (dB) and speech-band energy ratio for complete frames of samples."""
+        count = len(samples) // self.frame_length
+        frames = samples[:count * self.frame_length].reshape(count, self.frame_length).astype(np.float32)
+        energy_db = 10 * np.log10(np.mean(frames ** 2, axis=1) + 1e-10)
+        spectrum = np.abs(np.fft.rfft(frames * self.window, axis=1)) ** 2
+        band_ratio = spectrum[:, self.band].sum(axis=1) / (spectrum.sum(axis=1) + 1e-10)
+        return energy_db, band_ratio
+
+    def calibrate(self, pcm: bytes):
+        """Set the noise floor from audio known to contain no speech."""
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        if len(samples) >= self.frame_length:
+            energy_db, _ = self._features(samples)
+            self.noise_floor_db = float(np.median(energy_db))
+
+    def process(self, pcm: bytes):
+        """
+        Feed a chunk of audio.
+
+        Returns:
+            tuple: (started, ended) - whether an utterance started / ended within this chunk
+        """
+        samples = np.concatenate((self._pending, np.frombuffer(pcm, dtype=np.int16)))
+        usable = len(samples) // self.frame_length * self.frame_length
+        self._pending = samples[usable:]
+        if not usable:
+            return False, False
+
+        energy_db, band_ratio = self._features(samples[:usable])
+        if self.noise_floor_db is None:
+            self.noise_floor_db = float(energy_db[0])
+
+        started = ended = False
+        for energy, ratio in zip(energy_db, band_ratio):
+            is_speech = energy > self.noise_floor_db + self.margin_db and ratio >= self.min_band_ratio
+
+            # Follow the noise floor down immediately, up slowly; barely at all during speech,
+            # so a sustained rise in background noise can't hold an utterance open forever
+            if energy < self.noise_floor_db:
+                self.noise_floor_db = float(energy)
+            else:
+                rate = self.noise_adapt_rate * (0.1 if is_speech else 1.0)
+                self.noise_floor_db += rate * (float(energy) - self.noise_floor_db)
+
+            if not self.in_speech:
+                self._speech_run = self._speech_run + 1 if is_speech else 0
+                if self._speech_run >= self.onset_frames:
+                    self.in_speech = True
+                    self._silence_run = 0
+                    started = True
+            else:
+                self._silence_run = 0 if is_speech else self._silence_run + 1
+                if self._silence_run >= self.hangover_frames:
+                    self.in_speech = False
+                    self._speech_run = 0
+                    ended = True
+        return started, ended
+
+def listen_with_vad(source, vad, timeout=None, phrase_time_limit=None, preroll_ms=300):
+    """
+    Record one utterance from an audio source, endpointed by a VoiceActivityDetector.
+
+    A drop-in alternative to sr.Recognizer.listen: audio from preroll_ms before the
+    detected start until the detected end is returned as sr.AudioData.
+
+    Raises:
+        sr.WaitTimeoutError: If no speech starts within timeout seconds
+    """
+    vad.reset()
+    seconds_per_chunk = source.CHUNK / source.SAMPLE_RATE
+    preroll = collections.deque(maxlen=max(1, int(preroll_ms / 1000 / seconds_per_chunk) + 1))
+    frames = []
+    waited = 0.0
+    phrase_duration = 0.0
+
+    while True:
+        data = source.stream.read(source.CHUNK)
+        if not data:
+            break
+        started, ended = vad.process(data)
+
+        if not frames:
+            preroll.append(data)
+            waited += seconds_per_chunk
+            if started:
+                frames.extend(preroll)
+            elif timeout and waited > timeout:
+                raise sr.WaitTimeoutError("listening timed out while waiting for phrase to start")
+            continue
+
+        frames.append(data)
+        phrase_duration += seconds_per_chunk
+        if ended or (phrase_time_limit and phrase_duration > phrase_time_limit):
+            break
+
+    return sr.AudioData(b"".join(frames), source.SAMPLE_RATE, source.SAMPLE_WIDTH)
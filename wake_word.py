@@ -0,0 +1,167 @@
+import json
+import time
+from functools import lru_cache
+import numpy as np
+
+@lru_cache(maxsize=None)
+def load_vosk_model(model_path):
+    """Load a Vosk model once per path; recognition and wake-word detection share it."""
+    import vosk
+    vosk.SetLogLevel(-1)
+    print(f"Loading Vosk model from {model_path}...")
+    return vosk.Model(model_path)
+
+class WakeWordDetector:
+    """
+    Frame-by-frame keyword spotter run on raw 16-bit PCM before any speech recognition.
+
+    Keeps track of how much audio it has processed and the CPU time that took, so
+    its cost per second of audio can be checked.
+    """
+
+    name = "base"
+
+    def __init__(self, sample_rate):
+        self.sample_rate = sample_rate
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.detections = 0
+
+    def feed(self, pcm: bytes) -> bool:
+        """Process a chunk of audio. Returns True if the wake word was heard in it."""
+        start = time.thread_time()
+        detected = self._process(pcm)
+        self.cpu_seconds += time.thread_time() - start
+        self.audio_seconds += len(pcm) / 2 / self.sample_rate
+        if detected:
+            self.detections += 1
+        return detected
+
+    def _process(self, pcm: bytes) -> bool:
+        raise NotImplementedError
+
+    def reset(self):
+        """Forget any partially processed audio (call after a detection)."""
+
+    def get_stats(self):
+        """Get detection count and CPU cost per second of audio."""
+        return {
+            'engine': self.name,
+            'detections': self.detections,
+            'audio_seconds': self.audio_seconds,
+            'cpu_seconds': self.cpu_seconds,
+            'cpu_per_audio_second': self.cpu_seconds / self.audio_seconds if self.audio_seconds else 0.0
+        }
+
+class PorcupineWakeWordDetector(WakeWordDetector):
+    """Picovoice Porcupine keyword spotting (16 kHz audio, fixed frame length)."""
+
+    name = "porcupine"
+
+    def __init__(self, sample_rate, keyword, sensitivity, access_key):
+        super().__init__(sample_rate)
+        import pvporcupine
+        self.porcupine = pvporcupine.create(access_key=access_key, keywords=[keyword], sensitivities=[sensitivity])
+        if sample_rate != self.porcupine.sample_rate:
+            required_rate = self.porcupine.sample_rate
+            self.porcupine.delete()
+            raise ValueError(f"Porcupine needs {required_rate} Hz audio, capture runs at {sample_rate} Hz")
+        self._pending = np.zeros(0, dtype=np.int16)
+
+    def _process(self, pcm):
+        samples = np.concatenate((self._pending, np.frombuffer(pcm, dtype=np.int16)))
+        frame_length = self.porcupine.frame_length
+        detected = False
+        offset = 0
+        while offset + frame_length <= len(samples):
+            if self.porcupine.process(samples[offset:offset + frame_length]) >= 0:
+                detected = True
+            offset += frame_length
+        self._pending = samples[offset:]
+        return detected
+
+    def reset(self):
+        self._pending = np.zeros(0, dtype=np.int16)
+
+class VoskWakeWordDetector(WakeWordDetector):
+    """
+    Keyword spotting with a Vosk recognizer restricted to a one-word grammar.
+
+    The keyword is accepted as soon as it shows up in partial results, so the command
+    that follows it without a pause still reaches the recognizer. Lower sensitivity
+    requires it in more consecutive partial results.
+    """
+
+    name = "vosk"
+
+    def __init__(self, sample_rate, keyword, sensitivity, model_path):
+        super().__init__(sample_rate)
+        self.keyword = keyword.lower()
+        self.model = load_vosk_model(model_path)
+        self.required_partials = max(1, round((1 - sensitivity) * 4))
+        self.min_confidence = 1 - sensitivity
+        self.reset()
+
+    def _process(self, pcm):
+        if self.recognizer.AcceptWaveform(pcm):
+            words = json.loads(self.recognizer.Result()).get("result", [])
+            self._partial_hits = 0
+            return any(w.get("word") == self.keyword and w.get("conf", 0) >= self.min_confidence for w in words)
+
+        partial = json.loads(self.recognizer.PartialResult()).get("partial", "")
+        if self.keyword in partial.split():
+            self._partial_hits += 1
+        else:
+            self._partial_hits = 0
+        return self._partial_hits >= self.required_partials
+
+    def reset(self):
+        import vosk
+        self.recognizer = vosk.KaldiRecognizer(self.model, self.sample_rate, json.dumps([self.keyword, "[unk]"]))
+        self.recognizer.SetWords(True)
+        self._partial_hits = 0
+
+def create_wake_word_detector(settings, sample_rate, vosk_model_path=None):
+    """
+    Create the wake-word detector configured in settings (WAKE_WORD_SETTINGS).
+
+    Returns:
+        WakeWordDetector or None: None if gating is disabled or the engine is unavailable
+    """
+    if not settings['enabled']:
+        return None
+
+    # Engines are imported only when gating is enabled and they are selected
+    engine = settings['engine']
+    try:
+        if engine == 'porcupine':
+            try:
+                import pvporcupine
+            except ImportError:
+                pvporcupine = None
+            if pvporcupine is None:
+                print("Porcupine is not installed (pip install pvporcupine); wake-word gating disabled.")
+                return None
+            if not settings['porcupine_access_key']:
+                print("PORCUPINE_ACCESS_KEY is not set; wake-word gating disabled.")
+                return None
+            return PorcupineWakeWordDetector(sample_rate, settings['keyword'], settings['sensitivity'], settings['porcupine_access_key'])
+
+        if engine == 'vosk':
+            model_path = settings['vosk_model_path'] or vosk_model_path
+            try:
+                import vosk
+            except ImportError:
+                vosk = None
+            if vosk is None:
+                print("Vosk is not installed (pip install vosk); wake-word gating disabled.")
+                return None
+            if not model_path:
+                print("No Vosk model configured; wake-word gating disabled.")
+                return None
+            return VoskWakeWordDetector(sample_rate, settings['keyword'], settings['sensitivity'], model_path)
+
+        print(f"Unknown wake-word engine {engine!r}; wake-word gating disabled.")
+    except Exception as e:
+        print(f"Could not start wake-word detector: {e}; wake-word gating disabled.")
+    return None
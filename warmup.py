@@ -0,0 +1,74 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict
+
+class WarmupTasks:
+    """
+    Independent startup tasks run concurrently, with a readiness barrier.
+
+    Each task (TTS engine init, microphone calibration, connection setup, ...) runs on
+    its own worker thread. wait_until_ready() blocks until all of them have finished
+    or the timeout passes; tasks still running then keep going in the background.
+    Every task's duration and outcome is recorded.
+    """
+
+    def __init__(self, max_workers: int = 6):
+        self.max_workers = max_workers
+        self.tasks: Dict[str, Callable[[], Any]] = {}
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self._futures = {}
+        self._executor = None
+        self.started_at = None
+        self.ready_ms = None
+
+    def add(self, name: str, task: Callable[[], Any]):
+        """Register a warm-up task (call before start())."""
+        self.tasks[name] = task
+
+    def _run(self, name, task):
+        """Run one task on a worker thread, recording its duration and any error."""
+        start = time.perf_counter()
+        try:
+            task()
+            self.results[name] = {'ms': (time.perf_counter() - start) * 1000, 'ok': True}
+        except Exception as e:
+            print(f"Warm-up task '{name}' failed: {e}")
+            self.results[name] = {'ms': (time.perf_counter() - start) * 1000, 'ok': False, 'error': str(e)}
+
+    def start(self):
+        """Start every registered task."""
+        self.started_at = time.perf_counter()
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="jarvis-warmup")
+        for name, task in self.tasks.items():
+            self._futures[name] = self._executor.submit(self._run, name, task)
+        # Let the pool's threads exit once the last task is done
+        self._executor.shutdown(wait=False)
+
+    def wait_until_ready(self, timeout=None):
+        """
+        Readiness barrier: block until every task has finished or timeout seconds passed.
+
+        Returns:
+            bool: True if all tasks finished in time
+        """
+        _, pending = wait(self._futures.values(), timeout=timeout)
+        self.ready_ms = (time.perf_counter() - self.started_at) * 1000
+        if pending:
+            names = [name for name, future in self._futures.items() if future in pending]
+            print(f"Still warming up in the background: {', '.join(names)}")
+        return not pending
+
+    def summary(self):
+        """One line of per-task timings, e.g. for the startup log."""
+        parts = [f"{name} {result['ms']:.0f} ms{'' if result['ok'] else ' (failed)'}"
+                 for name, result in self.results.items()]
+        return f"Warm-up ready in {self.ready_ms:.0f} ms: " + ", ".join(parts)
+
+    def get_stats(self):
+        """Get per-task timings, wall-clock time to readiness and the sequential total it replaced."""
+        return {
+            'tasks': dict(self.results),
+            'ready_ms': self.ready_ms,
+            'sequential_ms': sum(result['ms'] for result in self.results.values()),
+            'pending': [name for name, future in self._futures.items() if not future.done()]
+        }